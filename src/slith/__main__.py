@@ -1,32 +1,876 @@
+import argparse
+import sys
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from typing import Iterator
+from typing import TYPE_CHECKING, Iterator, Sequence
 
+from slith import startup
+from slith.util import FileName
 from slith.config import Config
 from slith.solc_select import SolcSelector
-from slith.parse_good import contracts_that_parse
-from slith.slither import slither_one_sol
-from slith.mythril import mythril_one_sol
+from slith.parse_good import (
+    ParseBackend,
+    check_contracts_parse,
+    contracts_that_parse,
+    names_of_contracts_that_parse,
+    update_contracts_parse,
+)
+from slith.pipeline import DEFAULT_ANALYZERS, analyze_one_sol, parse_analyzers
+from slith.slither import SlitherProfile
+from slith.shard import ShardKey, in_shard, parse_shard, shard_of
+from slith.summary import RunSummary, load_summary
+from slith.storage import StorageMode, render
+from slith.writer import ResultWriter
+from slith.compress import Codec, recompress, train_from_results
+from slith.incremental import (
+    changes_from_list,
+    changes_from_manifest,
+    load_manifest,
+    remove_results,
+    result_key,
+    save_manifest,
+)
+from slith.retry import retry_timeouts
+from slith.version_search import init_version_search
+from slith.progress import Progress, ProgressMode
+from slith.usage import GROUPINGS, load_usage, usage_report
+from slith.trace import TraceRecorder
+from slith.report import FORMATS, parse_fields, parse_pair, parse_where, report
+
+# merge, work_queue, batching, workers and watch are imported where they are
+# used, so that runs that do not need them start faster.
+if TYPE_CHECKING:
+    from slith.batching import Batcher
+    from slith.workers import WorkerPool
 
 
 def check_contracts(
-    config: Config, solc_sel: SolcSelector, contracts: Iterator[Path], limit: int = -1
+    config: Config,
+    solc_sel: SolcSelector,
+    contracts: Iterator[Path],
+    limit: int = -1,
+    summary: RunSummary | None = None,
+    analyzers: Sequence[str] = DEFAULT_ANALYZERS,
+) -> None:
+    with ExitStack() as stack:
+        runner: "Batcher | WorkerPool | None" = None
+        if config.batch:
+            from slith.batching import Batcher
+
+            runner = Batcher(config, solc_sel, analyzers)
+        elif config.workers > 1:
+            from slith.admission import memory_admission
+            from slith.autoscale import Autoscaler, LoadProbe
+            from slith.workers import WorkerPool
+            from slith.affinity import plan_affinity
+
+            autoscaler = None
+            if config.min_workers is not None:
+                autoscaler = Autoscaler(
+                    config.min_workers, config.workers, LoadProbe().sample
+                )
+            runner = stack.enter_context(
+                WorkerPool(
+                    config,
+                    solc_sel,
+                    analyzers,
+                    config.workers,
+                    memory_admission(config),
+                    autoscaler,
+                    plan_affinity(config.workers) if config.pin_cpus else None,
+                )
+            )
+        for index, sol_path in enumerate(contracts):
+            if 0 <= limit <= index:
+                break
+            startup.mark("first contract")
+            if config.progress is not None:
+                config.progress.start(sol_path.name)
+            if config.trace is not None:
+                config.trace.adjust("queue", "pending", -1)
+                config.trace.adjust("queue", "running", 1)
+            sol_text = sol_path.read_text()
+            if runner is not None:
+                _record(config, summary, runner.add(index, sol_path, sol_text))
+                continue
+            ret_codes = analyze_one_sol(
+                config, solc_sel, index, sol_path, sol_text, analyzers
+            )
+            _record(config, summary, {sol_path.name: ret_codes})
+            del sol_text
+        if runner is not None:
+            _record(config, summary, runner.flush())
+
+
+def _record(
+    config: Config,
+    summary: RunSummary | None,
+    results: dict[FileName, dict[str, int]],
 ) -> None:
-    for index, sol_path in enumerate(contracts):
-        if index < 1:
-            continue
-        if 0 <= limit <= index:
-            break
-        sol_text = sol_path.read_text()
-        # slither_one_sol(config, solc_sel, index, sol_path, sol_text)
-        mythril_one_sol(config, solc_sel, index, sol_path, sol_text)
-        del sol_text
+    if config.progress is not None:
+        for name, ret_codes in results.items():
+            config.progress.finish(name, ret_codes)
+    if config.trace is not None and results:
+        config.trace.adjust("queue", "running", -len(results))
+    if summary is None:
+        return
+    for name, ret_codes in results.items():
+        for tool, ret_code in ret_codes.items():
+            summary.record(tool, name, ret_code)
 
 
 def run(config: Config) -> None:
+    if config.compress:
+        config.codec = Codec(config.zstd_dicts_dir, config.compress_level)
+    with ExitStack() as stack:
+        if config.write_behind:
+            config.writer = stack.enter_context(ResultWriter(fsync=config.fsync))
+        if config.trace_path is not None:
+            config.trace = stack.enter_context(TraceRecorder(config.trace_path))
+        if config.progress_mode != ProgressMode.OFF:
+            config.progress = stack.enter_context(
+                Progress(
+                    snapshot_path=config.progress_snapshot,
+                    mode=ProgressMode(config.progress_mode),
+                )
+            )
+        try:
+            _run(config)
+        finally:
+            config.writer = None
+            config.progress = None
+            config.trace = None
+
+
+def _add_total(config: Config, count: int) -> None:
+    if config.progress is not None:
+        config.progress.total = (config.progress.total or 0) + count
+    if config.trace is not None:
+        config.trace.adjust("queue", "pending", count)
+
+
+def _prioritized(config: Config, contracts: Iterator[Path]) -> Iterator[Path]:
+    if not config.prioritize:
+        return contracts
+    from slith.risk import prioritize
+
+    return iter(prioritize(config, contracts))
+
+
+def _plan_budget(
+    config: Config, contracts: list[Path], analyzers: Sequence[str]
+) -> None:
+    if config.mythril_budget_hours is None or "mythril" not in analyzers:
+        return
+    from slith.budget import plan_budget
+
+    config.mythril_limits = plan_budget(config, contracts)
+
+
+def run_incremental(config: Config, solc_sel: SolcSelector) -> None:
+    manifest = load_manifest(config.manifest)
+    if config.changed_list is not None:
+        changed_names = config.changed_list.read_text().splitlines()
+        changes = changes_from_list(config, manifest, changed_names)
+    elif config.shard is None:
+        changes = changes_from_manifest(
+            manifest, config.contracts_glob(), partial(result_key, config)
+        )
+    else:
+        shard = config.shard
+        in_other_shard = {
+            name: digest
+            for name, digest in manifest.items()
+            if shard_of(Path(name), shard.count) != shard.index
+        }
+        changes = changes_from_manifest(
+            {k: v for k, v in manifest.items() if k not in in_other_shard},
+            in_shard(config.contracts_glob(), shard),
+            partial(result_key, config),
+        )
+        changes.manifest.update(in_other_shard)
+    stale = changes.stale()
+    for name in stale:
+        remove_results(config, name)
+    update_contracts_parse(config, changes.changed, changes.deleted, solc_sel)
+    parsed_names = names_of_contracts_that_parse(config)
+    contracts = (p for p in changes.changed if p.name in parsed_names)
+    if config.shard is not None:
+        contracts = in_shard(contracts, config.shard, config.shard_key)
+    contracts = iter(to_analyze := list(_prioritized(config, contracts)))
+    _add_total(config, len(to_analyze))
+    _plan_budget(config, to_analyze, config.analyzers)
+    summary = load_summary(config.run_summary)
+    summary.forget(stale)
+    try:
+        check_contracts(
+            config, solc_sel, contracts, summary=summary, analyzers=config.analyzers
+        )
+        retry_timeouts(config, solc_sel, summary)
+    finally:
+        summary.save(config.run_summary)
+    save_manifest(config.manifest, changes.manifest)
+    print(
+        f"incremental: {len(changes.changed)} changed, {len(changes.deleted)} deleted"
+    )
+
+
+def run_triage(
+    config: Config, solc_sel: SolcSelector, contracts: list[Path], summary: RunSummary
+) -> None:
+    """Slither on every contract, then mythril where slither found enough."""
+    from slith.triage import triage, triage_report
+
+    _add_total(config, len(contracts))
+    check_contracts(
+        config, solc_sel, iter(contracts), summary=summary, analyzers=("slither",)
+    )
+    if config.writer is not None:
+        config.writer.flush()  # triage reads the slither results back
+    result = triage(config, contracts)
+    _add_total(config, len(result.selected()))
+    _plan_budget(config, result.selected(), ("mythril",))
+    check_contracts(
+        config,
+        solc_sel,
+        iter(result.selected()),
+        summary=summary,
+        analyzers=("mythril",),
+    )
+    retry_timeouts(config, solc_sel, summary)
+    print(triage_report(config, result))
+
+
+def run_sample(
+    config: Config, solc_sel: SolcSelector, contracts: list[Path], summary: RunSummary
+) -> None:
+    """Analyze a stratified sample and extrapolate to all the contracts."""
+    from slith.sample import draw_sample, sample_report, stratify
+    from slith.usage import usage_offset
+
+    assert config.sample_size is not None
+    strata = draw_sample(
+        stratify(solc_sel, contracts), config.sample_size, config.sample_seed
+    )
+    sampled = [sol_path for stratum in strata for sol_path in stratum.sample]
+    print(
+        f"sample: analyzing {len(sampled)} of {len(contracts)} contracts "
+        f"in {len(strata)} strata"
+    )
+    _add_total(config, len(sampled))
+    _plan_budget(config, sampled, config.analyzers)
+    usage_start = usage_offset(config.usage_log)
+    check_contracts(
+        config, solc_sel, iter(sampled), summary=summary, analyzers=config.analyzers
+    )
+    print("\n".join(sample_report(config, strata, summary, usage_start)))
+
+
+def _run(config: Config) -> None:
+    solc_sel = SolcSelector()
+    init_version_search(config, solc_sel)
+    if config.incremental:
+        run_incremental(config, solc_sel)
+        return
+    contracts = contracts_that_parse(config)
+    if config.shard is not None:
+        contracts = in_shard(contracts, config.shard, config.shard_key)
+    contracts = _prioritized(config, contracts)
+    summary = RunSummary(shard=None if config.shard is None else str(config.shard))
+    if config.triage:
+        try:
+            run_triage(config, solc_sel, list(contracts), summary)
+        finally:
+            summary.save(config.run_summary)
+        return
+    if config.sample_size is not None:
+        try:
+            run_sample(config, solc_sel, list(contracts), summary)
+        finally:
+            summary.save(config.run_summary)
+        return
+    contracts = iter(to_analyze := list(contracts))
+    _plan_budget(config, to_analyze, config.analyzers)
+    if config.queue_path is None:
+        _add_total(config, len(to_analyze))
+        try:
+            check_contracts(
+                config, solc_sel, contracts, summary=summary, analyzers=config.analyzers
+            )
+            retry_timeouts(config, solc_sel, summary)
+        finally:
+            summary.save(config.run_summary)
+        return
+    from slith.work_queue import (
+        PENDING,
+        WorkQueue,
+        complete_contract,
+        queued_contracts,
+    )
+
+    queue = WorkQueue(config.queue_path, lease_sec=config.lease_sec)
+    try:
+        queue.populate(contracts)
+        _add_total(config, queue.counts().get(PENDING, 0))
+        check_contracts(
+            config,
+            solc_sel,
+            queued_contracts(queue, config, summary),
+            summary=summary,
+            analyzers=config.analyzers,
+        )
+        retry_timeouts(
+            config,
+            solc_sel,
+            summary,
+            on_retried=partial(complete_contract, queue, config, summary),
+        )
+    finally:
+        queue.summary().save(config.run_summary)
+        print(f"queue: {queue.counts()}")
+        queue.close()
+
+
+def print_counts(summary: RunSummary) -> None:
+    for tool in sorted(summary.results):
+        counts = summary.counts(tool)
+        print(f"{tool}: {len(summary.results[tool])} {dict(sorted(counts.items()))}")
+
+
+def merge(
+    config: Config,
+    shard_dirs: list[Path],
+    into: Path | None,
+    analyzers: Sequence[str] = DEFAULT_ANALYZERS,
+) -> bool:
+    from slith.merge import merge_results
+
+    dest_dir = config.results_base_dir if into is None else into
+    expected = names_of_contracts_that_parse(config)
+    merged, report = merge_results(dest_dir, shard_dirs, expected, analyzers)
+    print_counts(merged)
+    for line in report.lines():
+        print(line)
+    return report.ok()
+
+
+def add_parse_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--parse-backend",
+        choices=[ParseBackend.ANTLR.value, ParseBackend.SOLC.value],
+        default=ParseBackend.ANTLR.value,
+        help="parser used to decide which contracts parse",
+    )
+    parser.add_argument(
+        "--no-prefilter",
+        action="store_true",
+        help="do not reject obvious garbage with the lexical prefilter",
+    )
+
+
+def add_analysis_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--analyzers",
+        type=parse_analyzers,
+        default=DEFAULT_ANALYZERS,
+        help="comma separated analyzers to run on each contract, e.g. mythril,slither",
+    )
+    parser.add_argument(
+        "--mythril-timeout",
+        type=float,
+        default=Config.mythril_timeout_sec,
+        help="seconds before a mythril run is killed",
+    )
+    parser.add_argument(
+        "--slither-timeout",
+        type=float,
+        default=Config.slither_timeout_sec,
+        help="seconds before a slither run is killed",
+    )
+    parser.add_argument(
+        "--slither-profile",
+        choices=[profile.value for profile in SlitherProfile],
+        default=SlitherProfile.FULL.value,
+        help="slither detectors to run: a fast few, medium and high impact, or all",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=[mode.value for mode in StorageMode],
+        default=StorageMode.COPY.value,
+        help="how the analyzed source is kept next to the results",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="store results zstd compressed with the shared dictionary",
+    )
+    parser.add_argument(
+        "--version-search",
+        action="store_true",
+        help="probe that the chosen solc compiles each contract, else search one",
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        default=None,
+        help="save the schedule of the run as Chrome trace events (JSON) here",
+    )
+
+
+def set_analysis_options(config: Config, args: argparse.Namespace) -> None:
+    config.analyzers = args.analyzers
+    config.mythril_timeout_sec = args.mythril_timeout
+    config.slither_timeout_sec = args.slither_timeout
+    config.slither_profile = args.slither_profile
+    config.storage_mode = args.storage
+    config.compress = args.compress
+    config.search_versions = args.version_search
+    config.trace_path = args.trace
+
+
+def run_watch(
+    config: Config, workers: int, settle_sec: float | None, catch_up: bool
+) -> None:
+    from slith.watch import SETTLE_SEC, watch
+
+    if settle_sec is None:
+        settle_sec = SETTLE_SEC
+    if config.compress:
+        config.codec = Codec(config.zstd_dicts_dir, config.compress_level)
     solc_sel = SolcSelector()
-    check_contracts(config, solc_sel, contracts_that_parse(config), limit=-1)
+    init_version_search(config, solc_sel)
+    with ExitStack() as stack:
+        if config.trace_path is not None:
+            config.trace = stack.enter_context(TraceRecorder(config.trace_path))
+        watch(config, solc_sel, config.analyzers, workers, settle_sec, catch_up)
+
+
+def recompress_results(config: Config, train: bool, sample_size: int) -> None:
+    codec = Codec(config.zstd_dicts_dir, config.compress_level)
+    if train:
+        dict_id = train_from_results(config, codec, sample_size)
+        print(f"trained dictionary {dict_id}")
+    before, after = recompress(config, codec)
+    print(f"recompressed {before} bytes into {after} bytes")
+
+
+def parse_names(spec: str) -> frozenset[str]:
+    return frozenset(name.strip() for name in spec.split(",") if name.strip())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="slith", description="Driver for static analyzers for Solidity"
+    )
+    parser.add_argument("--data-dir", type=Path, default=None)
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report on stderr where the time before the first contract went",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    check = commands.add_parser("check", help="analyze the contracts that parse")
+    check.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="analyze only shard i of N (1-based), e.g. 2/4",
+    )
+    check.add_argument(
+        "--shard-by",
+        choices=[key.value for key in ShardKey],
+        default=ShardKey.NAME.value,
+        help="hash the contract name or its content to pick the shard",
+    )
+    check.add_argument(
+        "--queue",
+        type=Path,
+        default=None,
+        help="claim contracts from a shared SQLite work queue at this path",
+    )
+    check.add_argument(
+        "--lease-sec",
+        type=float,
+        default=600.0,
+        help="seconds a claimed contract stays leased without renewal",
+    )
+
+    check.add_argument(
+        "--workers",
+        type=int,
+        default=Config.workers,
+        help="contracts analyzed at the same time, as memory allows",
+    )
+    check.add_argument(
+        "--min-workers",
+        type=int,
+        default=None,
+        help="scale between this and --workers with the load of the host",
+    )
+    check.add_argument(
+        "--pin-cpus",
+        action="store_true",
+        help="pin each worker and its analyzers to its own cores, NUMA node aware",
+    )
+    check.add_argument(
+        "--mem-headroom",
+        type=int,
+        default=Config.mem_headroom_mb,
+        metavar="MB",
+        help="memory kept free: contracts wait while less would be available",
+    )
+    check.add_argument(
+        "--prioritize",
+        action="store_true",
+        help="analyze contracts with risky constructs and a low predicted cost first",
+    )
+    check.add_argument(
+        "--triage",
+        action="store_true",
+        help="run slither on every contract, then mythril only where it flags "
+        "a triage detector or impact, and on a sample of the rest",
+    )
+    check.add_argument(
+        "--triage-detectors",
+        type=parse_names,
+        default=frozenset(),
+        metavar="NAME[,NAME...]",
+        help="slither detectors (or wiki anchors) that send a contract to mythril",
+    )
+    check.add_argument(
+        "--triage-impacts",
+        type=parse_names,
+        default=None,
+        metavar="IMPACT[,IMPACT...]",
+        help="slither impacts that send a contract to mythril (default: High)",
+    )
+    check.add_argument(
+        "--triage-sample",
+        type=float,
+        default=Config.triage_sample,
+        help="fraction of the unflagged contracts mythril still runs on",
+    )
+    check.add_argument(
+        "--triage-seed",
+        type=int,
+        default=Config.triage_seed,
+        help="seed that picks the sampled contracts",
+    )
+    check.add_argument(
+        "--mythril-budget",
+        type=float,
+        default=None,
+        metavar="HOURS",
+        help="fit mythril in this many hours on --workers cores, setting its "
+        "execution and solver timeouts, depth and transactions per contract",
+    )
+    check.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        metavar="N",
+        help="analyze about N contracts, stratified by solc version and size, "
+        "and estimate the counts and runtime of the whole corpus",
+    )
+    check.add_argument(
+        "--sample-seed",
+        type=int,
+        default=Config.sample_seed,
+        help="seed that picks the sampled contracts",
+    )
+    check.add_argument(
+        "--retries",
+        type=int,
+        default=Config.retries,
+        help="rounds of retries for analyzer runs that timed out, 0 to disable",
+    )
+    check.add_argument(
+        "--retry-factor",
+        type=float,
+        default=Config.retry_factor,
+        help="each retry round multiplies the analyzer timeouts by this factor",
+    )
+    check.add_argument(
+        "--progress",
+        choices=[mode.value for mode in ProgressMode],
+        default=ProgressMode.AUTO.value,
+        help="live view on a terminal, periodic log lines, or nothing",
+    )
+    check.add_argument(
+        "--batch",
+        action="store_true",
+        help="analyze small contracts of the same solc version in one run",
+    )
+    check.add_argument(
+        "--write-behind",
+        action="store_true",
+        help="write results from a background thread, syncing them in groups",
+    )
+    check.add_argument(
+        "--no-fsync",
+        action="store_true",
+        help="with --write-behind, do not fsync result files and directories",
+    )
+    check.add_argument(
+        "--incremental",
+        action="store_true",
+        help="analyze only contracts that changed since the last incremental run",
+    )
+    check.add_argument(
+        "--changed",
+        type=Path,
+        default=None,
+        help="with --incremental, a file listing the changed contract paths",
+    )
+    add_analysis_arguments(check)
+    add_parse_arguments(check)
+
+    watch_cmd = commands.add_parser(
+        "watch", help="analyze contracts as they are written to the contracts dir"
+    )
+    watch_cmd.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="contracts analyzed at the same time",
+    )
+    watch_cmd.add_argument(
+        "--settle-sec",
+        type=float,
+        default=None,
+        help="seconds without writes before a new file is picked up (default 2)",
+    )
+    watch_cmd.add_argument(
+        "--catch-up",
+        action="store_true",
+        help="first queue the contracts that changed since the manifest was saved",
+    )
+    add_analysis_arguments(watch_cmd)
+    add_parse_arguments(watch_cmd)
+
+    parse_cmd = commands.add_parser(
+        "parse", help="check again which contracts parse, overwriting the lists"
+    )
+    add_parse_arguments(parse_cmd)
+
+    render_cmd = commands.add_parser(
+        "render", help="print a result as a comment header followed by the source"
+    )
+    render_cmd.add_argument("name", help="contract file name, e.g. Token.sol")
+    render_cmd.add_argument("--tool", choices=["slither", "mythril"], default="slither")
+
+    recompress_cmd = commands.add_parser(
+        "recompress", help="compress an existing results tree with zstd"
+    )
+    recompress_cmd.add_argument(
+        "--train",
+        action="store_true",
+        help="first train a new shared dictionary from a sample of the results",
+    )
+    recompress_cmd.add_argument("--sample", type=int, default=2000)
+
+    commands.add_parser("summary", help="print the result counts of the last run")
+
+    usage_cmd = commands.add_parser(
+        "usage", help="CPU time, peak memory and context switches of analyzer runs"
+    )
+    usage_cmd.add_argument(
+        "--by",
+        choices=GROUPINGS,
+        action="append",
+        help="group by tool, solc version or contract size (default: all three)",
+    )
+
+    report_cmd = commands.add_parser(
+        "report", help="counts, cross-tabs and histograms over the stored results"
+    )
+    report_cmd.add_argument(
+        "--group-by",
+        type=parse_fields,
+        action="append",
+        metavar="FIELD[,FIELD...]",
+        help="count results by these front matter fields (default: tool,bucket)",
+    )
+    report_cmd.add_argument(
+        "--crosstab",
+        type=parse_pair,
+        action="append",
+        metavar="ROW,COLUMN",
+        help="table of counts, e.g. checked_version,bucket",
+    )
+    report_cmd.add_argument(
+        "--histogram",
+        action="append",
+        metavar="FIELD",
+        help="histogram of a numeric field, e.g. cpu_user_sec",
+    )
+    report_cmd.add_argument("--bins", type=int, default=10)
+    report_cmd.add_argument(
+        "--findings",
+        action="store_true",
+        help="most frequent mythril issues and slither detectors",
+    )
+    report_cmd.add_argument("--top", type=int, default=20)
+    report_cmd.add_argument(
+        "--where",
+        type=parse_where,
+        action="append",
+        metavar="FIELD=VALUE",
+        help="only results whose field has this value, e.g. tool=slither",
+    )
+    report_cmd.add_argument("--format", choices=FORMATS, default=FORMATS[0])
+    report_cmd.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="read every result again instead of reusing the index",
+    )
+
+    merge_cmd = commands.add_parser(
+        "merge", help="merge the results directories of several shards"
+    )
+    merge_cmd.add_argument("shard_dirs", type=Path, nargs="+")
+    merge_cmd.add_argument(
+        "--into",
+        type=Path,
+        default=None,
+        help="destination results directory (default: the configured one)",
+    )
+    merge_cmd.add_argument(
+        "--analyzers",
+        type=parse_analyzers,
+        default=DEFAULT_ANALYZERS,
+        help="analyzers the shards were run with, all expected in the merge",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args([*argv, "check"])
+    if args.profile_startup:
+        startup.enable()
+    try:
+        _main(parser, args)
+    finally:
+        startup.print_report()
+
+
+def _main(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    with startup.phase("config"):
+        config = Config(args.data_dir)
+    if args.command in ("check", "parse", "watch"):
+        config.parse_backend = args.parse_backend
+        config.parse_prefilter = not args.no_prefilter
+    match args.command:
+        case "parse":
+            check_contracts_parse(config, config.contracts_glob())
+        case "summary":
+            print_counts(load_summary(config.run_summary))
+        case "usage":
+            records = load_usage(config.usage_log)
+            for grouping in args.by or GROUPINGS:
+                print("\n".join(usage_report(records, grouping)), end="\n\n")
+        case "report":
+            print(
+                report(
+                    config,
+                    group_bys=args.group_by or (),
+                    crosstabs=args.crosstab or (),
+                    histograms=args.histogram or (),
+                    findings=args.findings,
+                    where=args.where or (),
+                    bins=args.bins,
+                    top=args.top,
+                    fmt=args.format,
+                    rebuild=args.rebuild,
+                )
+            )
+        case "render":
+            print(render(config, args.tool, args.name), end="")
+        case "recompress":
+            recompress_results(config, args.train, args.sample)
+        case "merge":
+            if not merge(config, args.shard_dirs, args.into, args.analyzers):
+                sys.exit(1)
+        case "watch":
+            if args.workers < 1:
+                parser.error("--workers must be at least 1")
+            set_analysis_options(config, args)
+            run_watch(config, args.workers, args.settle_sec, args.catch_up)
+        case _:
+            config.shard = args.shard
+            config.shard_key = ShardKey(args.shard_by)
+            config.queue_path = args.queue
+            config.lease_sec = args.lease_sec
+            set_analysis_options(config, args)
+            config.batch = args.batch
+            config.workers = args.workers
+            config.min_workers = args.min_workers
+            config.pin_cpus = args.pin_cpus
+            config.mem_headroom_mb = args.mem_headroom
+            config.prioritize = args.prioritize
+            config.triage = args.triage
+            config.mythril_budget_hours = args.mythril_budget
+            config.sample_size = args.sample
+            config.sample_seed = args.sample_seed
+            config.triage_detectors = args.triage_detectors
+            if args.triage_impacts is not None:
+                config.triage_impacts = args.triage_impacts
+            config.triage_sample = args.triage_sample
+            config.triage_seed = args.triage_seed
+            config.retries = args.retries
+            config.progress_mode = args.progress
+            config.retry_factor = args.retry_factor
+            config.write_behind = args.write_behind
+            config.fsync = not args.no_fsync
+            config.incremental = args.incremental or args.changed is not None
+            config.changed_list = args.changed
+            if config.incremental and config.queue_path is not None:
+                parser.error("--incremental cannot be combined with --queue")
+            if config.incremental and config.shard_key != ShardKey.NAME:
+                parser.error("--incremental shards only by name")
+            if config.batch and config.queue_path is not None:
+                parser.error("--batch cannot be combined with --queue")
+            if config.workers < 1:
+                parser.error("--workers must be at least 1")
+            if config.triage and (
+                config.incremental or config.queue_path is not None or config.batch
+            ):
+                parser.error(
+                    "--triage cannot be combined with --incremental, --queue "
+                    "or --batch"
+                )
+            budget = config.mythril_budget_hours
+            if budget is not None and budget <= 0:
+                parser.error("--mythril-budget must be positive")
+            if budget is not None and config.batch:
+                parser.error("--mythril-budget cannot be combined with --batch")
+            if config.sample_size is not None and (
+                config.incremental or config.queue_path is not None or config.triage
+            ):
+                parser.error(
+                    "--sample cannot be combined with --incremental, --queue "
+                    "or --triage"
+                )
+            if config.sample_size is not None and config.sample_size < 1:
+                parser.error("--sample must be at least 1")
+            if not 0 <= config.triage_sample <= 1:
+                parser.error("--triage-sample must be between 0 and 1")
+            if config.min_workers is not None and not (
+                1 <= config.min_workers <= config.workers
+            ):
+                parser.error("--min-workers must be between 1 and --workers")
+            if config.pin_cpus and config.workers == 1:
+                parser.error("--pin-cpus needs --workers")
+            if config.workers > 1 and (config.batch or config.queue_path is not None):
+                parser.error("--workers cannot be combined with --batch or --queue")
+            run(config)
 
 
-def main() -> None:
-    config = Config()
-    run(config)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import statistics
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from slith.util import FileName
+from slith.config import Config
+from slith.usage import load_usage, size_band
+
+DEFAULT_RSS_KB = 1024 * 1024  # assumed peak of an analyzer never seen before
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def mem_available_kb(meminfo: Path = Path("/proc/meminfo")) -> int | None:
+    try:
+        with open(meminfo) as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def descendants_rss_kb(pid: int | None = None, proc: Path = Path("/proc")) -> int:
+    """Resident memory of the processes below pid, like running analyzers."""
+    pid = os.getpid() if pid is None else pid
+    children: dict[int, list[int]] = {}
+    rss: dict[int, int] = {}
+    for entry in os.scandir(proc):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"{entry.path}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue  # the process exited meanwhile
+        children.setdefault(int(fields[1]), []).append(int(entry.name))
+        rss[int(entry.name)] = int(fields[21]) * PAGE_KB
+    total = 0
+    stack = list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        total += rss.get(child, 0)
+        stack += children.get(child, [])
+    return total
+
+
+class RssPredictor:
+    """Peak RSS of an analyzer run on a contract, from results/usage.jsonl.
+
+    A contract analyzed before is predicted by its own last peak; others by
+    the 90th percentile of their tool and size band, then of their tool.
+    """
+
+    def __init__(
+        self, records: Sequence[dict[str, Any]], default_kb: int = DEFAULT_RSS_KB
+    ) -> None:
+        self.default_kb = default_kb
+        self.observed: dict[tuple[str, FileName], int] = {}
+        groups: dict[tuple[str, str], list[int]] = {}
+        for record in records:
+            peak = int(record["max_rss_kb"])
+            self.observed[record["tool"], record["name"]] = peak
+            for band in (size_band(record["size"]), ""):
+                groups.setdefault((record["tool"], band), []).append(peak)
+        self.p90 = {key: _p90(peaks) for key, peaks in groups.items()}
+
+    def predict(self, tool: str, name: FileName, size: int) -> int:
+        if (tool, name) in self.observed:
+            return self.observed[tool, name]
+        for key in ((tool, size_band(size)), (tool, "")):
+            if key in self.p90:
+                return self.p90[key]
+        return self.default_kb
+
+
+def _p90(values: list[int]) -> int:
+    if len(values) == 1:
+        return values[0]
+    return int(statistics.quantiles(values, n=10, method="inclusive")[8])
+
+
+class Admission:
+    """Admit a contract only if its predicted peak fits in available memory.
+
+    MemAvailable already accounts for what running analyzers use now; what
+    they may still grow, their predicted peaks minus their current RSS, is
+    reserved on top of the headroom.
+    """
+
+    def __init__(
+        self,
+        predictor: RssPredictor,
+        headroom_kb: int,
+        available: Callable[[], int | None] = mem_available_kb,
+        in_use: Callable[[], int] = descendants_rss_kb,
+    ) -> None:
+        self.predictor = predictor
+        self.headroom_kb = headroom_kb
+        self.available = available
+        self.in_use = in_use
+
+    def predict(self, analyzers: Sequence[str], name: FileName, size: int) -> int:
+        """The analyzers of one contract run at the same time, so peaks add up."""
+        return sum(self.predictor.predict(tool, name, size) for tool in analyzers)
+
+    def under_pressure(self) -> bool:
+        available = self.available()
+        return available is not None and available < self.headroom_kb
+
+    def admit(self, predicted_kb: int, running_kb: Sequence[int]) -> bool:
+        available = self.available()
+        if available is None:
+            return True
+        growth = max(0, sum(running_kb) - self.in_use()) if running_kb else 0
+        return available - self.headroom_kb - growth >= predicted_kb
+
+
+def memory_admission(config: Config) -> Admission | None:
+    if mem_available_kb() is None:
+        return None
+    return Admission(
+        RssPredictor(load_usage(config.usage_log)), config.mem_headroom_mb * 1024
+    )
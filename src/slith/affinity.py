@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+SYS_DIR = Path("/sys/devices/system")
+
+
+def parse_cpulist(text: str) -> set[int]:
+    """CPUs of a kernel cpu list, like "0-3,8-11"."""
+    cpus: set[int] = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        low, _, high = part.partition("-")
+        cpus.update(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def format_cpulist(cpus: set[int]) -> str:
+    ranges: list[list[int]] = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(lo) if lo == hi else f"{lo}-{hi}" for lo, hi in ranges)
+
+
+def _read_cpulist(path: Path) -> set[int]:
+    try:
+        return parse_cpulist(path.read_text())
+    except (OSError, ValueError):
+        return set()
+
+
+def numa_nodes(allowed: set[int], sys_dir: Path = SYS_DIR) -> list[set[int]]:
+    nodes = [
+        _read_cpulist(node / "cpulist") & allowed
+        for node in sorted((sys_dir / "node").glob("node[0-9]*"))
+    ]
+    return [node for node in nodes if node] or [allowed]
+
+
+def physical_cores(cpus: set[int], sys_dir: Path = SYS_DIR) -> list[set[int]]:
+    """Group the hyperthreads of each core together."""
+    cores: list[set[int]] = []
+    seen: set[int] = set()
+    for cpu in sorted(cpus):
+        if cpu in seen:
+            continue
+        siblings_list = sys_dir / f"cpu/cpu{cpu}/topology/thread_siblings_list"
+        core = (_read_cpulist(siblings_list) & cpus) | {cpu}
+        seen |= core
+        cores.append(core)
+    return cores
+
+
+def core_sets(slots: int, nodes: list[list[set[int]]]) -> list[set[int]]:
+    """Split the cores of each NUMA node among the worker slots.
+
+    Slots go to the nodes in turn, so no slot spans two nodes, and each
+    slot of a node gets whole cores; with more slots than cores on a node
+    its slots share cores.
+    """
+    per_node: list[list[int]] = [[] for _ in nodes]
+    for slot in range(slots):
+        per_node[slot % len(nodes)].append(slot)
+    sets: list[set[int]] = [set() for _ in range(slots)]
+    for cores, node_slots in zip(nodes, per_node):
+        for i, slot in enumerate(node_slots):
+            if len(cores) >= len(node_slots):
+                start = i * len(cores) // len(node_slots)
+                end = (i + 1) * len(cores) // len(node_slots)
+                chunk = cores[start:end]
+            else:
+                chunk = [cores[i % len(cores)]]
+            sets[slot] = set().union(*chunk)
+    return sets
+
+
+def plan_affinity(slots: int, sys_dir: Path = SYS_DIR) -> list[set[int]]:
+    allowed = os.sched_getaffinity(0)
+    nodes = numa_nodes(allowed, sys_dir)
+    return core_sets(slots, [physical_cores(node, sys_dir) for node in nodes])
+
+
+def pinned_cpus() -> str:
+    """The CPUs of the calling thread if pinned, compared to the main thread."""
+    cpus = os.sched_getaffinity(0)
+    if cpus == os.sched_getaffinity(os.getpid()):
+        return ""
+    return format_cpulist(cpus)
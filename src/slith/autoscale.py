@@ -0,0 +1,145 @@
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+INTERVAL_SEC = 10.0
+CONFIRMATIONS = 2  # consecutive samples that must agree before a change
+# Load per CPU above which we shrink, and below which we may grow; in
+# between the number of workers is left alone.
+HIGH_LOAD = 1.0
+LOW_LOAD = 0.7
+HIGH_STEAL = 0.10
+LOW_STEAL = 0.05
+# "some avg10" of /proc/pressure, the percentage of time tasks stalled
+HIGH_CPU_PRESSURE = 20.0
+LOW_CPU_PRESSURE = 5.0
+HIGH_MEMORY_PRESSURE = 10.0
+LOW_MEMORY_PRESSURE = 1.0
+
+
+@dataclass(frozen=True)
+class LoadSample:
+    load_per_cpu: float
+    steal: float  # fraction of CPU time stolen since the previous sample
+    cpu_pressure: float  # 0 where pressure stall information is missing
+    memory_pressure: float
+
+    def overloaded(self) -> bool:
+        return (
+            self.load_per_cpu > HIGH_LOAD
+            or self.steal > HIGH_STEAL
+            or self.cpu_pressure > HIGH_CPU_PRESSURE
+            or self.memory_pressure > HIGH_MEMORY_PRESSURE
+        )
+
+    def idle(self) -> bool:
+        return (
+            self.load_per_cpu < LOW_LOAD
+            and self.steal < LOW_STEAL
+            and self.cpu_pressure < LOW_CPU_PRESSURE
+            and self.memory_pressure < LOW_MEMORY_PRESSURE
+        )
+
+    def describe(self) -> str:
+        return (
+            f"load/cpu {self.load_per_cpu:.2f}, steal {self.steal:.1%}, "
+            f"psi cpu {self.cpu_pressure:.1f} mem {self.memory_pressure:.1f}"
+        )
+
+
+def read_pressure(path: Path) -> float:
+    try:
+        with open(path) as f:
+            for line in f:
+                kind, *fields = line.split()
+                if kind == "some":
+                    averages = dict(field.split("=") for field in fields)
+                    return float(averages["avg10"])
+    except (OSError, ValueError, KeyError):
+        pass
+    return 0.0
+
+
+def read_cpu_times(path: Path) -> tuple[int, int]:
+    """Total and stolen jiffies from the aggregate cpu line of /proc/stat."""
+    with open(path) as f:
+        fields = [int(field) for field in f.readline().split()[1:]]
+    # user nice system idle iowait irq softirq steal guest guest_nice; the
+    # guest times are already included in user and nice
+    steal = fields[7] if len(fields) > 7 else 0
+    return sum(fields[:8]), steal
+
+
+class LoadProbe:
+    def __init__(self, proc: Path = Path("/proc"), cpus: int | None = None) -> None:
+        self.proc = proc
+        self.cpus = cpus or os.cpu_count() or 1
+        self.last_times = read_cpu_times(proc / "stat")
+
+    def sample(self) -> LoadSample:
+        load = float((self.proc / "loadavg").read_text().split()[0])
+        total, steal = read_cpu_times(self.proc / "stat")
+        last_total, last_steal = self.last_times
+        self.last_times = total, steal
+        elapsed = total - last_total
+        return LoadSample(
+            load / self.cpus,
+            (steal - last_steal) / elapsed if elapsed > 0 else 0.0,
+            read_pressure(self.proc / "pressure" / "cpu"),
+            read_pressure(self.proc / "pressure" / "memory"),
+        )
+
+
+class Autoscaler:
+    """Grow or shrink the contracts in flight between low and high.
+
+    One step at a time, at most every interval_sec, and only after
+    CONFIRMATIONS samples in a row ask for the same direction; the gap
+    between the low and high thresholds keeps it from flapping.
+    """
+
+    def __init__(
+        self,
+        low: int,
+        high: int,
+        sample: Callable[[], LoadSample],
+        interval_sec: float = INTERVAL_SEC,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.low = low
+        self.high = high
+        self.sample = sample
+        self.interval_sec = interval_sec
+        self.clock = clock
+        self.last_check = clock()
+        self.streak = 0  # > 0 samples asking to grow, < 0 to shrink
+        self.changes = 0
+
+    def decide(self, current: int, sample: LoadSample) -> int:
+        if sample.overloaded():
+            self.streak = min(self.streak, 0) - 1
+        elif sample.idle():
+            self.streak = max(self.streak, 0) + 1
+        else:
+            self.streak = 0
+        if abs(self.streak) < CONFIRMATIONS:
+            return current
+        target = current + (1 if self.streak > 0 else -1)
+        target = max(self.low, min(self.high, target))
+        if target != current:
+            self.streak = 0
+            self.changes += 1
+        return target
+
+    def update(self, current: int) -> int:
+        now = self.clock()
+        if now - self.last_check < self.interval_sec:
+            return current
+        self.last_check = now
+        sample = self.sample()
+        target = self.decide(current, sample)
+        if target != current:
+            print(f"autoscale: {current} -> {target} workers ({sample.describe()})")
+        return target
@@ -0,0 +1,287 @@
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Sequence, TypeAlias
+
+from slith.util import FileName, Version, ProcessResult
+from slith.config import Config
+from slith.solc_select import SolcSelector
+from slith.pipeline import ANALYZERS, PreparedContract, prepare_contract
+from slith.outcome import classify
+from slith.usage import record_usage, source_size
+from slith import mythril, slither
+from slith.trace import span
+
+MYTHRIL_ISSUE_RE = re.compile(r"^==== ")
+MYTHRIL_DONE_RE = re.compile(r"^==== |No issues were detected", re.MULTILINE)
+SLITHER_BLOCK_RE = re.compile(r"^(?:INFO|WARNING|ERROR):")
+SLITHER_BLOCK_END_RE = re.compile(r"^Reference: ")
+SLITHER_DONE_RE = re.compile(r"^INFO:Slither:.* analyzed \(", re.MULTILINE)
+
+BatchResults: TypeAlias = dict[FileName, int]
+BatchAnalyzer: TypeAlias = Callable[
+    [Config, list[PreparedContract]], BatchResults | None
+]
+
+
+def split_blocks(
+    text: str, start_re: re.Pattern[str], end_re: re.Pattern[str] | None = None
+) -> list[str]:
+    blocks: list[str] = []
+    current: list[str] = []
+    for line in text.splitlines(keepends=True):
+        if current and start_re.match(line):
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+        if end_re is not None and end_re.match(line):
+            blocks.append("".join(current))
+            current = []
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def _name_re(name: FileName) -> re.Pattern[str]:
+    return re.compile(rf"(?<![\w.-]){re.escape(name)}(?![\w-])")
+
+
+def attribute_blocks(
+    blocks: list[str], names: Sequence[FileName]
+) -> tuple[list[str], dict[FileName, list[str]]]:
+    """Split blocks into those shared by the batch and those about one file."""
+    name_res = {name: _name_re(name) for name in names}
+    shared: list[str] = []
+    per_file: dict[FileName, list[str]] = {}
+    for block in blocks:
+        mentioned = [
+            name for name, name_re in name_res.items() if name_re.search(block)
+        ]
+        if not mentioned:
+            shared.append(block)
+        for name in mentioned:
+            per_file.setdefault(name, []).append(block)
+    return shared, per_file
+
+
+def _split_output(
+    run_result: ProcessResult,
+    names: Sequence[FileName],
+    stdout_blocks: list[str],
+) -> dict[FileName, tuple[bool, str]]:
+    err_shared, err_per_file = attribute_blocks(
+        run_result.stderr.splitlines(keepends=True), names
+    )
+    out_shared, out_per_file = attribute_blocks(stdout_blocks, names)
+    return {
+        name: (
+            name in out_per_file,
+            "".join(err_shared + err_per_file.get(name, []))
+            + "".join(out_shared + out_per_file.get(name, [])),
+        )
+        for name in names
+    }
+
+
+def _batch_extra(
+    config: Config,
+    tool: str,
+    batch: list[PreparedContract],
+    contract: PreparedContract,
+    run_result: ProcessResult,
+    ret_code: int,
+    output: str,
+) -> dict[str, object]:
+    """Front matter of a batch member, recording its usage too.
+
+    The member is classified on its share of the output, and gets a share
+    of the batch's usage in proportion to its size.
+    """
+    outcome = classify(ProcessResult(ret_code, output, "", False)).value
+    sizes = [source_size(member.sol_path, member.sol_text) for member in batch]
+    size = source_size(contract.sol_path, contract.sol_text)
+    usage = None
+    if run_result.usage is not None:
+        usage = run_result.usage.share(size / (sum(sizes) or 1))
+    record_usage(
+        config, tool, contract.sol_path.name, contract.version, size, outcome, usage
+    )
+    front = {} if usage is None else usage.front_matter()
+    return {"outcome": outcome, "batch": len(batch), **front}
+
+
+def mythril_batch(config: Config, batch: list[PreparedContract]) -> BatchResults | None:
+    run_result = mythril.subrun(
+        ["myth", "a", *(str(contract.sol_path) for contract in batch)],
+        timeout_sec=config.mythril_timeout_sec * len(batch),
+    )
+    if run_result.timed_out or not MYTHRIL_DONE_RE.search(run_result.stdout):
+        return None
+    names = [contract.sol_path.name for contract in batch]
+    outputs = _split_output(
+        run_result, names, split_blocks(run_result.stdout, MYTHRIL_ISSUE_RE)
+    )
+    results: BatchResults = {}
+    for contract in batch:
+        has_issues, output = outputs[contract.sol_path.name]
+        ret_code = run_result.returncode if has_issues else 0
+        results[contract.sol_path.name] = mythril.write_mythril_result(
+            config,
+            contract.index,
+            contract.sol_path,
+            contract.sol_text,
+            contract.found_version,
+            contract.version,
+            ret_code,
+            output,
+            _batch_extra(
+                config, "mythril", batch, contract, run_result, ret_code, output
+            ),
+        )
+    return results
+
+
+def slither_batch(config: Config, batch: list[PreparedContract]) -> BatchResults | None:
+    names = [contract.sol_path.name for contract in batch]
+    with tempfile.TemporaryDirectory(prefix="slith-batch-") as tmp:
+        for contract in batch:
+            (Path(tmp) / contract.sol_path.name).symlink_to(contract.sol_path.resolve())
+        json_path = Path(tmp) / "slither.json"
+        run_result = slither.subrun(
+            [
+                "slither",
+                f"{tmp}/*.sol",
+                *slither.profile_args(config),
+                "--json",
+                str(json_path),
+            ],
+            timeout_sec=config.slither_timeout_sec * len(batch),
+        )
+        found = slither.json_extra_by_file(json_path, names)
+    if run_result.timed_out or not SLITHER_DONE_RE.search(run_result.stderr):
+        return None
+    blocks = split_blocks(run_result.stderr, SLITHER_BLOCK_RE, SLITHER_BLOCK_END_RE)
+    shared, findings = attribute_blocks(blocks, names)
+    results: BatchResults = {}
+    for contract in batch:
+        name = contract.sol_path.name
+        output = "".join(shared + findings.get(name, []))
+        ret_code = run_result.returncode if name in findings else 0
+        extra = _batch_extra(
+            config, "slither", batch, contract, run_result, ret_code, output
+        )
+        results[name] = slither.write_slither_result(
+            config,
+            contract.index,
+            contract.sol_path,
+            contract.sol_text,
+            contract.found_version,
+            contract.version,
+            ret_code,
+            output,
+            {
+                "outcome": extra.pop("outcome"),
+                "profile": config.slither_profile,
+                **found.get(name, {}),
+                **extra,
+            },
+        )
+    return results
+
+
+BATCH_ANALYZERS: dict[str, BatchAnalyzer] = {
+    "mythril": mythril_batch,
+    "slither": slither_batch,
+}
+
+
+def run_batch_analyzer(
+    config: Config, name: str, batch: list[PreparedContract], track: str | None = None
+) -> BatchResults:
+    if config.trace is None:
+        return _run_batch_analyzer(config, name, batch)
+    with config.trace.on_track(track or config.trace.current_track()):
+        with config.trace.span(name, "analyzer", batch=len(batch)):
+            return _run_batch_analyzer(config, name, batch)
+
+
+def _run_batch_analyzer(
+    config: Config, name: str, batch: list[PreparedContract]
+) -> BatchResults:
+    results = BATCH_ANALYZERS[name](config, batch) if len(batch) > 1 else None
+    if results is not None:
+        return results
+    return {
+        contract.sol_path.name: ANALYZERS[name](config, contract) for contract in batch
+    }
+
+
+def analyze_batch(
+    config: Config,
+    solc_sel: SolcSelector,
+    batch: list[PreparedContract],
+    analyzers: Sequence[str],
+) -> dict[FileName, dict[str, int]]:
+    with span(config.trace, "solc use", "solc", version=batch[0].version):
+        solc_sel.solc_use(batch[0].version)
+    worker = "" if config.trace is None else config.trace.current_track()
+    with ThreadPoolExecutor(max_workers=len(analyzers)) as pool:
+        futures = {
+            name: pool.submit(
+                run_batch_analyzer, config, name, batch, f"{worker}/{name}"
+            )
+            for name in analyzers
+        }
+        per_tool = {name: future.result() for name, future in futures.items()}
+    return {
+        contract.sol_path.name: {
+            name: results[contract.sol_path.name] for name, results in per_tool.items()
+        }
+        for contract in batch
+    }
+
+
+class Batcher:
+    def __init__(
+        self, config: Config, solc_sel: SolcSelector, analyzers: Sequence[str]
+    ) -> None:
+        self.config = config
+        self.solc_sel = solc_sel
+        self.analyzers = analyzers
+        self.pending: dict[Version, list[PreparedContract]] = {}
+        self.pending_bytes: dict[Version, int] = {}
+
+    def _analyze(self, batch: list[PreparedContract]) -> dict[FileName, dict[str, int]]:
+        return analyze_batch(self.config, self.solc_sel, batch, self.analyzers)
+
+    def add(
+        self, index: int, sol_path: Path, sol_text: str
+    ) -> dict[FileName, dict[str, int]]:
+        with span(self.config.trace, "resolve version", "solc", contract=sol_path.name):
+            contract = prepare_contract(
+                self.solc_sel, index, sol_path, sol_text, self.config.version_search
+            )
+        size = len(sol_text)
+        if size > self.config.batch_small_bytes:
+            return self._analyze([contract])
+        batch = self.pending.setdefault(contract.version, [])
+        batch.append(contract)
+        total = self.pending_bytes.get(contract.version, 0) + size
+        self.pending_bytes[contract.version] = total
+        if (
+            total < self.config.batch_max_bytes
+            and len(batch) < self.config.batch_max_files
+        ):
+            return {}
+        del self.pending[contract.version]
+        del self.pending_bytes[contract.version]
+        return self._analyze(batch)
+
+    def flush(self) -> dict[FileName, dict[str, int]]:
+        results: dict[FileName, dict[str, int]] = {}
+        for version in sorted(self.pending):
+            results.update(self._analyze(self.pending[version]))
+        self.pending.clear()
+        self.pending_bytes.clear()
+        return results
@@ -0,0 +1,117 @@
+import time
+from pathlib import Path
+from typing import Sequence
+
+from slith.util import FileName
+from slith.config import Config
+from slith.mythril import WALL_MARGIN_SEC, MythrilLimits
+from slith.risk import CostPredictor
+from slith.usage import load_usage
+
+MIN_EXECUTION_SEC = 30.0
+MAX_EXECUTION_SEC = 4 * 3600.0
+# Execution seconds from which a contract gets a solver timeout (ms), a max
+# depth and a transaction count; a short allowance explores shallower.
+TIERS = [
+    (0.0, 4_000, 22, 1),
+    (120.0, 10_000, 50, 2),
+    (900.0, 25_000, 128, 3),
+]
+
+
+def limits_for(execution_sec: float) -> MythrilLimits:
+    execution_sec = max(MIN_EXECUTION_SEC, min(MAX_EXECUTION_SEC, execution_sec))
+    _, solver_ms, depth, transactions = [
+        tier for tier in TIERS if tier[0] <= execution_sec
+    ][-1]
+    return MythrilLimits(execution_sec, solver_ms, depth, transactions)
+
+
+def split_budget(budget_sec: float, predicted: dict[FileName, float]) -> float:
+    """How much of its predicted time each contract gets, the same for all."""
+    total = sum(predicted.values())
+    return budget_sec / total if total > 0 else 1.0
+
+
+def fit_budget(
+    budget_sec: float, predicted: dict[FileName, float]
+) -> dict[FileName, float]:
+    """Execution seconds per contract, clamped, summing to at most the budget.
+
+    Contracts clamped to MIN_EXECUTION_SEC or MAX_EXECUTION_SEC take their
+    clamped time out of the budget and the rest is split again among the
+    others, until none moves.
+    """
+    fixed: dict[FileName, float] = {}
+    while True:
+        free = {name: cost for name, cost in predicted.items() if name not in fixed}
+        factor = split_budget(max(0.0, budget_sec - sum(fixed.values())), free)
+        clamped = {
+            name: max(MIN_EXECUTION_SEC, min(MAX_EXECUTION_SEC, cost * factor))
+            for name, cost in free.items()
+        }
+        moved = {
+            name: sec for name, sec in clamped.items() if sec != free[name] * factor
+        }
+        if not moved:
+            return fixed | clamped
+        fixed |= moved
+
+
+def plan_budget(
+    config: Config, contracts: Sequence[Path]
+) -> dict[FileName, MythrilLimits]:
+    """Mythril limits per contract so the run fits in the budget.
+
+    The budget is mythril_budget_hours on each of the workers; after the
+    wall margin of every run, each contract gets a share in proportion to
+    its predicted CPU time. Retries get what is left when the run is done.
+    """
+    assert config.mythril_budget_hours is not None
+    costs = CostPredictor(load_usage(config.usage_log))
+    predicted = {
+        sol_path.name: costs.predict_one(
+            "mythril", sol_path.name, sol_path.stat().st_size
+        )
+        for sol_path in contracts
+    }
+    config.mythril_deadline = time.monotonic() + config.mythril_budget_hours * 3600
+    budget_sec = config.mythril_budget_hours * 3600 * config.workers
+    execution_sec = fit_budget(budget_sec - len(predicted) * WALL_MARGIN_SEC, predicted)
+    planned = sum(execution_sec.values()) + len(predicted) * WALL_MARGIN_SEC
+    print(
+        f"budget: {config.mythril_budget_hours:g} h on {config.workers} workers, "
+        f"{len(predicted)} contracts predicted at "
+        f"{sum(predicted.values()) / 3600:.1f} CPU hours of mythril, "
+        f"{planned / 3600:.1f} h planned"
+    )
+    if planned > budget_sec:
+        print(
+            f"budget: too small for {len(predicted)} contracts at "
+            f"{MIN_EXECUTION_SEC + WALL_MARGIN_SEC:g} s each, over by "
+            f"{(planned - budget_sec) / 3600:.1f} h"
+        )
+    return {name: limits_for(sec) for name, sec in execution_sec.items()}
+
+
+def retry_execution_sec(config: Config) -> float | None:
+    """Execution seconds a mythril retry may still take, None without a budget."""
+    if config.mythril_deadline is None:
+        return None
+    return config.mythril_deadline - time.monotonic() - WALL_MARGIN_SEC
+
+
+def attempt_limits(
+    config: Config, limits: MythrilLimits, attempt: int
+) -> MythrilLimits:
+    """The limits grown for an attempt, cut to what is left of the budget."""
+    limits = limits.scaled(config.retry_factor**attempt)
+    left_sec = retry_execution_sec(config)
+    if left_sec is not None and limits.execution_timeout_sec > left_sec > 0:
+        limits = limits.scaled(left_sec / limits.execution_timeout_sec)
+    return limits
+
+
+def budget_spent(config: Config) -> bool:
+    left_sec = retry_execution_sec(config)
+    return left_sec is not None and left_sec < MIN_EXECUTION_SEC
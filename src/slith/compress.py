@@ -0,0 +1,137 @@
+import random
+import threading
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterator
+
+from slith.config import Config
+
+ZSTD_SUFFIX = ".zst"
+CURRENT_DICT = "current"
+SAMPLE_SIZE = 2000
+DICT_SIZE = 112 * 1024
+
+
+def _zstd() -> ModuleType:
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise RuntimeError(
+            "Compressed storage needs the zstandard package: "
+            "install slith with the 'zstd' extra"
+        ) from exc
+    return zstandard
+
+
+def compressed_path(path: Path) -> Path:
+    return path.with_name(path.name + ZSTD_SUFFIX)
+
+
+def plain_path(path: Path) -> Path:
+    return path.with_name(path.name.removesuffix(ZSTD_SUFFIX))
+
+
+class Codec:
+    """zstd compression with the current shared dictionary of a results tree.
+
+    Every dictionary ever trained is kept by id, so frames written with an
+    older dictionary can still be read after retraining.
+    """
+
+    def __init__(self, dicts_dir: Path, level: int = 9) -> None:
+        self.dicts_dir = dicts_dir
+        self.level = level
+        self.zstd = _zstd()
+        self.dicts: dict[int, Any] = {}
+        self.lock = threading.Lock()
+        current = dicts_dir / CURRENT_DICT
+        self.dict_id = int(current.read_text()) if current.exists() else 0
+        self.compressor = self._compressor()
+
+    def _compressor(self) -> Any:
+        if not self.dict_id:
+            return self.zstd.ZstdCompressor(level=self.level)
+        return self.zstd.ZstdCompressor(
+            level=self.level, dict_data=self._dict(self.dict_id)
+        )
+
+    def _dict(self, dict_id: int) -> Any:
+        if dict_id not in self.dicts:
+            data = (self.dicts_dir / f"{dict_id}.dict").read_bytes()
+            self.dicts[dict_id] = self.zstd.ZstdCompressionDict(data)
+        return self.dicts[dict_id]
+
+    def compress(self, text: str) -> bytes:
+        with self.lock:
+            return bytes(self.compressor.compress(text.encode()))
+
+    def decompress(self, data: bytes) -> str:
+        dict_id = self.zstd.get_frame_parameters(data).dict_id
+        with self.lock:
+            if dict_id:
+                dict_data = self._dict(dict_id)
+                decompressor = self.zstd.ZstdDecompressor(dict_data=dict_data)
+            else:
+                decompressor = self.zstd.ZstdDecompressor()
+        return bytes(decompressor.decompress(data)).decode(errors="replace")
+
+    def train(self, samples: list[bytes], dict_size: int = DICT_SIZE) -> int:
+        trained = self.zstd.train_dictionary(dict_size, samples)
+        self.dicts_dir.mkdir(parents=True, exist_ok=True)
+        dict_id = int(trained.dict_id())
+        (self.dicts_dir / f"{dict_id}.dict").write_bytes(trained.as_bytes())
+        (self.dicts_dir / CURRENT_DICT).write_text(f"{dict_id}\n")
+        self.dicts[dict_id] = trained
+        self.dict_id = dict_id
+        self.compressor = self._compressor()
+        return dict_id
+
+
+def result_files(config: Config) -> Iterator[Path]:
+    for tool in ("mythril", "slither", None):
+        for directory in config.tool_results_dirs(tool):
+            if directory.exists():
+                yield from (p for p in directory.iterdir() if p.is_file())
+
+
+def read_any(codec: Codec | None, path: Path) -> str:
+    if path.suffix != ZSTD_SUFFIX:
+        return path.read_text(errors="replace")
+    if codec is None:
+        raise RuntimeError(f"{path} is compressed, but no codec was given")
+    return codec.decompress(path.read_bytes())
+
+
+def train_from_results(
+    config: Config,
+    codec: Codec,
+    sample_size: int = SAMPLE_SIZE,
+    dict_size: int = DICT_SIZE,
+    seed: int = 0,
+) -> int:
+    files = sorted(
+        path
+        for tool in ("mythril", "slither")
+        for directory in config.tool_results_dirs(tool)
+        if directory.exists()
+        for path in directory.iterdir()
+    )
+    sample = random.Random(seed).sample(files, min(sample_size, len(files)))
+    return codec.train([read_any(codec, path).encode() for path in sample], dict_size)
+
+
+def recompress(config: Config, codec: Codec) -> tuple[int, int]:
+    before = after = 0
+    for path in result_files(config):
+        if path.stat().st_nlink > 1:
+            continue  # a source shared by the 'link' storage mode
+        before += path.stat().st_size
+        data = codec.compress(read_any(codec, path))
+        dest = compressed_path(plain_path(path))
+        tmp = dest.with_name(dest.name + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(dest)
+        if path != dest:
+            path.unlink()
+        after += len(data)
+    return before, after
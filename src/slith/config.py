@@ -1,17 +1,46 @@
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Iterator
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+from slith.util import FileName
+from slith.summary import SUMMARY_NAME
+from slith.shard import Shard, ShardKey
+from slith.writer import ResultWriter
+
+if TYPE_CHECKING:
+    from slith.compress import Codec
+    from slith.mythril import MythrilLimits
+    from slith.progress import Progress
+    from slith.trace import TraceRecorder
+    from slith.version_search import VersionSearch
 
 
 @dataclass
 class Config:
     data_dir = Path("../data")
+    mythril_timeout_sec = 120.0
+    slither_timeout_sec = 600.0
+    compress_level = 9
+    retries = 2
+    retry_factor = 2.0
+    batch_small_bytes = 8 * 1024
+    batch_max_bytes = 64 * 1024
+    batch_max_files = 32
+    workers = 1
+    mem_headroom_mb = 1024
+    triage_sample = 0.02
+    triage_seed = 0
+    sample_seed = 0
     patched_contracts_old: Path
     contracts_meta: Path
     results_base_dir: Path
     contracts_ok: Path
     contracts_fail: Path
     contracts_errors: Path
+    contracts_parse_status: Path
+    manifest: Path
+    version_cache: Path
+    risk_scores: Path
     results_255: Path
     results_1: Path
     results_other: Path
@@ -23,14 +52,60 @@ class Config:
     mythril_results_255: Path
     mythril_results_1: Path
     mythril_results_other: Path
+    run_summary: Path
+    watch_latency: Path
+    progress_snapshot: Path
+    usage_log: Path
+    report_index: Path
+    zstd_dicts_dir: Path
+    shard: Shard | None
+    shard_key: ShardKey
+    queue_path: Path | None
+    lease_sec: float
+    analyzers: Sequence[str]
+    slither_profile: str
+    parse_backend: str
+    parse_prefilter: bool
+    batch: bool
+    storage_mode: str
+    write_behind: bool
+    fsync: bool
+    writer: ResultWriter | None
+    compress: bool
+    incremental: bool
+    changed_list: Path | None
+    codec: "Codec | None"
+    search_versions: bool
+    version_search: "VersionSearch | None"
+    progress_mode: str
+    progress: "Progress | None"
+    trace_path: Path | None
+    trace: "TraceRecorder | None"
+    min_workers: int | None
+    pin_cpus: bool
+    prioritize: bool
+    triage: bool
+    triage_detectors: frozenset[str]
+    triage_impacts: frozenset[str]
+    mythril_budget_hours: float | None
+    sample_size: int | None
+    mythril_limits: "dict[FileName, MythrilLimits] | None"
+    mythril_deadline: float | None  # time.monotonic() when the budget runs out
+    made_dirs: set[Path]
 
-    def __init__(self) -> None:
+    def __init__(self, data_dir: Path | None = None) -> None:
+        if data_dir is not None:
+            self.data_dir = data_dir
         self.patched_contracts_old = self.data_dir / "patched_contracts_old"
         self.contracts_meta = self.data_dir / "meta"
         self.results_base_dir = self.data_dir / "results"
         self.contracts_ok = self.contracts_meta / "contracts_parse_ok.txt"
         self.contracts_fail = self.contracts_meta / "contracts_parse_fail.txt"
         self.contracts_errors = self.contracts_meta / "errors"
+        self.contracts_parse_status = self.contracts_meta / "contracts_parse_status.txt"
+        self.manifest = self.contracts_meta / "manifest.json"
+        self.version_cache = self.contracts_meta / "solc_versions.tsv"
+        self.risk_scores = self.contracts_meta / "risk_scores.tsv"
         self.results_255 = self.results_base_dir / "ret_255"
         self.results_1 = self.results_base_dir / "ret_1"
         self.results_other = self.results_base_dir / "ret_other"
@@ -45,21 +120,82 @@ class Config:
         self.mythril_results_1 = self.mythril_results_base_dir / "ret_1"
         self.mythril_results_other = self.mythril_results_base_dir / "ret_other"
 
-        def mkd(f: Path) -> None:
-            f.mkdir(parents=True, exist_ok=True)
+        self.run_summary = self.results_base_dir / SUMMARY_NAME
+        self.zstd_dicts_dir = self.results_base_dir / "zstd_dicts"
+        self.watch_latency = self.results_base_dir / "watch_latency.jsonl"
+        self.progress_snapshot = self.results_base_dir / "progress.json"
+        self.usage_log = self.results_base_dir / "usage.jsonl"
+        self.report_index = self.results_base_dir / "report_index.bin"
+
+        self.shard = None
+        self.shard_key = ShardKey.NAME
+        self.queue_path = None
+        self.lease_sec = 600.0
+        self.analyzers = ("mythril",)
+        self.slither_profile = "full"
+        self.parse_backend = "antlr"
+        self.parse_prefilter = True
+        self.batch = False
+        self.storage_mode = "copy"
+        self.write_behind = False
+        self.fsync = True
+        self.writer = None
+        self.compress = False
+        self.incremental = False
+        self.changed_list = None
+        self.codec = None
+        self.search_versions = False
+        self.version_search = None
+        self.progress_mode = "off"
+        self.progress = None
+        self.trace_path = None
+        self.trace = None
+        self.min_workers = None
+        self.pin_cpus = False
+        self.prioritize = False
+        self.triage = False
+        self.triage_detectors = frozenset()
+        self.triage_impacts = frozenset({"High"})
+        self.mythril_budget_hours = None
+        self.sample_size = None
+        self.mythril_limits = None
+        self.mythril_deadline = None
+
+        self.made_dirs = set()
+
+    def ensure_dir(self, directory: Path) -> Path:
+        """Create a directory on first write into it, once per run."""
+        if directory not in self.made_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.made_dirs.add(directory)
+        return directory
+
+    def make_dirs(self) -> None:
+        for directory in [
+            self.contracts_meta,
+            self.contracts_errors,
+            *self.tool_results_dirs(None),
+            *self.tool_results_dirs("slither"),
+            *self.tool_results_dirs("mythril"),
+        ]:
+            self.ensure_dir(directory)
 
-        mkd(self.contracts_meta)
-        mkd(self.contracts_errors)
-        mkd(self.results_255)
-        mkd(self.results_1)
-        mkd(self.results_other)
-        mkd(self.contracts_errors)
-        mkd(self.slither_results_255)
-        mkd(self.slither_results_1)
-        mkd(self.slither_results_other)
-        mkd(self.mythril_results_255)
-        mkd(self.mythril_results_1)
-        mkd(self.mythril_results_other)
+    def tool_results_dirs(self, tool: str | None) -> list[Path]:
+        match tool:
+            case "mythril":
+                return [
+                    self.mythril_results_255,
+                    self.mythril_results_1,
+                    self.mythril_results_other,
+                ]
+            case "slither":
+                return [
+                    self.slither_results_255,
+                    self.slither_results_1,
+                    self.slither_results_other,
+                ]
+            case _:
+                return [self.results_255, self.results_1, self.results_other]
 
     def contracts_glob(self) -> Iterator[Path]:
         return self.patched_contracts_old.glob("*.sol")
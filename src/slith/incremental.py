@@ -0,0 +1,107 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from slith.util import FileName
+from slith.config import Config
+from slith.compress import compressed_path
+from slith.storage import REF_SUFFIX
+
+Manifest = dict[FileName, str]
+
+
+@dataclass
+class Changes:
+    changed: list[Path] = field(default_factory=list)
+    deleted: list[FileName] = field(default_factory=list)
+    manifest: Manifest = field(default_factory=dict)
+
+    def stale(self) -> list[FileName]:
+        return [sol_path.name for sol_path in self.changed] + self.deleted
+
+
+def content_hash(sol_path: Path) -> str:
+    return hashlib.blake2b(sol_path.read_bytes(), digest_size=16).hexdigest()
+
+
+def result_key(config: Config, sol_path: Path) -> str:
+    """The content hash, plus the slither profile unless it is the full one.
+
+    A change of profile then reruns the contracts, while manifests written
+    before profiles existed stay valid.
+    """
+    digest = content_hash(sol_path)
+    if "slither" in config.analyzers and config.slither_profile != "full":
+        return f"{digest}:{config.slither_profile}"
+    return digest
+
+
+def load_manifest(path: Path) -> Manifest:
+    if not path.exists():
+        return {}
+    return {
+        str(name): str(digest) for name, digest in json.loads(path.read_text()).items()
+    }
+
+
+def save_manifest(path: Path, manifest: Manifest) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=0, sort_keys=True))
+    tmp_path.replace(path)
+
+
+def changes_from_manifest(
+    manifest: Manifest,
+    contracts: Iterable[Path],
+    key: Callable[[Path], str] = content_hash,
+) -> Changes:
+    changes = Changes()
+    for sol_path in contracts:
+        digest = key(sol_path)
+        changes.manifest[sol_path.name] = digest
+        if manifest.get(sol_path.name) != digest:
+            changes.changed.append(sol_path)
+    changes.deleted = sorted(manifest.keys() - changes.manifest.keys())
+    return changes
+
+
+def changes_from_list(
+    config: Config, manifest: Manifest, changed_names: Iterable[str]
+) -> Changes:
+    changes = Changes(manifest=dict(manifest))
+    for name in sorted(
+        {Path(line.strip()).name for line in changed_names if line.strip()}
+    ):
+        sol_path = config.patched_contracts_old / name
+        if sol_path.exists():
+            changes.manifest[name] = result_key(config, sol_path)
+            changes.changed.append(sol_path)
+        else:
+            changes.manifest.pop(name, None)
+            changes.deleted.append(name)
+    return changes
+
+
+def remove_results(
+    config: Config, name: FileName, tools: Iterable[str] = ("mythril", "slither")
+) -> int:
+    tools = tuple(tools)
+    txt_name = Path(name).with_suffix(".txt").name
+    candidates = [
+        directory / txt_name
+        for tool in tools
+        for directory in config.tool_results_dirs(tool)
+    ]
+    if "slither" in tools:  # only slither keeps the source in the out dirs
+        for directory in config.tool_results_dirs(None):
+            candidates += [directory / name, directory / (name + REF_SUFFIX)]
+    removed = 0
+    for path in candidates:
+        for variant in (path, compressed_path(path)):
+            if variant.exists():
+                variant.unlink()
+                removed += 1
+    return removed
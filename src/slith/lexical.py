@@ -0,0 +1,76 @@
+import re
+
+COMMENT_OR_STRING_RE = re.compile(
+    r"""//[^\n]*|/\*.*?(?:\*/|\Z)|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'""",
+    re.DOTALL,
+)
+UNIT_KEYWORD_RE = re.compile(r"\b(?:contract|library|interface)\s+\w+")
+CLOSING = {")": "(", "]": "[", "}": "{"}
+# Constructs behind most of the findings worth a look first, with weights;
+# each counts at most RISK_HITS times so that long files do not win on size.
+RISK_PATTERNS = [
+    (re.compile(r"\bdelegatecall\b"), 5),
+    (re.compile(r"\b(?:selfdestruct|suicide)\s*\("), 5),
+    (re.compile(r"\.call\s*(?:\{\s*value\s*:|\.value\s*\()"), 4),
+    (re.compile(r"\btx\s*\.\s*origin\b"), 3),
+    (re.compile(r'\bassembly\s*(?:""\s*)?\{'), 2),  # a dialect string is blanked
+    (
+        re.compile(
+            r"\b(?:function\b[^{;(]*|receive\s*|fallback\s*)\([^)]*\)[^{;]*\bpayable\b"
+        ),
+        1,
+    ),
+]
+RISK_HITS = 3
+
+
+def _blank(match: re.Match[str]) -> str:
+    text = match.group()
+    if text.startswith(("'", '"')):
+        return text[0] * 2
+    return " "
+
+
+def strip_comments_and_strings(sol_text: str) -> str:
+    return COMMENT_OR_STRING_RE.sub(_blank, sol_text)
+
+
+def unbalanced(code: str) -> str | None:
+    stack: list[str] = []
+    for char in code:
+        if char in "([{":
+            stack.append(char)
+        elif char in CLOSING:
+            if not stack or stack.pop() != CLOSING[char]:
+                return f"unexpected '{char}'"
+    if stack:
+        return f"unclosed '{stack[-1]}'"
+    return None
+
+
+def risk_score(code: str) -> int:
+    """Weighted count of risky constructs in code without comments and strings."""
+    score = 0
+    for pattern, weight in RISK_PATTERNS:
+        hits = 0
+        for _ in pattern.finditer(code):
+            hits += 1
+            if hits == RISK_HITS:
+                break
+        score += weight * hits
+    return score
+
+
+def scan(sol_text: str) -> tuple[str | None, int]:
+    """The prefilter verdict and the risk score, stripping the source once."""
+    if "\0" in sol_text:
+        return "binary content", 0
+    code = strip_comments_and_strings(sol_text)
+    if UNIT_KEYWORD_RE.search(code) is None:
+        return "no contract, library or interface", 0
+    return unbalanced(code), risk_score(code)
+
+
+def prefilter(sol_text: str) -> str | None:
+    """Return why the source is obviously not Solidity, None if it may be."""
+    return scan(sol_text)[0]
@@ -0,0 +1,76 @@
+import shutil
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from slith.util import FileName
+from slith.summary import SUMMARY_NAME, RunSummary, load_summary
+
+
+@dataclass
+class MergeReport:
+    missing: dict[str, list[FileName]] = field(default_factory=dict)
+    duplicates: dict[str, list[FileName]] = field(default_factory=dict)
+    conflicting_files: list[Path] = field(default_factory=list)
+
+    def ok(self) -> bool:
+        return not (
+            any(self.missing.values())
+            or any(self.duplicates.values())
+            or self.conflicting_files
+        )
+
+    def lines(self) -> list[str]:
+        lines: list[str] = []
+        for tool, names in sorted(self.missing.items()):
+            lines.extend(f"missing {tool}: {name}" for name in names)
+        for tool, names in sorted(self.duplicates.items()):
+            lines.extend(f"duplicate {tool}: {name}" for name in names)
+        lines.extend(f"conflict: {path}" for path in self.conflicting_files)
+        return lines
+
+
+def _copy_tree(src_dir: Path, dest_dir: Path, report: MergeReport) -> None:
+    for src in sorted(src_dir.rglob("*")):
+        if not src.is_file() or src.name == SUMMARY_NAME:
+            continue
+        rel = src.relative_to(src_dir)
+        dest = dest_dir / rel
+        if dest.exists():
+            if dest.read_bytes() != src.read_bytes():
+                report.conflicting_files.append(rel)
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dest)
+
+
+def merge_results(
+    dest_dir: Path,
+    shard_dirs: list[Path],
+    expected: set[FileName],
+    tools: Iterable[str],
+) -> tuple[RunSummary, MergeReport]:
+    """Merge shard results into dest_dir, reporting gaps and clashes.
+
+    Every expected contract is checked for every tool in tools and every
+    tool some shard recorded, so a tool no shard got to is all missing.
+    """
+    merged = RunSummary()
+    report = MergeReport()
+    seen: dict[str, dict[FileName, Path]] = {}
+    for shard_dir in shard_dirs:
+        _copy_tree(shard_dir, dest_dir, report)
+        summary = load_summary(shard_dir / SUMMARY_NAME)
+        for tool, results in summary.results.items():
+            tool_seen = seen.setdefault(tool, {})
+            for name, ret_code in results.items():
+                if name in tool_seen:
+                    report.duplicates.setdefault(tool, []).append(name)
+                    continue
+                tool_seen[name] = shard_dir
+                merged.record(tool, name, ret_code)
+    for tool in sorted(set(tools) | merged.results.keys()):
+        results = merged.results.get(tool, {})
+        report.missing[tool] = sorted(expected - results.keys())
+    merged.save(dest_dir / SUMMARY_NAME)
+    return merged, report
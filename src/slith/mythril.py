@@ -1,5 +1,6 @@
 import os
 import sys
+from dataclasses import dataclass
 from pathlib import Path
 from subprocess import CompletedProcess
 # import io
@@ -8,16 +9,68 @@ from subprocess import CompletedProcess
 
 # from mythril.interfaces.cli import main as mythril_main
 
-from slith.util import FileName, Version, run_with_timeout, ProcessResult
+from slith.util import (
+    FileName,
+    Version,
+    run_with_timeout,
+    ProcessResult,
+    front_matter_lines,
+)
 from slith.config import Config
+from slith.outcome import classify
+from slith.usage import record_usage, source_size
+from slith.storage import write_result
 from slith.solc_select import SolcSelector
 from slith.pragma_solidity import (
     RichVersion,
     version_from_pragma,
 )
 
+WALL_MARGIN_SEC = 60.0  # compiling and reporting come on top of execution
+
+
+@dataclass(frozen=True)
+class MythrilLimits:
+    execution_timeout_sec: float
+    solver_timeout_ms: int
+    max_depth: int
+    transaction_count: int
+
+    def scaled(self, factor: float) -> "MythrilLimits":
+        return MythrilLimits(
+            self.execution_timeout_sec * factor,
+            self.solver_timeout_ms,
+            self.max_depth,
+            self.transaction_count,
+        )
+
+    def args(self) -> list[str]:
+        return [
+            "--execution-timeout",
+            str(round(self.execution_timeout_sec)),
+            "--solver-timeout",
+            str(self.solver_timeout_ms),
+            "--max-depth",
+            str(self.max_depth),
+            "-t",
+            str(self.transaction_count),
+        ]
+
+    def wall_timeout_sec(self) -> float:
+        return self.execution_timeout_sec + WALL_MARGIN_SEC
 
-def subrun(cmd: list[str]) -> ProcessResult:
+    def front_matter(self) -> dict[str, object]:
+        return {
+            "execution_timeout_sec": round(self.execution_timeout_sec),
+            "solver_timeout_ms": self.solver_timeout_ms,
+            "max_depth": self.max_depth,
+            "transaction_count": self.transaction_count,
+        }
+
+
+def subrun(
+    cmd: list[str], timeout_sec: float = 120, env: dict[str, str] | None = None
+) -> ProcessResult:
     # orig_path = os.environ.get("PATH")
     # VIRTUAL_ENV = "/home/g4/_prj/leo/silver/mythril01/yourthril"
     # PATH = f"{VIRTUAL_ENV}/bin:{orig_path}"
@@ -28,8 +81,8 @@ def subrun(cmd: list[str]) -> ProcessResult:
     return run_with_timeout(
         cmd,
         #    env=new_env,
-        env=None,
-        timeout_sec=120,
+        env=env,
+        timeout_sec=timeout_sec,
     )
 
 
@@ -49,6 +102,7 @@ def front_matter(
     found_version: Version | None,
     version: Version,
     ret_code: int,
+    extra: dict[str, object] | None = None,
 ) -> str:
     return (
         "mythril:\n"
@@ -57,29 +111,79 @@ def front_matter(
         f'  found_version: {found_version}\n'
         f'  checked_version: {version}\n'
         f"  ret_code: {ret_code}\n"
+        f"{front_matter_lines(extra)}"
         f"{'=' * 3}\n\n"
     )
 
 
-def do_mythril_one_sol(
+def write_mythril_result(
     config: Config,
     index: int,
     sol_path: Path,
     sol_text: str,
     found_version: Version | None,
     version: Version,
-) -> None:
-    run_result = subrun(["myth", "a", str(sol_path)])
-    ret_code = run_result.returncode
+    ret_code: int,
+    output: str,
+    extra: dict[str, object] | None = None,
+) -> int:
     print(f"{index:05d} {sol_path.name}: {ret_code}")
     mythril_block = (
-        f"{front_matter(index, sol_path, found_version, version, ret_code)}"
-        f"{run_result.stderr}"
-        f"{run_result.stdout}"
+        f"{front_matter(index, sol_path, found_version, version, ret_code, extra)}"
+        f"{output}"
     )
     out_dir, mythril_dir = dirs_from_ret_code(config, ret_code)
     # (out_dir / sol_path.name).write_text(out_text(mythril_block, sol_text))
-    (mythril_dir / sol_path.with_suffix(".txt").name).write_text(mythril_block)
+    write_result(
+        config, mythril_dir / sol_path.with_suffix(".txt").name, mythril_block
+    )
+    return ret_code
+
+
+def do_mythril_one_sol(
+    config: Config,
+    index: int,
+    sol_path: Path,
+    sol_text: str,
+    found_version: Version | None,
+    version: Version,
+    timeout_sec: float = 120,
+    env: dict[str, str] | None = None,
+    extra: dict[str, object] | None = None,
+    limits: MythrilLimits | None = None,
+) -> int:
+    limit_args: list[str] = []
+    if limits is not None:
+        limit_args = limits.args()
+        timeout_sec = limits.wall_timeout_sec()
+        extra = {**limits.front_matter(), **(extra or {})}
+    run_result = subrun(
+        ["myth", "a", str(sol_path), *limit_args],
+        timeout_sec=timeout_sec,
+        env=env,
+    )
+    outcome = classify(run_result).value
+    record_usage(
+        config,
+        "mythril",
+        sol_path.name,
+        version,
+        source_size(sol_path, sol_text),
+        outcome,
+        run_result.usage,
+    )
+    usage = {} if run_result.usage is None else run_result.usage.front_matter()
+    return write_mythril_result(
+        config,
+        index,
+        sol_path,
+        sol_text,
+        found_version,
+        version,
+        run_result.returncode,
+        run_result.stderr + run_result.stdout,
+        {"outcome": outcome, **usage, **(extra or {})},
+    )
 
 
 def mythril_one_sol(
@@ -88,10 +192,10 @@ def mythril_one_sol(
     index: int,
     sol_path: Path,
     sol_text: str,
-) -> None:
+) -> int:
     rich_ver: RichVersion = version_from_pragma(solc_sel, sol_text)
     version_to_use = rich_ver.version_to_use(solc_sel)
     solc_sel.solc_use(version_to_use)
-    do_mythril_one_sol(
+    return do_mythril_one_sol(
         config, index, sol_path, sol_text, rich_ver.found_version, version_to_use
     )
@@ -0,0 +1,38 @@
+import re
+from enum import Enum
+
+from slith.util import ProcessResult
+
+TIMEOUT_RET = -1  # the return code run_with_timeout reports for a killed run
+COMPILE_ERROR_RE = re.compile(
+    r"CompilationError|CompilerError|InvalidCompilation|Invalid solc compilation"
+    r"|Solc experienced a fatal error|requires different compiler version"
+    r"|^(?:Parser|Type|Declaration|Syntax)Error:",
+    re.MULTILINE,
+)
+TRACEBACK = "Traceback (most recent call last)"
+
+
+class Outcome(str, Enum):
+    SUCCESS = "success"
+    TIMEOUT = "timeout"
+    COMPILE_ERROR = "compile_error"
+    CRASH = "crash"
+
+
+def classify(run_result: ProcessResult) -> Outcome:
+    if run_result.timed_out:
+        return Outcome.TIMEOUT
+    output = run_result.stderr + run_result.stdout
+    if COMPILE_ERROR_RE.search(output):
+        return Outcome.COMPILE_ERROR
+    if run_result.returncode < 0 or run_result.returncode == 255:
+        return Outcome.CRASH
+    if TRACEBACK in output:
+        return Outcome.CRASH
+    return Outcome.SUCCESS
+
+
+def is_retryable(outcome: Outcome) -> bool:
+    """Only timeouts may go better with a larger budget; the rest repeats."""
+    return outcome == Outcome.TIMEOUT
@@ -1,12 +1,29 @@
+import re
 import sys
+from enum import Enum
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterator, Any
+from typing import Iterable, Iterator, Any
 import io
 import traceback
 from types import TracebackType
-from solidity_parser import parser  # type: ignore
-from slith.util import FileName
+from slith.util import FileName, Version, subrun
 from slith.config import Config
+from slith.lexical import scan
+from slith.startup import phase
+from slith.solc_select import SolcSelector
+from slith.pragma_solidity import version_from_pragma
+from slith.risk import RiskScores
+
+SOLC_BATCH_SIZE = 256
+DIAGNOSTIC_RE = re.compile(r"^(?P<kind>\w+):", re.MULTILINE)
+SOURCE_LOCATION_RE = re.compile(r"^\s*--> (?P<path>.+?):\d+:\d+:", re.MULTILINE)
+
+
+class ParseBackend(str, Enum):
+    ANTLR = "antlr"
+    SOLC = "solc"
+    LEXICAL = "lexical"
 
 
 class ErrRedirect:
@@ -63,30 +80,174 @@ class ErrRedirect:
                 traceback.print_exception(exc_type, exc_value, exc_tb, file=f)
 
 
-def check_contracts_parse(
-    config: Config, contracts: Iterator[Path], limit: int = -1
-) -> None:
-    ok_list: list[str] = []
-    fail_list: list[str] = []
+@dataclass
+class ParseResults:
+    ok_list: list[FileName] = field(default_factory=list)
+    fail_list: list[FileName] = field(default_factory=list)
+    status_lines: list[str] = field(default_factory=list)
+
+    def add(self, name: FileName, ok: bool, backend: ParseBackend) -> None:
+        (self.ok_list if ok else self.fail_list).append(name)
+        self.status_lines.append(f"{name}\t{'ok' if ok else 'fail'}\t{backend.value}")
+        print(f"{name}: {'Ok' if ok else 'Fail'}")
+
+    def extend(self, other: "ParseResults") -> None:
+        self.ok_list.extend(other.ok_list)
+        self.fail_list.extend(other.fail_list)
+        self.status_lines.extend(other.status_lines)
+
+
+def _write_error(config: Config, name: FileName, text: str) -> None:
+    path = (config.contracts_errors / name).with_suffix(".txt")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{name}\n{text}")
+
+
+def _prefilter_parse(
+    config: Config, sol_path: Path, results: ParseResults, scores: RiskScores
+) -> bool:
+    stat = sol_path.stat()
+    reason, score = scan(sol_path.read_text(errors="replace"))
+    if reason is None:
+        scores.put(sol_path.name, stat, score)
+        return True
+    _write_error(config, sol_path.name, f"{reason}\n")
+    results.add(sol_path.name, False, ParseBackend.LEXICAL)
+    return False
+
+
+def _antlr_parse(config: Config, sol_path: Path, results: ParseResults) -> None:
+    with phase("import solidity_parser"):
+        from solidity_parser import parser  # type: ignore  # loads the ANTLR runtime
+
+    with ErrRedirect(config, sol_path.name):
+        try:
+            parser.parse_file(sol_path, loc=False)
+            results.add(sol_path.name, True, ParseBackend.ANTLR)
+        except Exception:
+            results.add(sol_path.name, False, ParseBackend.ANTLR)
+
+
+def solc_diagnostics(stderr: str) -> dict[FileName, list[tuple[str, str]]]:
+    diagnostics: dict[FileName, list[tuple[str, str]]] = {}
+    starts = [mo.start() for mo in DIAGNOSTIC_RE.finditer(stderr)]
+    for begin, end in zip(starts, [*starts[1:], len(stderr)]):
+        block = stderr[begin:end]
+        kind = block.split(":", maxsplit=1)[0]
+        location = SOURCE_LOCATION_RE.search(block)
+        if location is not None:
+            name = Path(location.group("path")).name
+            diagnostics.setdefault(name, []).append((kind, block))
+    return diagnostics
+
+
+def _solc_parse_batch(
+    config: Config, batch: list[Path], results: ParseResults
+) -> list[Path]:
+    run_result = subrun(["solc", "--stop-after", "parsing", *map(str, batch)])
+    diagnostics = solc_diagnostics(run_result.stderr)
+    if run_result.returncode and not diagnostics:
+        return batch
+    for sol_path in batch:
+        blocks = diagnostics.get(sol_path.name, [])
+        failed = any(kind.endswith("Error") for kind, _ in blocks)
+        if failed:
+            _write_error(config, sol_path.name, "".join(block for _, block in blocks))
+        results.add(sol_path.name, not failed, ParseBackend.SOLC)
+    return []
+
+
+def _solc_parse(
+    config: Config, solc_sel: SolcSelector, contracts: list[Path], results: ParseResults
+) -> list[Path]:
+    by_version: dict[Version, list[Path]] = {}
+    for sol_path in contracts:
+        rich_ver = version_from_pragma(solc_sel, sol_path.read_text(errors="replace"))
+        by_version.setdefault(rich_ver.version_to_use(solc_sel), []).append(sol_path)
+    fallback: list[Path] = []
+    for version, paths in sorted(by_version.items()):
+        try:
+            solc_sel.solc_use(version)
+        except Exception:
+            fallback.extend(paths)
+            continue
+        for start in range(0, len(paths), SOLC_BATCH_SIZE):
+            batch = paths[start : start + SOLC_BATCH_SIZE]
+            fallback.extend(_solc_parse_batch(config, batch, results))
+    return fallback
+
+
+def parse_contracts(
+    config: Config,
+    contracts: Iterator[Path],
+    limit: int = -1,
+    solc_sel: SolcSelector | None = None,
+) -> ParseResults:
+    results = ParseResults()
+    scores = RiskScores(config.risk_scores)
+    pending: list[Path] = []
 
     for index, sol_path in enumerate(contracts):
         if 0 <= limit <= index:
             break
+        if not config.parse_prefilter or _prefilter_parse(
+            config, sol_path, results, scores
+        ):
+            pending.append(sol_path)
+    scores.save(config)
 
-        with ErrRedirect(config, sol_path.name):
-            try:
-                parser.parse_file(sol_path, loc=False)
-                ok_list.append(sol_path.name)
-                print(f"{sol_path.name}: Ok")
-            except Exception:
-                fail_list.append(sol_path.name)
-                print(f"{sol_path.name}: Fail")
+    if config.parse_backend == ParseBackend.SOLC and pending:
+        pending = _solc_parse(config, solc_sel or SolcSelector(), pending, results)
+    for sol_path in pending:
+        _antlr_parse(config, sol_path, results)
+    return results
 
-    _write_results(config.contracts_ok, ok_list)
-    _write_results(config.contracts_fail, fail_list)
+
+def _write_parse_results(config: Config, results: ParseResults) -> None:
+    _write_results(config.contracts_ok, results.ok_list)
+    _write_results(config.contracts_fail, results.fail_list)
+    _write_results(config.contracts_parse_status, results.status_lines)
+
+
+def check_contracts_parse(
+    config: Config,
+    contracts: Iterator[Path],
+    limit: int = -1,
+    solc_sel: SolcSelector | None = None,
+) -> None:
+    _write_parse_results(config, parse_contracts(config, contracts, limit, solc_sel))
+
+
+def update_contracts_parse(
+    config: Config,
+    changed: list[Path],
+    deleted: list[FileName],
+    solc_sel: SolcSelector | None = None,
+) -> None:
+    fresh = parse_contracts(config, iter(changed), solc_sel=solc_sel)
+    merge_parse_results(config, fresh, deleted)
+
+
+def merge_parse_results(
+    config: Config, fresh: ParseResults, deleted: Iterable[FileName]
+) -> None:
+    """Replace the entries of fresh and deleted contracts in the parse lists."""
+    stale = set(fresh.ok_list) | set(fresh.fail_list) | set(deleted)
+    results = ParseResults(
+        ok_list=sorted(_read_results(config.contracts_ok) - stale),
+        fail_list=sorted(_read_results(config.contracts_fail) - stale),
+        status_lines=sorted(
+            line
+            for line in _read_results(config.contracts_parse_status)
+            if line.split("\t", maxsplit=1)[0] not in stale
+        ),
+    )
+    results.extend(fresh)
+    _write_parse_results(config, results)
 
 
 def _write_results(file_path: Path, results: list[str]) -> None:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
     with open(file_path, "w") as f:
         f.write("\n".join(results))
         f.write("\n")
@@ -94,8 +255,10 @@ def _write_results(file_path: Path, results: list[str]) -> None:
 
 def names_of_contracts_that_parse(config: Config, limit: int = -1) -> set[FileName]:
     if not config.contracts_ok.exists():
-        check_contracts_parse(config, config.contracts_glob(), limit)
-    return _read_results(config.contracts_ok)
+        with phase("parse check"):
+            check_contracts_parse(config, config.contracts_glob(), limit)
+    with phase("parse lists"):
+        return _read_results(config.contracts_ok)
 
 
 def contracts_that_parse(config: Config) -> Iterator[Path]:
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Sequence, TypeAlias
+
+from slith.util import Version
+from slith.config import Config
+from slith.solc_select import SolcSelector
+from slith.pragma_solidity import RichVersion, version_from_pragma
+from slith.mythril import do_mythril_one_sol
+from slith.budget import attempt_limits
+from slith.slither import do_slither_one_sol
+from slith.version_search import VersionSearch
+from slith.trace import span
+
+
+@dataclass
+class PreparedContract:
+    index: int
+    sol_path: Path
+    sol_text: str
+    found_version: Version | None
+    version: Version
+    env: dict[str, str] | None = None
+    attempt: int = 0
+
+
+Analyzer: TypeAlias = Callable[[Config, PreparedContract], int]
+
+
+def attempt_timeout(config: Config, timeout_sec: float, attempt: int) -> float:
+    return float(timeout_sec * config.retry_factor**attempt)
+
+
+def attempt_extra(contract: PreparedContract) -> dict[str, object] | None:
+    return {"attempt": contract.attempt} if contract.attempt else None
+
+
+def run_mythril(config: Config, contract: PreparedContract) -> int:
+    limits = None
+    if config.mythril_limits is not None:
+        limits = config.mythril_limits.get(contract.sol_path.name)
+    if limits is not None:
+        limits = attempt_limits(config, limits, contract.attempt)
+    return do_mythril_one_sol(
+        config,
+        contract.index,
+        contract.sol_path,
+        contract.sol_text,
+        contract.found_version,
+        contract.version,
+        timeout_sec=attempt_timeout(
+            config, config.mythril_timeout_sec, contract.attempt
+        ),
+        env=contract.env,
+        extra=attempt_extra(contract),
+        limits=limits,
+    )
+
+
+def run_slither(config: Config, contract: PreparedContract) -> int:
+    return do_slither_one_sol(
+        config,
+        contract.index,
+        contract.sol_path,
+        contract.sol_text,
+        contract.found_version,
+        contract.version,
+        timeout_sec=attempt_timeout(
+            config, config.slither_timeout_sec, contract.attempt
+        ),
+        env=contract.env,
+        extra=attempt_extra(contract),
+    )
+
+
+ANALYZERS: dict[str, Analyzer] = {
+    "mythril": run_mythril,
+    "slither": run_slither,
+}
+DEFAULT_ANALYZERS = ("mythril",)
+
+
+def parse_analyzers(spec: str) -> tuple[str, ...]:
+    names = tuple(name.strip() for name in spec.split(",") if name.strip())
+    unknown = [name for name in names if name not in ANALYZERS]
+    if unknown or not names:
+        raise ValueError(
+            f"Unknown analyzers {unknown}, choose from {sorted(ANALYZERS)}"
+        )
+    return names
+
+
+def prepare_contract(
+    solc_sel: SolcSelector,
+    index: int,
+    sol_path: Path,
+    sol_text: str,
+    search: VersionSearch | None = None,
+) -> PreparedContract:
+    rich_ver: RichVersion = version_from_pragma(solc_sel, sol_text)
+    version_to_use = rich_ver.version_to_use(solc_sel)
+    if search is not None:
+        version_to_use = search.working_version(sol_path, rich_ver, version_to_use)
+    return PreparedContract(
+        index, sol_path, sol_text, rich_ver.found_version, version_to_use
+    )
+
+
+def run_analyzer(
+    config: Config, contract: PreparedContract, name: str, track: str | None = None
+) -> int:
+    if config.trace is None:
+        return ANALYZERS[name](config, contract)
+    with config.trace.on_track(track or config.trace.current_track()):
+        with config.trace.span(
+            name, "analyzer", contract=contract.sol_path.name, attempt=contract.attempt
+        ):
+            return ANALYZERS[name](config, contract)
+
+
+def run_analyzers(
+    config: Config, contract: PreparedContract, analyzers: Sequence[str]
+) -> dict[str, int]:
+    if len(analyzers) == 1:
+        return {analyzers[0]: run_analyzer(config, contract, analyzers[0])}
+    worker = "" if config.trace is None else config.trace.current_track()
+    with ThreadPoolExecutor(max_workers=len(analyzers)) as pool:
+        futures = {
+            name: pool.submit(run_analyzer, config, contract, name, f"{worker}/{name}")
+            for name in analyzers
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def analyze_one_sol(
+    config: Config,
+    solc_sel: SolcSelector,
+    index: int,
+    sol_path: Path,
+    sol_text: str,
+    analyzers: Sequence[str] = DEFAULT_ANALYZERS,
+) -> dict[str, int]:
+    with span(config.trace, "resolve version", "solc", contract=sol_path.name):
+        contract = prepare_contract(
+            solc_sel, index, sol_path, sol_text, config.version_search
+        )
+    with span(config.trace, "solc use", "solc", version=contract.version):
+        solc_sel.solc_use(contract.version)
+    return run_analyzers(config, contract, analyzers)
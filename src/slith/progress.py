@@ -0,0 +1,212 @@
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Callable, TextIO
+
+from slith.util import FileName
+from slith.summary import bucket_of
+
+EMA_ALPHA = 0.1
+LIVE_INTERVAL_SEC = 0.5
+LOG_INTERVAL_SEC = 30.0
+SHOWN_IN_FLIGHT = 3
+ERASE_LINE_UP = "\x1b[1A\x1b[2K"
+
+
+class ProgressMode(str, Enum):
+    AUTO = "auto"  # live on a terminal, log lines otherwise
+    LIVE = "live"
+    LOG = "log"
+    OFF = "off"
+
+
+def _duration(sec: float | None) -> str:
+    if sec is None:
+        return "?"
+    sec = int(sec)
+    hours, rest = divmod(sec, 3600)
+    return f"{hours}h{rest // 60:02d}m" if hours else f"{rest // 60}m{rest % 60:02d}s"
+
+
+class _LiveStdout:
+    """Stand-in for sys.stdout that moves the live view below each write."""
+
+    def __init__(self, progress: "Progress", stdout: TextIO) -> None:
+        self.progress = progress
+        self.stdout = stdout
+
+    def write(self, text: str) -> int:
+        with self.progress.lock:
+            self.progress.erase()
+            return self.stdout.write(text)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.stdout, name)
+
+
+class Progress:
+    """Throughput, ETA and per-bucket counts of a run, shown and snapshotted.
+
+    The ETA divides the remaining contracts by an exponential moving average
+    of the time between completions, so it follows changes in speed without
+    jumping at every contract.
+    """
+
+    def __init__(
+        self,
+        total: int | None = None,
+        snapshot_path: Path | None = None,
+        mode: ProgressMode = ProgressMode.AUTO,
+        stream: TextIO | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.total = total
+        self.snapshot_path = snapshot_path
+        self.stream = sys.stderr if stream is None else stream
+        if mode == ProgressMode.AUTO:
+            live = self.stream.isatty()
+            mode = ProgressMode.LIVE if live else ProgressMode.LOG
+        self.mode = mode
+        self.clock = clock
+        self.lock = threading.RLock()
+        self.started = clock()
+        self.done = 0
+        self.counts: dict[str, Counter[str]] = {}
+        self.in_flight: dict[FileName, float] = {}
+        self.last_finish: float | None = None
+        self.ema_interval: float | None = None
+        self.shown_lines = 0
+        self.stop_event = threading.Event()
+        self.thread: threading.Thread | None = None
+        self.saved_stdout: TextIO | None = None
+
+    def start(self, name: FileName) -> None:
+        with self.lock:
+            self.in_flight.setdefault(name, self.clock())
+
+    def finish(self, name: FileName, results: dict[str, int]) -> None:
+        with self.lock:
+            now = self.clock()
+            self.in_flight.pop(name, None)
+            self.done += 1
+            for tool, ret_code in results.items():
+                self.counts.setdefault(tool, Counter())[bucket_of(ret_code)] += 1
+            interval = now - (
+                self.started if self.last_finish is None else self.last_finish
+            )
+            self.last_finish = now
+            if self.ema_interval is None:
+                self.ema_interval = interval
+            else:
+                self.ema_interval += EMA_ALPHA * (interval - self.ema_interval)
+
+    def eta(self) -> float | None:
+        if self.total is None or self.ema_interval is None:
+            return None
+        return max(0, self.total - self.done) * self.ema_interval
+
+    def per_minute(self, elapsed: float) -> float:
+        return self.done * 60 / elapsed if elapsed > 0 else 0.0
+
+    def longest_in_flight(self) -> list[tuple[FileName, float]]:
+        return sorted(self.in_flight.items(), key=lambda kv: kv[1])
+
+    def snapshot(self) -> dict[str, object]:
+        with self.lock:
+            now = self.clock()
+            elapsed = now - self.started
+            eta = self.eta()
+            return {
+                "done": self.done,
+                "total": self.total,
+                "elapsed_sec": round(elapsed, 1),
+                "per_minute": round(self.per_minute(elapsed), 2),
+                "eta_sec": None if eta is None else round(eta, 1),
+                "counts": {tool: dict(c) for tool, c in sorted(self.counts.items())},
+                "in_flight": [
+                    {"name": name, "running_sec": round(now - since, 1)}
+                    for name, since in self.longest_in_flight()
+                ],
+            }
+
+    def lines(self) -> list[str]:
+        with self.lock:
+            now = self.clock()
+            elapsed = now - self.started
+            total = "?" if self.total is None else self.total
+            lines = [
+                f"[{self.done}/{total}] {self.per_minute(elapsed):.1f}/min "
+                f"elapsed {_duration(elapsed)} eta {_duration(self.eta())}"
+            ]
+            for tool, counts in sorted(self.counts.items()):
+                buckets = " ".join(f"{b}={counts[b]}" for b in sorted(counts))
+                lines.append(f"  {tool}: {buckets}")
+            for name, since in self.longest_in_flight()[:SHOWN_IN_FLIGHT]:
+                lines.append(f"  running {_duration(now - since)} {name}")
+            return lines
+
+    def erase(self) -> None:
+        if self.shown_lines:
+            self.stream.write(ERASE_LINE_UP * self.shown_lines)
+            self.stream.flush()
+            self.shown_lines = 0
+
+    def render(self) -> None:
+        with self.lock:
+            lines = self.lines()
+            if self.mode == ProgressMode.LIVE:
+                self.erase()
+                self.stream.write("".join(f"{line}\n" for line in lines))
+                self.shown_lines = len(lines)
+            elif self.mode == ProgressMode.LOG:
+                self.stream.write(
+                    f"progress: {' | '.join(line.strip() for line in lines)}\n"
+                )
+            self.stream.flush()
+            self.save_snapshot()
+
+    def save_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.snapshot(), indent=1))
+        tmp_path.replace(self.snapshot_path)
+
+    def _tick(self) -> None:
+        interval = (
+            LIVE_INTERVAL_SEC if self.mode == ProgressMode.LIVE else LOG_INTERVAL_SEC
+        )
+        while not self.stop_event.wait(interval):
+            self.render()
+
+    def __enter__(self) -> "Progress":
+        if self.mode == ProgressMode.LIVE:
+            self.saved_stdout = sys.stdout
+            sys.stdout = _LiveStdout(self, sys.stdout)
+        if self.mode != ProgressMode.OFF:
+            self.thread = threading.Thread(
+                target=self._tick, name="slith-progress", daemon=True
+            )
+            self.thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.saved_stdout is not None:
+            sys.stdout = self.saved_stdout
+        if self.mode != ProgressMode.OFF:
+            self.render()
+        self.shown_lines = 0
@@ -0,0 +1,420 @@
+import csv
+import io
+import json
+import os
+import re
+import struct
+from array import array
+from collections import Counter
+from itertools import compress
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+from slith.config import Config
+from slith.storage import read_result
+
+INDEX_VERSION = 1
+HEADER_SIZE = struct.Struct("<Q")
+MISSING = ""
+TOOLS = ("mythril", "slither")
+FORMATS = ("text", "csv", "json")
+DEFAULT_GROUP_BY = ("tool", "bucket")
+
+MYTHRIL_ISSUE_RE = re.compile(r"^==== (.+?) ====$", re.MULTILINE)
+SLITHER_REFERENCE_RE = re.compile(r"^Reference: \S*#(\S+)$", re.MULTILINE)
+
+
+class Column:
+    """Dictionary encoded strings: row i holds values[codes[i]], 0 is missing."""
+
+    def __init__(
+        self, values: list[str] | None = None, codes: "array[int] | None" = None
+    ):
+        self.values = [MISSING] if values is None else values
+        self.lookup = {value: code for code, value in enumerate(self.values)}
+        self.codes = array("I") if codes is None else codes
+
+    def code_of(self, value: str) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.code_of(value))
+
+    def __getitem__(self, row: int) -> str:
+        return self.values[self.codes[row]]
+
+
+@dataclass
+class ResultIndex:
+    """Front matter and findings of every result file, one row per file.
+
+    Rows are identified by their path below the results dir and carry the
+    mtime and size they were read at, so a rebuild only reads new or
+    rewritten files.
+    """
+
+    rows: int = 0
+    columns: dict[str, Column] = field(default_factory=dict)
+    mtimes: "array[int]" = field(default_factory=lambda: array("q"))
+    sizes: "array[int]" = field(default_factory=lambda: array("q"))
+    finding_rows: "array[int]" = field(default_factory=lambda: array("I"))
+    findings: Column = field(default_factory=Column)
+
+    def column(self, name: str) -> Column:
+        if name not in self.columns:
+            self.columns[name] = self.get(name)
+        return self.columns[name]
+
+    def get(self, name: str) -> Column:
+        """The column of a field, all missing if no file has the field."""
+        if name in self.columns:
+            return self.columns[name]
+        return Column(codes=array("I", bytes(4 * self.rows)))
+
+    def add(
+        self, fields: dict[str, str], findings: Iterable[str], mtime: int, size: int
+    ) -> None:
+        for name in fields.keys() - self.columns.keys():
+            self.column(name)
+        for name, column in self.columns.items():
+            column.append(fields.get(name, MISSING))
+        for finding in findings:
+            self.finding_rows.append(self.rows)
+            self.findings.append(finding)
+        self.mtimes.append(mtime)
+        self.sizes.append(size)
+        self.rows += 1
+
+    def row(self, row: int) -> dict[str, str]:
+        return {
+            name: column[row]
+            for name, column in self.columns.items()
+            if column.codes[row]
+        }
+
+    def findings_by_row(self) -> dict[int, list[str]]:
+        by_row: dict[int, list[str]] = {}
+        for row, code in zip(self.finding_rows, self.findings.codes):
+            by_row.setdefault(row, []).append(self.findings.values[code])
+        return by_row
+
+    def save(self, path: Path) -> None:
+        arrays = [self.mtimes, self.sizes, self.finding_rows, self.findings.codes]
+        arrays += [column.codes for column in self.columns.values()]
+        header = json.dumps(
+            {
+                "version": INDEX_VERSION,
+                "rows": self.rows,
+                "findings": self.findings.values,
+                "columns": {n: c.values for n, c in self.columns.items()},
+                "lengths": [len(a) for a in arrays],
+            }
+        ).encode()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER_SIZE.pack(len(header)))
+            f.write(header)
+            for data in arrays:
+                data.tofile(f)
+        tmp_path.replace(path)
+
+
+def load_index(path: Path) -> ResultIndex | None:
+    if not path.exists():
+        return None
+    with open(path, "rb") as f:
+        (header_size,) = HEADER_SIZE.unpack(f.read(HEADER_SIZE.size))
+        header = json.loads(f.read(header_size))
+        if header.get("version") != INDEX_VERSION:
+            return None
+        arrays = []
+        typecodes = "qqII" + "I" * len(header["columns"])
+        for typecode, length in zip(typecodes, header["lengths"]):
+            data = array(typecode)
+            data.fromfile(f, length)
+            arrays.append(data)
+    mtimes, sizes, finding_rows, finding_codes, *codes = arrays
+    return ResultIndex(
+        rows=header["rows"],
+        columns={
+            name: Column(values, column_codes)
+            for (name, values), column_codes in zip(header["columns"].items(), codes)
+        },
+        mtimes=mtimes,
+        sizes=sizes,
+        finding_rows=finding_rows,
+        findings=Column(header["findings"], finding_codes),
+    )
+
+
+def parse_front_matter(text: str) -> dict[str, str]:
+    fields: dict[str, str] = {}
+    for line in text.splitlines():
+        if line.startswith("==="):
+            break
+        key, sep, value = line.strip().partition(": ")
+        if sep:
+            fields[key] = value.strip().strip('"')
+    return fields
+
+
+def parse_findings(tool: str, text: str) -> list[str]:
+    match tool:
+        case "mythril":
+            return MYTHRIL_ISSUE_RE.findall(text)
+        case "slither":
+            return SLITHER_REFERENCE_RE.findall(text)
+        case _:
+            return []
+
+
+def result_stats(config: Config) -> Iterator[tuple[str, str, str, os.stat_result]]:
+    """(relative path, tool, bucket, stat) of every result file."""
+    for tool in TOOLS:
+        for directory in config.tool_results_dirs(tool):
+            if not directory.exists():
+                continue
+            relative_dir = directory.relative_to(config.results_base_dir)
+            for entry in os.scandir(directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    yield (
+                        f"{relative_dir}/{entry.name}",
+                        tool,
+                        directory.name,
+                        entry.stat(),
+                    )
+
+
+def build_index(config: Config, rebuild: bool = False) -> ResultIndex:
+    """Index the results tree, reusing the rows of unchanged files."""
+    old = None if rebuild else load_index(config.report_index)
+    if old is None:
+        old = ResultIndex()
+    paths = old.get("path")
+    old_rows = {paths[row]: row for row in range(old.rows)}
+
+    def unchanged(path: str, st: os.stat_result) -> int | None:
+        row = old_rows.get(path)
+        if row is None or old.mtimes[row] != st.st_mtime_ns:
+            return None
+        return row if old.sizes[row] == st.st_size else None
+
+    stats = sorted(result_stats(config))
+    if len(stats) == old.rows and all(
+        unchanged(path, st) is not None for path, _, _, st in stats
+    ):
+        return old
+    old_findings = old.findings_by_row()
+    index = ResultIndex()
+    for path, tool, bucket, st in stats:
+        if (row := unchanged(path, st)) is not None:
+            fields, findings = old.row(row), old_findings.get(row, [])
+        else:
+            text = read_result(config, config.results_base_dir / path)
+            fields = parse_front_matter(text)
+            fields.update(path=path, tool=tool, bucket=bucket)
+            findings = parse_findings(tool, text)
+        index.add(fields, findings, st.st_mtime_ns, st.st_size)
+    index.save(config.report_index)
+    return index
+
+
+@dataclass
+class Table:
+    title: str
+    header: list[str]
+    rows: list[list[object]]
+
+
+def natural_key(value: str) -> tuple[tuple[int, object], ...]:
+    """Sort 0.4.26 before 0.4.100 and 9 before 10; missing values last."""
+    if value == MISSING:
+        return ((2, ""),)
+    return tuple(
+        (0, int(part)) if part.isdigit() else (1, part)
+        for part in re.split(r"(\d+)", value)
+        if part
+    )
+
+
+def row_mask(index: ResultIndex, where: Sequence[tuple[str, str]]) -> bytearray:
+    mask = bytearray(b"\x01" * index.rows)
+    for name, value in where:
+        column = index.get(name)
+        code = column.lookup.get(value, -1)
+        for row, row_code in enumerate(column.codes):
+            if row_code != code:
+                mask[row] = 0
+    return mask
+
+
+def group_by(index: ResultIndex, fields: Sequence[str], mask: bytearray) -> Table:
+    columns = [index.get(name) for name in fields]
+    counts = Counter(compress(zip(*(c.codes for c in columns)), mask))
+    decoded = [
+        ([column.values[code] for column, code in zip(columns, key)], count)
+        for key, count in counts.items()
+    ]
+    decoded.sort(key=lambda kv: (-kv[1], [natural_key(v) for v in kv[0]]))
+    return Table(
+        f"count by {', '.join(fields)}",
+        [*fields, "count"],
+        [[*values, count] for values, count in decoded],
+    )
+
+
+def crosstab(
+    index: ResultIndex, row_field: str, col_field: str, mask: bytearray
+) -> Table:
+    rows, cols = index.get(row_field), index.get(col_field)
+    counts = Counter(compress(zip(rows.codes, cols.codes), mask))
+    row_values = sorted({rows.values[r] for r, _ in counts}, key=natural_key)
+    col_values = sorted({cols.values[c] for _, c in counts}, key=natural_key)
+    matrix = [
+        [counts[rows.lookup[r], cols.lookup[c]] for c in col_values] for r in row_values
+    ]
+    totals = [sum(column) for column in zip(*matrix)]
+    return Table(
+        f"{row_field} by {col_field}",
+        [f"{row_field}\\{col_field}", *col_values, "total"],
+        [
+            *([r, *line, sum(line)] for r, line in zip(row_values, matrix)),
+            ["total", *totals, sum(totals)],
+        ],
+    )
+
+
+def histogram(index: ResultIndex, name: str, mask: bytearray, bins: int = 10) -> Table:
+    column = index.get(name)
+    numbers: dict[int, float] = {}
+    for code, value in enumerate(column.values):
+        try:
+            numbers[code] = float(value)
+        except ValueError:
+            continue
+    values = [numbers[c] for c in compress(column.codes, mask) if c in numbers]
+    title = f"histogram of {name}"
+    if not values:
+        return Table(title, ["low", "high", "count"], [])
+    low, high = min(values), max(values)
+    width = (high - low) / bins or 1.0
+    counts = Counter(min(int((v - low) / width), bins - 1) for v in values)
+    return Table(
+        title,
+        ["low", "high", "count"],
+        [
+            [round(low + i * width, 3), round(low + (i + 1) * width, 3), counts[i]]
+            for i in range(bins if high > low else 1)
+        ],
+    )
+
+
+def top_findings(index: ResultIndex, mask: bytearray, top: int = 20) -> Table:
+    tools = index.get("tool")
+    findings = index.findings
+    occurrences: Counter[tuple[int, int]] = Counter()
+    contracts: set[tuple[int, int]] = set()
+    for row, code in zip(index.finding_rows, findings.codes):
+        if mask[row]:
+            occurrences[tools.codes[row], code] += 1
+            contracts.add((row, code))
+    per_contract = Counter((tools.codes[row], code) for row, code in contracts)
+    return Table(
+        "top findings",
+        ["tool", "finding", "contracts", "occurrences"],
+        [
+            [tools.values[tool], findings.values[code], per_contract[tool, code], n]
+            for (tool, code), n in occurrences.most_common(top)
+        ],
+    )
+
+
+def format_tables(tables: Sequence[Table], fmt: str, selected: int) -> str:
+    match fmt:
+        case "json":
+            return json.dumps(
+                {
+                    "results": selected,
+                    "tables": [
+                        {
+                            "title": t.title,
+                            "rows": [dict(zip(t.header, row)) for row in t.rows],
+                        }
+                        for t in tables
+                    ],
+                },
+                indent=1,
+            )
+        case "csv":
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            for i, table in enumerate(tables):
+                if i:
+                    out.write("\n")
+                if len(tables) > 1:
+                    out.write(f"# {table.title}\n")
+                writer.writerow(table.header)
+                writer.writerows(table.rows)
+            return out.getvalue().rstrip("\n")
+        case _:
+            blocks = [f"{selected} results"]
+            for table in tables:
+                cells = [table.header, *([str(v) for v in r] for r in table.rows)]
+                widths = [max(len(str(c)) for c in col) for col in zip(*cells)]
+                lines = [
+                    "  ".join(str(c).ljust(w) for c, w in zip(line, widths)).rstrip()
+                    for line in cells
+                ]
+                blocks.append("\n".join([f"{table.title}:", *lines]))
+            return "\n\n".join(blocks)
+
+
+def parse_fields(spec: str) -> tuple[str, ...]:
+    fields = tuple(name.strip() for name in spec.split(",") if name.strip())
+    if not fields:
+        raise ValueError("No fields given")
+    return fields
+
+
+def parse_pair(spec: str) -> tuple[str, str]:
+    fields = parse_fields(spec)
+    if len(fields) != 2:
+        raise ValueError(f"Expected two comma separated fields, got {spec!r}")
+    return fields[0], fields[1]
+
+
+def parse_where(spec: str) -> tuple[str, str]:
+    name, sep, value = spec.partition("=")
+    if not sep or not name:
+        raise ValueError(f"Expected FIELD=VALUE, got {spec!r}")
+    return name.strip(), value.strip()
+
+
+def report(
+    config: Config,
+    group_bys: Sequence[tuple[str, ...]] = (),
+    crosstabs: Sequence[tuple[str, str]] = (),
+    histograms: Sequence[str] = (),
+    findings: bool = False,
+    where: Sequence[tuple[str, str]] = (),
+    bins: int = 10,
+    top: int = 20,
+    fmt: str = "text",
+    rebuild: bool = False,
+) -> str:
+    index = build_index(config, rebuild)
+    mask = row_mask(index, where)
+    if not (group_bys or crosstabs or histograms or findings):
+        group_bys = [DEFAULT_GROUP_BY]
+    tables = [group_by(index, fields, mask) for fields in group_bys]
+    tables += [crosstab(index, row, col, mask) for row, col in crosstabs]
+    tables += [histogram(index, name, mask, bins) for name in histograms]
+    if findings:
+        tables.append(top_findings(index, mask, top))
+    return format_tables(tables, fmt, sum(mask))
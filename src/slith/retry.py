@@ -0,0 +1,118 @@
+import os
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+from slith.util import FileName
+from slith.config import Config
+from slith.solc_select import SolcSelector
+from slith.summary import RunSummary
+from slith.outcome import TIMEOUT_RET, Outcome
+from slith.pipeline import prepare_contract, run_analyzers
+from slith.incremental import remove_results
+from slith.compress import compressed_path
+from slith.storage import read_result
+from slith.report import parse_front_matter
+from slith.admission import mem_available_kb
+from slith.budget import budget_spent
+from slith.trace import span
+
+
+def spare_capacity(config: Config) -> bool:
+    available = mem_available_kb()
+    if available is not None and available < config.mem_headroom_mb * 1024:
+        return False
+    return os.getloadavg()[0] < (os.cpu_count() or 1)
+
+
+def last_run(config: Config, tool: str, name: FileName) -> dict[str, str]:
+    """The front matter of the result of a run that returned TIMEOUT_RET."""
+    path = config.tool_results_dirs(tool)[-1] / Path(name).with_suffix(".txt").name
+    for variant in (path, compressed_path(path)):
+        if variant.exists():
+            return parse_front_matter(read_result(config, variant))
+    return {}
+
+
+def flush_results(config: Config) -> None:
+    """Let queued result writes land before results are read or removed."""
+    if config.writer is not None:
+        config.writer.flush()
+
+
+def timed_out(config: Config, summary: RunSummary) -> dict[FileName, list[str]]:
+    """The analyzers per contract whose last run was classified a timeout.
+
+    Every timeout returns TIMEOUT_RET, but so does a run killed by SIGHUP, so
+    the outcome in the result decides; a result without one is taken at its
+    return code.
+    """
+    pending: dict[FileName, list[str]] = {}
+    for tool, results in sorted(summary.results.items()):
+        for name, ret_code in results.items():
+            if ret_code != TIMEOUT_RET:
+                continue
+            outcome = last_run(config, tool, name).get("outcome", Outcome.TIMEOUT)
+            if outcome == Outcome.TIMEOUT:
+                pending.setdefault(name, []).append(tool)
+    return pending
+
+
+def _size(sol_path: Path) -> int:
+    return sol_path.stat().st_size if sol_path.exists() else 0
+
+
+def retry_timeouts(
+    config: Config,
+    solc_sel: SolcSelector,
+    summary: RunSummary,
+    on_retried: Callable[[FileName], object] | None = None,
+    has_capacity: Callable[[], bool] | None = None,
+) -> int:
+    """Run again the analyzers that timed out, with a larger budget each round.
+
+    Compile errors and crashes are never retried. Smaller contracts go
+    first, and the pass stops as soon as the machine has no spare capacity:
+    retries are the first work given up when CPU or memory run short.
+    """
+    if has_capacity is None:
+        has_capacity = partial(spare_capacity, config)
+    retried = 0
+    indices: dict[FileName, int] = {}
+    for attempt in range(1, config.retries + 1):
+        flush_results(config)
+        pending = timed_out(config, summary)
+        paths = [config.patched_contracts_old / name for name in pending]
+        for sol_path in sorted(paths, key=_size):
+            if not sol_path.exists():
+                continue
+            if not has_capacity():
+                print(f"retry: no spare capacity, {len(pending)} timeouts left")
+                return retried
+            tools = pending.pop(sol_path.name)
+            if "mythril" in tools and budget_spent(config):
+                tools.remove("mythril")
+                if not tools:
+                    continue
+            if sol_path.name not in indices:
+                index = last_run(config, tools[0], sol_path.name).get("index", "0")
+                indices[sol_path.name] = int(index)
+            with span(config.trace, "resolve version", "solc", contract=sol_path.name):
+                contract = prepare_contract(
+                    solc_sel,
+                    indices[sol_path.name],
+                    sol_path,
+                    sol_path.read_text(),
+                    config.version_search,
+                )
+            contract.attempt = attempt
+            with span(config.trace, "solc use", "solc", version=contract.version):
+                solc_sel.solc_use(contract.version)
+            flush_results(config)
+            remove_results(config, sol_path.name, tools)
+            for tool, ret_code in run_analyzers(config, contract, tools).items():
+                summary.record(tool, sol_path.name, ret_code)
+            retried += 1
+            if on_retried is not None:
+                on_retried(sol_path.name)
+    return retried
@@ -0,0 +1,121 @@
+import math
+import os
+import statistics
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from slith.util import FileName
+from slith.config import Config
+from slith.lexical import risk_score, strip_comments_and_strings
+from slith.usage import load_usage, size_band
+
+# Risk above the cap counts as the cap, so among risky contracts the cheaper
+# ones go first instead of a huge one with every construct in it.
+SCORE_CAP = 12
+SEC_PER_KB = 1.0  # predicted CPU of a contract no analyzer has run on yet
+
+
+class RiskScores:
+    """Risk score per contract name, valid while its size and mtime match.
+
+    Filled by the lexical prefilter of the parse stage, which reads every
+    source anyway; contracts it did not see are scanned on demand.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.scores: dict[FileName, tuple[int, int, int]] = {}
+        self.changed = False
+        if path.exists():
+            for line in path.read_text().splitlines():
+                fields = line.split("\t")
+                if len(fields) == 4:
+                    name, size, mtime_ns, score = fields
+                    self.scores[name] = int(size), int(mtime_ns), int(score)
+
+    def get(self, name: FileName, stat: os.stat_result) -> int | None:
+        entry = self.scores.get(name)
+        if entry is None or entry[:2] != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return entry[2]
+
+    def put(self, name: FileName, stat: os.stat_result, score: int) -> None:
+        self.scores[name] = stat.st_size, stat.st_mtime_ns, score
+        self.changed = True
+
+    def save(self, config: Config) -> None:
+        """Rewrite the file with one line per contract, if any score changed."""
+        if not self.changed:
+            return
+        config.ensure_dir(self.path.parent)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            "".join(
+                f"{name}\t{size}\t{mtime_ns}\t{score}\n"
+                for name, (size, mtime_ns, score) in sorted(self.scores.items())
+            )
+        )
+        tmp_path.replace(self.path)
+        self.changed = False
+
+
+class CostPredictor:
+    """CPU seconds of the analyzers on a contract, from results/usage.jsonl.
+
+    A contract analyzed before is predicted by its own last run; others by
+    the median of their tool and size band, or by their size.
+    """
+
+    def __init__(self, records: Sequence[dict[str, Any]]) -> None:
+        self.observed: dict[tuple[str, FileName], float] = {}
+        groups: dict[tuple[str, str], list[float]] = {}
+        for record in records:
+            cpu_sec = float(record["user_sec"]) + float(record["sys_sec"])
+            self.observed[record["tool"], record["name"]] = cpu_sec
+            band = size_band(record["size"])
+            groups.setdefault((record["tool"], band), []).append(cpu_sec)
+        self.median = {key: statistics.median(cpu) for key, cpu in groups.items()}
+
+    def predict_one(self, tool: str, name: FileName, size: int) -> float:
+        if (tool, name) in self.observed:
+            return self.observed[tool, name]
+        key = tool, size_band(size)
+        if key in self.median:
+            return self.median[key]
+        return size / 1024 * SEC_PER_KB
+
+    def has_history(self, tool: str, name: FileName, size: int) -> bool:
+        """Whether the prediction comes from past runs rather than the size."""
+        return (tool, name) in self.observed or (tool, size_band(size)) in self.median
+
+    def predict(self, analyzers: Sequence[str], name: FileName, size: int) -> float:
+        return sum(self.predict_one(tool, name, size) for tool in analyzers)
+
+
+def priority(score: int, cost_sec: float) -> float:
+    return min(score, SCORE_CAP) / math.log2(2 + cost_sec)
+
+
+def prioritize(config: Config, contracts: Iterable[Path]) -> list[Path]:
+    """The contracts, riskiest per predicted CPU second first."""
+    scores = RiskScores(config.risk_scores)
+    costs = CostPredictor(load_usage(config.usage_log))
+    keyed: list[tuple[float, int, FileName, Path]] = []
+    scanned = 0
+    for sol_path in contracts:
+        stat = sol_path.stat()
+        score = scores.get(sol_path.name, stat)
+        if score is None:
+            code = strip_comments_and_strings(sol_path.read_text(errors="replace"))
+            score = risk_score(code)
+            scores.put(sol_path.name, stat, score)
+            scanned += 1
+        cost_sec = costs.predict(config.analyzers, sol_path.name, stat.st_size)
+        keyed.append(
+            (-priority(score, cost_sec), stat.st_size, sol_path.name, sol_path)
+        )
+    scores.save(config)
+    keyed.sort(key=lambda item: item[:3])
+    risky = sum(1 for item in keyed if item[0] < 0)
+    print(f"risk: {risky} of {len(keyed)} contracts risky, {scanned} scanned")
+    return [item[3] for item in keyed]
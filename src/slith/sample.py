@@ -0,0 +1,176 @@
+import math
+import random
+import statistics
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+from slith.util import FileName, Version
+from slith.config import Config
+from slith.solc_select import SolcSelector
+from slith.pragma_solidity import version_from_pragma
+from slith.summary import RunSummary, bucket_of
+from slith.usage import load_usage, size_band
+
+Z_95 = 1.96
+MIN_PER_STRATUM = 2  # the fewest contracts whose spread can be estimated
+BUCKETS = ("ret_255", "ret_1", "ret_other")
+StratumKey = tuple[Version, str]
+
+
+@dataclass
+class Stratum:
+    key: StratumKey
+    population: list[Path]
+    sample: list[Path]
+
+
+@dataclass(frozen=True)
+class Estimate:
+    value: float
+    half_width: float  # of the 95% confidence interval
+    unknown: int = 0  # contracts in strata with no sampled value, left out
+
+    def describe(self, scale: float = 1.0, unit: str = "", digits: int = 0) -> str:
+        value, half_width = self.value / scale, self.half_width / scale
+        described = f"{value:.{digits}f}{unit} ± {half_width:.{digits}f}{unit}"
+        if self.unknown:
+            described += f" (without {self.unknown} contracts of unknown strata)"
+        return described
+
+
+def stratify(
+    solc_sel: SolcSelector, contracts: Sequence[Path]
+) -> dict[StratumKey, list[Path]]:
+    """Group the contracts by resolved solc version and size band."""
+    groups: dict[StratumKey, list[Path]] = {}
+    for sol_path in contracts:
+        sol_text = sol_path.read_text(errors="replace")
+        version = version_from_pragma(solc_sel, sol_text).version_to_use(solc_sel)
+        key = version, size_band(sol_path.stat().st_size)
+        groups.setdefault(key, []).append(sol_path)
+    return groups
+
+
+def allocate(sizes: dict[StratumKey, int], target: int) -> dict[StratumKey, int]:
+    """Proportional allocation of exactly target contracts, or all there are.
+
+    Every stratum first gets MIN_PER_STRATUM contracts where there are, when
+    those floors fit in the target; the rest is shared in proportion to what
+    the strata have left, the largest remainders taking the odd contracts.
+    """
+    target = min(target, sum(sizes.values()))
+    counts = {key: min(size, MIN_PER_STRATUM) for key, size in sizes.items()}
+    if sum(counts.values()) > target:
+        counts = dict.fromkeys(sizes, 0)
+    left = {key: sizes[key] - counts[key] for key in sizes}
+    rest = target - sum(counts.values())
+    capacity = sum(left.values()) or 1
+    quotas = {key: rest * n / capacity for key, n in left.items()}
+    shares = {key: math.floor(quota) for key, quota in quotas.items()}
+    odd = rest - sum(shares.values())
+    by_remainder = sorted(quotas, key=lambda key: (shares[key] - quotas[key], key))
+    for key in by_remainder[:odd]:
+        shares[key] += 1
+    return {key: counts[key] + shares[key] for key in sizes}
+
+
+def draw_sample(
+    groups: dict[StratumKey, list[Path]], target: int, seed: int
+) -> list[Stratum]:
+    rng = random.Random(seed)
+    counts = allocate({key: len(paths) for key, paths in groups.items()}, target)
+    strata = []
+    for key in sorted(groups):
+        population = sorted(groups[key], key=lambda sol_path: sol_path.name)
+        strata.append(Stratum(key, population, rng.sample(population, counts[key])))
+    return strata
+
+
+def estimate_total(strata: Sequence[tuple[int, Sequence[float]]]) -> Estimate:
+    """Stratified estimate of a population total from per-stratum samples.
+
+    Each stratum is its population size and the values of its sample; the
+    variance has the finite population correction. Strata without values
+    are not extrapolated, their population is reported as unknown.
+    """
+    total = variance = 0.0
+    unknown = 0
+    for size, values in strata:
+        if not values:
+            unknown += size
+            continue
+        total += size * statistics.fmean(values)
+        if len(values) > 1:
+            correction = 1 - len(values) / size
+            variance += size**2 * correction * statistics.variance(values) / len(values)
+    return Estimate(total, Z_95 * math.sqrt(variance), unknown)
+
+
+def bucket_estimates(
+    strata: Sequence[Stratum], summary: RunSummary
+) -> dict[str, dict[str, Estimate]]:
+    estimates: dict[str, dict[str, Estimate]] = {}
+    for tool, results in sorted(summary.results.items()):
+        estimates[tool] = {}
+        for bucket in BUCKETS:
+            per_stratum = [
+                (
+                    len(stratum.population),
+                    [
+                        float(bucket_of(results[sol_path.name]) == bucket)
+                        for sol_path in stratum.sample
+                        if sol_path.name in results
+                    ],
+                )
+                for stratum in strata
+            ]
+            estimates[tool][bucket] = estimate_total(per_stratum)
+    return estimates
+
+
+def runtime_estimate(
+    config: Config, strata: Sequence[Stratum], usage_start: int
+) -> Estimate:
+    """Wall seconds of analysis over the corpus.
+
+    Only the usage records of this run count, from byte usage_start of the
+    log. The analyzers of a contract run at the same time, so a contract
+    takes as long as its slowest one.
+    """
+    wall: dict[FileName, float] = {}
+    for record in load_usage(config.usage_log, usage_start):
+        name = record["name"]
+        wall[name] = max(wall.get(name, 0.0), float(record.get("wall_sec", 0.0)))
+    return estimate_total(
+        [
+            (
+                len(stratum.population),
+                [wall[p.name] for p in stratum.sample if p.name in wall],
+            )
+            for stratum in strata
+        ]
+    )
+
+
+def sample_report(
+    config: Config, strata: Sequence[Stratum], summary: RunSummary, usage_start: int
+) -> list[str]:
+    population = sum(len(stratum.population) for stratum in strata)
+    sampled = sum(len(stratum.sample) for stratum in strata)
+    lines = [
+        f"sample: {sampled} of {population} contracts in {len(strata)} strata "
+        f"(seed {config.sample_seed}), estimated corpus counts with 95% intervals"
+    ]
+    for tool, estimates in bucket_estimates(strata, summary).items():
+        for bucket, estimate in estimates.items():
+            lines.append(
+                f"{tool} {bucket}: {estimate.describe()} "
+                f"({estimate.value / population:.1%})"
+            )
+    runtime = runtime_estimate(config, strata, usage_start)
+    lines.append(
+        f"runtime: {runtime.describe(3600, ' h', 1)} of analysis, about "
+        f"{runtime.value / 3600 / config.workers:.1f} h on {config.workers} workers"
+    )
+    return lines
@@ -0,0 +1,49 @@
+import hashlib
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+class ShardKey(str, Enum):
+    NAME = "name"
+    CONTENT = "content"
+
+
+@dataclass(frozen=True)
+class Shard:
+    index: int  # 1-based
+    count: int
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+def parse_shard(spec: str) -> Shard:
+    try:
+        sindex, scount = spec.split("/", maxsplit=1)
+        index, count = int(sindex), int(scount)
+    except ValueError as exc:
+        raise ValueError(f"Invalid shard '{spec}', expected 'i/N'") from exc
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', need 1 <= i <= N")
+    return Shard(index, count)
+
+
+def stable_hash(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def shard_of(sol_path: Path, count: int, key: ShardKey = ShardKey.NAME) -> int:
+    data = sol_path.name.encode() if key == ShardKey.NAME else sol_path.read_bytes()
+    return stable_hash(data) % count + 1
+
+
+def in_shard(
+    contracts: Iterable[Path], shard: Shard, key: ShardKey = ShardKey.NAME
+) -> Iterator[Path]:
+    return (
+        sol_path
+        for sol_path in contracts
+        if shard_of(sol_path, shard.count, key) == shard.index
+    )
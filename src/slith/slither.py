@@ -1,13 +1,73 @@
+import json
+import tempfile
+from enum import Enum
 from pathlib import Path
+from typing import Any, Sequence
 
-from slith.util import subrun, Version
+from slith.util import (
+    FileName,
+    Version,
+    run_with_timeout,
+    ProcessResult,
+    front_matter_lines,
+)
 from slith.config import Config
+from slith.outcome import classify
+from slith.usage import record_usage, source_size
+from slith.storage import out_text, store_source, write_result
 from slith.solc_select import SolcSelector
 from slith.pragma_solidity import (
     RichVersion,
     version_from_pragma,
 )
 
+IMPACTS = ("High", "Medium", "Low", "Informational", "Optimization")
+
+
+class SlitherProfile(str, Enum):
+    FAST = "fast"  # a handful of high-impact detectors
+    HIGH_IMPACT = "high-impact"  # every detector of medium or high impact
+    FULL = "full"  # slither defaults
+
+
+FAST_DETECTORS = [
+    "arbitrary-send-erc20",
+    "arbitrary-send-eth",
+    "controlled-delegatecall",
+    "delegatecall-loop",
+    "msg-value-loop",
+    "reentrancy-eth",
+    "suicidal",
+    "tx-origin",
+    "uninitialized-state",
+    "uninitialized-storage",
+    "unprotected-upgrade",
+]
+PROFILE_ARGS = {
+    SlitherProfile.FAST: [
+        "--detect",
+        ",".join(FAST_DETECTORS),
+        "--exclude-dependencies",
+    ],
+    SlitherProfile.HIGH_IMPACT: [
+        "--exclude-optimization",
+        "--exclude-informational",
+        "--exclude-low",
+        "--exclude-dependencies",
+    ],
+    SlitherProfile.FULL: [],
+}
+
+
+def profile_args(config: Config) -> list[str]:
+    return PROFILE_ARGS[SlitherProfile(config.slither_profile)]
+
+
+def subrun(
+    cmd: list[str], timeout_sec: float = 600, env: dict[str, str] | None = None
+) -> ProcessResult:
+    return run_with_timeout(cmd, env=env, timeout_sec=timeout_sec)
+
 
 def front_matter(
     index: int,
@@ -15,6 +75,7 @@ def front_matter(
     found_version: Version | None,
     version: Version,
     ret_code: int,
+    extra: dict[str, object] | None = None,
 ) -> str:
     return (
         "slither:\n"
@@ -23,6 +84,7 @@ def front_matter(
         f'  found_version: {found_version}\n'
         f'  checked_version: {version}\n'
         f"  ret_code: {ret_code}\n"
+        f"{front_matter_lines(extra)}"
         f"{'=' * 3}\n\n"
     )
 
@@ -37,8 +99,44 @@ def dirs_from_ret_code(config: Config, ret_code: int) -> tuple[Path, Path]:
             return config.results_other, config.slither_results_other
 
 
-def out_text(slither_block: str, sol_text: str) -> str:
-    return f"/*\n{slither_block}*/\n\n{sol_text}\n"
+def _load_detectors(json_path: Path) -> list[dict[str, Any]] | None:
+    try:
+        detectors = json.loads(json_path.read_text())["results"].get("detectors", [])
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+    return list(detectors)
+
+
+def _found(detectors: list[dict[str, Any]]) -> dict[str, object]:
+    checks = sorted({detector["check"] for detector in detectors})
+    found = {detector.get("impact") for detector in detectors}
+    impacts = [impact for impact in IMPACTS if impact in found]
+    return {"detectors": f'"{",".join(checks)}"', "impacts": f'"{",".join(impacts)}"'}
+
+
+def json_extra(json_path: Path) -> dict[str, object]:
+    """Detectors and impacts found, as front matter, from slither --json."""
+    detectors = _load_detectors(json_path)
+    return {} if detectors is None else _found(detectors)
+
+
+def json_extra_by_file(
+    json_path: Path, names: Sequence[FileName]
+) -> dict[FileName, dict[str, object]]:
+    """json_extra for each file of a batch, from the files of the elements."""
+    detectors = _load_detectors(json_path)
+    if detectors is None:
+        return {}
+    per_file: dict[FileName, list[dict[str, Any]]] = {name: [] for name in names}
+    for detector in detectors:
+        files = {
+            Path(element["source_mapping"]["filename_absolute"]).name
+            for element in detector.get("elements", [])
+            if element.get("source_mapping", {}).get("filename_absolute")
+        }
+        for name in files & per_file.keys():
+            per_file[name].append(detector)
+    return {name: _found(found) for name, found in per_file.items()}
 
 
 def write_out_file(
@@ -47,24 +145,83 @@ def write_out_file(
     (out_dir / sol_path.name).write_text(out_text(slither_block, sol_text))
 
 
-def do_slither_one_sol(
+def write_slither_result(
     config: Config,
     index: int,
     sol_path: Path,
     sol_text: str,
     found_version: Version | None,
     version: Version,
-) -> None:
-    run_result = subrun(["slither", str(sol_path)])
-    ret_code = run_result.returncode
+    ret_code: int,
+    output: str,
+    extra: dict[str, object] | None = None,
+) -> int:
     print(f"{index:05d} {sol_path.name}: {ret_code}")
     slither_block = (
-        f"{front_matter(index, sol_path, found_version, version, ret_code)}"
-        f"{run_result.stderr}"
+        f"{front_matter(index, sol_path, found_version, version, ret_code, extra)}"
+        f"{output}"
     )
     out_dir, slither_dir = dirs_from_ret_code(config, ret_code)
-    (out_dir / sol_path.name).write_text(out_text(slither_block, sol_text))
-    (slither_dir / sol_path.with_suffix(".txt").name).write_text(slither_block)
+    store_source(config, out_dir, sol_path, slither_block, sol_text)
+    write_result(
+        config, slither_dir / sol_path.with_suffix(".txt").name, slither_block
+    )
+    return ret_code
+
+
+def do_slither_one_sol(
+    config: Config,
+    index: int,
+    sol_path: Path,
+    sol_text: str,
+    found_version: Version | None,
+    version: Version,
+    timeout_sec: float = 600,
+    env: dict[str, str] | None = None,
+    extra: dict[str, object] | None = None,
+) -> int:
+    with tempfile.TemporaryDirectory(prefix="slith-slither-") as tmp:
+        json_path = Path(tmp) / "slither.json"
+        run_result = subrun(
+            [
+                "slither",
+                str(sol_path),
+                *profile_args(config),
+                "--json",
+                str(json_path),
+            ],
+            timeout_sec=timeout_sec,
+            env=env,
+        )
+        found = json_extra(json_path)
+    outcome = classify(run_result).value
+    record_usage(
+        config,
+        "slither",
+        sol_path.name,
+        version,
+        source_size(sol_path, sol_text),
+        outcome,
+        run_result.usage,
+    )
+    usage = {} if run_result.usage is None else run_result.usage.front_matter()
+    return write_slither_result(
+        config,
+        index,
+        sol_path,
+        sol_text,
+        found_version,
+        version,
+        run_result.returncode,
+        run_result.stderr,
+        {
+            "outcome": outcome,
+            "profile": config.slither_profile,
+            **found,
+            **usage,
+            **(extra or {}),
+        },
+    )
 
 
 def slither_one_sol(
@@ -73,10 +230,10 @@ def slither_one_sol(
     index: int,
     sol_path: Path,
     sol_text: str,
-) -> None:
+) -> int:
     rich_ver: RichVersion = version_from_pragma(solc_sel, sol_text)
     version_to_use = rich_ver.version_to_use(solc_sel)
     solc_sel.solc_use(version_to_use)
-    do_slither_one_sol(
+    return do_slither_one_sol(
         config, index, sol_path, sol_text, rich_ver.found_version, version_to_use
     )
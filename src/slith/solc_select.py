@@ -1,5 +1,8 @@
 import bisect
+import os
+from functools import cached_property
 from slith.util import VerTuple, Version, subrun, ver_from_tuple, ver_tuple
+from slith.startup import phase
 
 
 class UnknownSolcVersionError(RuntimeError):
@@ -83,29 +86,70 @@ def next_minor_version(ver: VerTuple) -> VerTuple:
     return ver[0], ver[1] + 1, 0
 
 
+def solc_env(ver: Version) -> dict[str, str]:
+    """Environment selecting solc ver for one child process, see solc-select."""
+    return {**os.environ, "SOLC_VERSION": ver}
+
+
 class SolcSelector:
-    versions: list[VerTuple]
-    versions_dict: set[VerTuple]
-    installables: list[VerTuple]
-    installables_dict: set[VerTuple]
-    all_versions: list[tuple[VerTuple, bool]]
-    current: VerTuple | None
-    default_solidity_version: VerTuple
+    """Installed and installable solc versions, queried on first use.
 
-    def update(self) -> None:
-        self.versions = available_solidity_versions()
-        self.versions_dict = set(self.versions)
-        self.installables = installable_solidity_versions()
-        self.installables_dict = set(self.installables)
-        self.all_versions = [(ver, True) for ver in self.versions]
-        self.all_versions.extend([(ver, False) for ver in self.installables])
-        self.all_versions.sort()
-        self.default_solidity_version = self.versions[-1]
+    Installed versions come from 'solc-select versions'; the installable
+    ones need a network round trip and are fetched only for caret pragmas
+    and installs.
+    """
+
+    _INSTALLED = ("versions", "versions_dict", "default_solidity_version")
+    _INSTALLABLE = ("installables", "installables_dict", "all_versions")
 
     def __init__(self) -> None:
-        init_solc_select()
-        self.update()
-        self.current = current_solidity_version()
+        self.initialized = False
+
+    def _init(self) -> None:
+        if not self.initialized:
+            with phase("solc-select"):
+                init_solc_select()
+            self.initialized = True
+
+    @cached_property
+    def versions(self) -> list[VerTuple]:
+        self._init()
+        with phase("solc-select"):
+            return available_solidity_versions()
+
+    @cached_property
+    def versions_dict(self) -> set[VerTuple]:
+        return set(self.versions)
+
+    @cached_property
+    def default_solidity_version(self) -> VerTuple:
+        return self.versions[-1]
+
+    @cached_property
+    def installables(self) -> list[VerTuple]:
+        with phase("solc-select install list"):
+            return installable_solidity_versions()
+
+    @cached_property
+    def installables_dict(self) -> set[VerTuple]:
+        return set(self.installables)
+
+    @cached_property
+    def all_versions(self) -> list[tuple[VerTuple, bool]]:
+        all_versions = [(ver, True) for ver in self.versions]
+        all_versions.extend([(ver, False) for ver in self.installables])
+        all_versions.sort()
+        return all_versions
+
+    @cached_property
+    def current(self) -> VerTuple | None:
+        self._init()
+        with phase("solc-select"):
+            return current_solidity_version()
+
+    def update(self) -> None:
+        for name in self._INSTALLED + self._INSTALLABLE:
+            self.__dict__.pop(name, None)
 
     def caret_version_and_installed(self, in_ver: VerTuple) -> tuple[VerTuple, bool]:
         all_vers = self.all_versions
@@ -127,11 +171,14 @@ class SolcSelector:
         subrun(["solc-select", "install", ver_from_tuple(ver)])
         self.update()
 
-    def solc_use(self, ver: Version) -> None:
-        if self.current is not None and ver == ver_from_tuple(self.current):
-            return
+    def install(self, ver: Version) -> None:
         vertup = ver_tuple(ver)
         if vertup not in self.versions_dict:
             self._install_solc(vertup)
+
+    def solc_use(self, ver: Version) -> None:
+        if self.current is not None and ver == ver_from_tuple(self.current):
+            return
+        self.install(ver)
         subrun(["solc-select", "use", ver])
         self.current = ver_tuple(ver)
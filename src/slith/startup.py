@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+IMPORTED = time.perf_counter()
+
+
+class StartupProfile:
+    """Wall time of the lazily initialized subsystems of one run."""
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.phases: dict[str, float] = {}
+        self.marks: list[tuple[str, float]] = []
+
+    def add(self, name: str, elapsed: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def mark(self, name: str) -> None:
+        if name not in dict(self.marks):
+            self.marks.append((name, time.perf_counter() - self.started))
+
+    def report(self) -> str:
+        lines = ["startup profile (ms):"]
+        lines += [
+            f"  {name:<28}{elapsed * 1000:9.1f}"
+            for name, elapsed in sorted(self.phases.items(), key=lambda kv: -kv[1])
+        ]
+        lines += [f"  @ {name:<26}{at * 1000:9.1f}" for name, at in self.marks]
+        return "\n".join(lines)
+
+
+PROFILE: StartupProfile | None = None
+
+
+def process_age() -> float | None:
+    """Seconds since this process started, from /proc, at 10 ms resolution."""
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+def enable() -> StartupProfile:
+    """Start profiling; the time before main() is charged to 'interpreter'."""
+    global PROFILE
+    now = time.perf_counter()
+    age = process_age()
+    started = IMPORTED if age is None else now - age
+    PROFILE = StartupProfile(started)
+    PROFILE.add("interpreter and imports", now - started)
+    return PROFILE
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    if PROFILE is None:
+        yield
+        return
+    begin = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROFILE.add(name, time.perf_counter() - begin)
+
+
+def mark(name: str) -> None:
+    if PROFILE is not None:
+        PROFILE.mark(name)
+
+
+def print_report() -> None:
+    if PROFILE is not None:
+        print(PROFILE.report(), file=sys.stderr)
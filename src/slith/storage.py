@@ -0,0 +1,116 @@
+import fcntl
+import os
+from enum import Enum
+from pathlib import Path
+
+from slith.util import FileName
+from slith.config import Config
+from slith.compress import Codec, compressed_path, read_any
+from slith.trace import span
+
+REF_SUFFIX = ".ref"
+FICLONE = 0x40049409  # _IOW(0x94, 9, int) from linux/fs.h
+
+
+class StorageMode(str, Enum):
+    COPY = "copy"  # comment header followed by a full copy of the source
+    LINK = "link"  # hardlink or reflink of the source, header only in tool dir
+    REF = "ref"  # a small file holding the path of the source
+
+
+def out_text(block: str, sol_text: str) -> str:
+    return f"/*\n{block}*/\n\n{sol_text}\n"
+
+
+def write_result(config: Config, path: Path, text: str) -> None:
+    with span(config.trace, "write", "io", file=path.name):
+        _write_result(config, path, text)
+    if config.trace is not None and config.writer is not None:
+        config.trace.counter("writer queue", pending=config.writer.queue.qsize())
+
+
+def _write_result(config: Config, path: Path, text: str) -> None:
+    config.ensure_dir(path.parent)
+    data: str | bytes = text
+    if config.codec is not None:
+        data = config.codec.compress(text)
+        path.unlink(missing_ok=True)
+        path = compressed_path(path)
+    if config.writer is not None:
+        config.writer.write(path, data)
+    elif isinstance(data, bytes):
+        path.write_bytes(data)
+    else:
+        path.write_text(data)
+
+
+def read_result(config: Config, path: Path) -> str:
+    if path.suffix == ".zst" and config.codec is None:
+        config.codec = Codec(config.zstd_dicts_dir, config.compress_level)
+    return read_any(config.codec, path)
+
+
+def _reflink(src: Path, dest: Path) -> None:
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdest:
+        try:
+            fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdest.close()
+            dest.unlink()
+            raise
+
+
+def _link_source(sol_path: Path, dest: Path) -> bool:
+    dest.unlink(missing_ok=True)
+    for link in (os.link, _reflink):
+        try:
+            link(sol_path, dest)
+            return True
+        except OSError:
+            continue
+    return False
+
+
+def store_source(
+    config: Config, out_dir: Path, sol_path: Path, block: str, sol_text: str
+) -> None:
+    dest = config.ensure_dir(out_dir) / sol_path.name
+    ref = dest.with_name(dest.name + REF_SUFFIX)
+    match config.storage_mode:
+        case StorageMode.COPY:
+            write_result(config, dest, out_text(block, sol_text))
+        case StorageMode.LINK if _link_source(sol_path, dest):
+            ref.unlink(missing_ok=True)
+            compressed_path(ref).unlink(missing_ok=True)
+        case _:
+            dest.unlink(missing_ok=True)
+            compressed_path(dest).unlink(missing_ok=True)
+            write_result(config, ref, f"{sol_path.resolve()}\n")
+
+
+def find_result(dirs: list[Path], file_name: FileName) -> Path | None:
+    for directory in dirs:
+        for path in (directory / file_name, compressed_path(directory / file_name)):
+            if path.exists():
+                return path
+    return None
+
+
+def render(config: Config, tool: str, name: FileName) -> str:
+    """Rebuild the 'comment header + source' view of a stored result."""
+    block_path = find_result(
+        config.tool_results_dirs(tool), Path(name).with_suffix(".txt").name
+    )
+    if block_path is None:
+        raise FileNotFoundError(f"No {tool} result for {name}")
+    block = read_result(config, block_path)
+    out_dirs = config.tool_results_dirs(None)
+    if (ref := find_result(out_dirs, name + REF_SUFFIX)) is not None:
+        source = Path(read_result(config, ref).strip())
+        return out_text(block, source.read_text())
+    if (stored := find_result(out_dirs, name)) is not None:
+        stored_text = read_result(config, stored)
+        if stored_text.startswith(f"/*\n{block}*/\n"):
+            return stored_text
+        return out_text(block, stored_text)
+    return out_text(block, (config.patched_contracts_old / name).read_text())
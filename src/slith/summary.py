@@ -0,0 +1,72 @@
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from slith.util import FileName
+
+SUMMARY_NAME = "summary.json"
+
+ToolResults = dict[FileName, int]
+
+
+def bucket_of(ret_code: int) -> str:
+    match ret_code:
+        case 255:
+            return "ret_255"
+        case 1:
+            return "ret_1"
+        case _:
+            return "ret_other"
+
+
+@dataclass
+class RunSummary:
+    shard: str | None = None
+    results: dict[str, ToolResults] = field(default_factory=dict)
+
+    def record(self, tool: str, name: FileName, ret_code: int) -> None:
+        self.results.setdefault(tool, {})[name] = ret_code
+
+    def forget(self, names: Iterable[FileName]) -> None:
+        for name in names:
+            for results in self.results.values():
+                results.pop(name, None)
+
+    def results_of(self, name: FileName) -> dict[str, int]:
+        return {
+            tool: results[name]
+            for tool, results in self.results.items()
+            if name in results
+        }
+
+    def counts(self, tool: str) -> Counter[str]:
+        return Counter(bucket_of(ret) for ret in self.results.get(tool, {}).values())
+
+    def to_json(self) -> str:
+        data = {
+            "shard": self.shard,
+            "counts": {tool: dict(self.counts(tool)) for tool in self.results},
+            "results": self.results,
+        }
+        return json.dumps(data, indent=1, sort_keys=True)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(self.to_json())
+        tmp_path.replace(path)
+
+
+def load_summary(path: Path) -> RunSummary:
+    if not path.exists():
+        return RunSummary()
+    data = json.loads(path.read_text())
+    return RunSummary(
+        shard=data.get("shard"),
+        results={
+            tool: {name: int(ret) for name, ret in results.items()}
+            for tool, results in data.get("results", {}).items()
+        },
+    )
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, ContextManager, Iterator
+
+# Chrome trace event phases, see the "Trace Event Format" document
+COMPLETE = "X"
+COUNTER = "C"
+METADATA = "M"
+
+
+class TraceRecorder:
+    """Spans and counters of a run, saved as Chrome/Perfetto trace events.
+
+    Every worker thread gets its own track, named after the thread; work a
+    worker fans out to helper threads, like the analyzers of one contract,
+    can be put on sub-tracks with on_track().
+    """
+
+    def __init__(
+        self, path: Path, clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.path = path
+        self.clock = clock
+        self.started = clock()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.events: list[dict[str, object]] = [
+            self._metadata("process_name", 0, "slith")
+        ]
+        self.tracks: dict[str, int] = {}
+        self.levels: dict[str, dict[str, int]] = {}
+        self.last_values: dict[str, dict[str, int]] = {}
+        self.local = threading.local()
+
+    def _metadata(self, name: str, tid: int, value: str) -> dict[str, object]:
+        return {
+            "ph": METADATA,
+            "name": name,
+            "pid": self.pid,
+            "tid": tid,
+            "args": {"name": value},
+        }
+
+    def _us(self, at: float) -> float:
+        return round((at - self.started) * 1e6, 1)
+
+    def _tid(self) -> int:
+        track = self.current_track()
+        with self.lock:
+            if track not in self.tracks:
+                self.tracks[track] = tid = len(self.tracks) + 1
+                self.events.append(self._metadata("thread_name", tid, track))
+            return self.tracks[track]
+
+    @contextmanager
+    def on_track(self, track: str) -> Iterator[None]:
+        saved = getattr(self.local, "track", None)
+        self.local.track = track
+        try:
+            yield
+        finally:
+            self.local.track = saved
+
+    def current_track(self) -> str:
+        return getattr(self.local, "track", None) or threading.current_thread().name
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args: object) -> Iterator[None]:
+        tid = self._tid()
+        begin = self.clock()
+        try:
+            yield
+        finally:
+            event = {
+                "ph": COMPLETE,
+                "name": name,
+                "cat": cat,
+                "pid": self.pid,
+                "tid": tid,
+                "ts": self._us(begin),
+                "dur": round((self.clock() - begin) * 1e6, 1),
+                "args": args,
+            }
+            with self.lock:
+                self.events.append(event)
+
+    def counter(self, name: str, **values: int) -> None:
+        with self.lock:
+            self._counter(name, values)
+
+    def _counter(self, name: str, values: dict[str, int]) -> None:
+        if self.last_values.get(name) == values:
+            return
+        self.last_values[name] = values
+        self.events.append(
+            {
+                "ph": COUNTER,
+                "name": name,
+                "pid": self.pid,
+                "tid": 0,
+                "ts": self._us(self.clock()),
+                "args": values,
+            }
+        )
+
+    def adjust(self, name: str, series: str, delta: int) -> None:
+        """Move one series of a counter by delta and record all its series."""
+        with self.lock:
+            levels = self.levels.setdefault(name, {})
+            levels[series] = levels.get(series, 0) + delta
+            self._counter(name, dict(levels))
+
+    def save(self) -> None:
+        with self.lock:
+            events = list(self.events)
+        self._write(events)
+
+    def rotate(self) -> None:
+        """Save the events so far and start over with only the track names.
+
+        The previous save is kept next to the trace with a ".1" suffix, so a
+        long running daemon holds at most two segments of events.
+        """
+        with self.lock:
+            events = self.events
+            self.events = [event for event in events if event["ph"] == METADATA]
+        if self.path.exists():
+            self.path.replace(self.path.with_name(self.path.name + ".1"))
+        self._write(events)
+
+    def _write(self, events: list[dict[str, object]]) -> None:
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(trace))
+        tmp_path.replace(self.path)
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.save()
+
+
+def span(
+    recorder: TraceRecorder | None, name: str, cat: str, **args: object
+) -> ContextManager[None]:
+    if recorder is None:
+        return nullcontext()
+    return recorder.span(name, cat, **args)
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+from slith.util import FileName
+from slith.config import Config
+from slith.report import build_index
+from slith.risk import CostPredictor
+from slith.shard import stable_hash
+from slith.usage import load_usage
+
+
+@dataclass
+class Triage:
+    flagged: list[Path] = field(default_factory=list)
+    sampled: list[Path] = field(default_factory=list)
+    skipped: list[Path] = field(default_factory=list)
+
+    def selected(self) -> list[Path]:
+        return self.flagged + self.sampled
+
+
+def _split(value: str) -> set[str]:
+    return {part for part in value.split(",") if part}
+
+
+def slither_flags(config: Config) -> set[FileName]:
+    """Contracts whose slither result has a triage detector or impact.
+
+    Detectors come from the structured output of slither; results without
+    it, like those of batched runs, are matched on their Reference anchors.
+    """
+    index = build_index(config)
+    tool, sol = index.get("tool"), index.get("sol")
+    detectors, impacts = index.get("detectors"), index.get("impacts")
+    anchors = index.findings_by_row()
+    flagged: set[FileName] = set()
+    for row in range(index.rows):
+        if tool[row] != "slither":
+            continue
+        found = _split(detectors[row]) | set(anchors.get(row, []))
+        if found & config.triage_detectors or (
+            _split(impacts[row]) & config.triage_impacts
+        ):
+            flagged.add(sol[row])
+    return flagged
+
+
+def in_sample(name: FileName, fraction: float, seed: int) -> bool:
+    """Whether a contract is in the sample, the same in any order or shard."""
+    return stable_hash(f"{seed}:{name}".encode()) < fraction * 2**64
+
+
+def triage(config: Config, contracts: Sequence[Path]) -> Triage:
+    """Split the contracts into flagged by slither, sampled and skipped."""
+    flags = slither_flags(config)
+    result = Triage()
+    for sol_path in contracts:
+        if sol_path.name in flags:
+            result.flagged.append(sol_path)
+        elif in_sample(sol_path.name, config.triage_sample, config.triage_seed):
+            result.sampled.append(sol_path)
+        else:
+            result.skipped.append(sol_path)
+    return result
+
+
+def saved_cpu_sec(config: Config, skipped: Sequence[Path]) -> tuple[float, int]:
+    """Predicted mythril CPU of the skipped contracts that have usage history,
+    and how many have none.
+    """
+    costs = CostPredictor(load_usage(config.usage_log))
+    saved, unknown = 0.0, 0
+    for sol_path in skipped:
+        size = sol_path.stat().st_size
+        if costs.has_history("mythril", sol_path.name, size):
+            saved += costs.predict_one("mythril", sol_path.name, size)
+        else:
+            unknown += 1
+    return saved, unknown
+
+
+def triage_report(config: Config, result: Triage) -> str:
+    total = len(result.selected()) + len(result.skipped)
+    line = (
+        f"triage: mythril on {len(result.selected())} of {total} contracts "
+        f"({len(result.flagged)} flagged by slither, {len(result.sampled)} sampled)"
+    )
+    saved, unknown = saved_cpu_sec(config, result.skipped)
+    if unknown == len(result.skipped):
+        return f"{line}, mythril CPU saved unknown without usage history"
+    line += f", about {saved / 3600:.1f} CPU hours of mythril saved"
+    if unknown:
+        line += f" on the {len(result.skipped) - unknown} skipped with usage history"
+    return line
@@ -0,0 +1,127 @@
+import json
+import statistics
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from slith.util import FileName, JobUsage, Version
+from slith.config import Config
+from slith.affinity import pinned_cpus
+
+SIZE_BANDS = [(4 * 1024, "<4K"), (16 * 1024, "4-16K"), (64 * 1024, "16-64K")]
+SIZE_BANDS += [(256 * 1024, "64-256K")]
+LARGEST_BAND = ">=256K"
+GROUPINGS = ("tool", "version", "size", "affinity")
+
+_lock = threading.Lock()
+
+
+def size_band(size: int) -> str:
+    for limit, band in SIZE_BANDS:
+        if size < limit:
+            return band
+    return LARGEST_BAND
+
+
+def source_size(sol_path: Path, sol_text: str) -> int:
+    """Bytes of a contract on disk, the size the bands are in everywhere."""
+    try:
+        return sol_path.stat().st_size
+    except FileNotFoundError:
+        return len(sol_text.encode())
+
+
+def record_usage(
+    config: Config,
+    tool: str,
+    name: FileName,
+    version: Version,
+    size: int,
+    outcome: str,
+    usage: JobUsage | None,
+) -> None:
+    if usage is None:
+        return
+    line = {
+        "tool": tool,
+        "name": name,
+        "version": version,
+        "size": size,
+        "outcome": outcome,
+        "user_sec": round(usage.user_sec, 3),
+        "sys_sec": round(usage.sys_sec, 3),
+        "max_rss_kb": usage.max_rss_kb,
+        "nvcsw": usage.voluntary_switches,
+        "nivcsw": usage.involuntary_switches,
+        "wall_sec": round(usage.wall_sec, 3),
+        "cpus": pinned_cpus(),
+    }
+    with _lock:
+        config.ensure_dir(config.usage_log.parent)
+        with open(config.usage_log, "a") as f:
+            f.write(json.dumps(line, sort_keys=True) + "\n")
+
+
+def usage_offset(path: Path) -> int:
+    """Where the records appended from now on start, for load_usage(start=)."""
+    return path.stat().st_size if path.exists() else 0
+
+
+def load_usage(path: Path, start: int = 0) -> list[dict[str, Any]]:
+    """Usage records from byte offset start, the last one for each (tool, name)
+    winning.
+    """
+    if not path.exists():
+        return []
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read().decode()
+    records: dict[tuple[str, str], dict[str, Any]] = {}
+    for line in text.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            records[record["tool"], record["name"]] = record
+    return list(records.values())
+
+
+def _key(grouping: str) -> Callable[[dict[str, Any]], str]:
+    match grouping:
+        case "size":
+            return lambda record: f"{record['tool']} {size_band(record['size'])}"
+        case "version":
+            return lambda record: f"{record['tool']} {record['version']}"
+        case "affinity":
+            return lambda record: (
+                f"{record['tool']} {'pinned' if record.get('cpus') else 'unpinned'}"
+            )
+        case _:
+            return lambda record: str(record["tool"])
+
+
+def _quantiles(values: list[float]) -> tuple[float, float, float]:
+    if len(values) == 1:
+        return values[0], values[0], values[0]
+    cuts = statistics.quantiles(values, n=10, method="inclusive")
+    return cuts[4], cuts[8], max(values)
+
+
+def usage_report(records: list[dict[str, Any]], grouping: str) -> list[str]:
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(_key(grouping)(record), []).append(record)
+    lines = [
+        f"{'by ' + grouping:<24}{'jobs':>7}  cpu sec p50/p90/max"
+        "        max rss MB p50/p90/max   ctx sw p50  wall sec p50"
+    ]
+    for key, group in sorted(groups.items()):
+        cpu = _quantiles([r["user_sec"] + r["sys_sec"] for r in group])
+        rss = _quantiles([r["max_rss_kb"] / 1024 for r in group])
+        switches = statistics.median(r["nvcsw"] + r["nivcsw"] for r in group)
+        wall = statistics.median(r.get("wall_sec", 0.0) for r in group)
+        lines.append(
+            f"{key:<24}{len(group):>7}  "
+            f"{cpu[0]:7.1f} {cpu[1]:7.1f} {cpu[2]:7.1f}   "
+            f"{rss[0]:7.0f} {rss[1]:7.0f} {rss[2]:7.0f}   {switches:8.0f}"
+            f"  {wall:12.1f}"
+        )
+    return lines
@@ -1,4 +1,9 @@
+import dataclasses
+import inspect
+import os
+import resource
 import subprocess
+from dataclasses import dataclass
 from subprocess import run, CompletedProcess
 from typing import NamedTuple
 import time
@@ -26,11 +31,88 @@ def subrun(cmd: list[str]) -> CompletedProcess[str]:
     )
 
 
+@dataclass(frozen=True)
+class JobUsage:
+    user_sec: float
+    sys_sec: float
+    max_rss_kb: int
+    voluntary_switches: int
+    involuntary_switches: int
+    wall_sec: float = 0.0
+
+    @classmethod
+    def from_rusage(cls, rusage: resource.struct_rusage) -> "JobUsage":
+        return cls(
+            rusage.ru_utime,
+            rusage.ru_stime,
+            rusage.ru_maxrss,  # kilobytes on Linux
+            rusage.ru_nvcsw,
+            rusage.ru_nivcsw,
+        )
+
+    def share(self, fraction: float) -> "JobUsage":
+        """The part of a batch's usage that falls to one member; the memory
+        peak stays whole, it was reached with every member loaded.
+        """
+        return dataclasses.replace(
+            self,
+            user_sec=self.user_sec * fraction,
+            sys_sec=self.sys_sec * fraction,
+            voluntary_switches=round(self.voluntary_switches * fraction),
+            involuntary_switches=round(self.involuntary_switches * fraction),
+            wall_sec=self.wall_sec * fraction,
+        )
+
+    def front_matter(self) -> dict[str, object]:
+        return {
+            "cpu_user_sec": round(self.user_sec, 2),
+            "cpu_sys_sec": round(self.sys_sec, 2),
+            "max_rss_kb": self.max_rss_kb,
+            "ctx_switches": f"{self.voluntary_switches}/{self.involuntary_switches}",
+            "wall_sec": round(self.wall_sec, 2),
+        }
+
+
 class ProcessResult(NamedTuple):
     returncode: int
     stdout: str
     stderr: str
     timed_out: bool
+    usage: JobUsage | None = None
+
+
+def _can_wait4() -> bool:
+    """Whether _RusagePopen can hook the private Popen._try_wait.
+
+    The hook relies on its (self, wait_flags) signature, which CPython has
+    kept since 3.3; elsewhere runs go without usage rather than break.
+    """
+    try_wait = getattr(subprocess.Popen, "_try_wait", None)
+    if try_wait is None or not hasattr(os, "wait4"):
+        return False
+    return list(inspect.signature(try_wait).parameters) == ["self", "wait_flags"]
+
+
+class _RusagePopen(subprocess.Popen[str]):
+    """Popen that reaps its child with wait4, keeping the child's rusage."""
+
+    usage: JobUsage | None = None
+    started = 0.0
+
+    def _try_wait(self, wait_flags: int) -> tuple[int, int]:
+        # Same as CPython's Popen._try_wait, with wait4 in place of waitpid.
+        try:
+            pid, sts, rusage = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            return self.pid, 0
+        if pid == self.pid:
+            self.usage = dataclasses.replace(
+                JobUsage.from_rusage(rusage), wall_sec=time.monotonic() - self.started
+            )
+        return pid, sts
+
+
+_POPEN = _RusagePopen if _can_wait4() else subprocess.Popen
 
 
 def run_with_timeout(
@@ -46,15 +128,20 @@ def run_with_timeout(
     Returns:
         ProcessResult containing return code, stdout, stderr and timeout status
     """
+    started = time.monotonic()
     try:
         # Start process with pipe for stdout/stderr
-        process = subprocess.Popen(
+        process = _POPEN(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             env=env,
             text=True,  # Return strings instead of bytes
+            encoding="utf-8",
+            errors="replace",
         )
+        if isinstance(process, _RusagePopen):
+            process.started = started
 
         # Wait for process with timeout
         stdout, stderr = process.communicate(timeout=timeout_sec)
@@ -64,6 +151,7 @@ def run_with_timeout(
             stdout=stdout,
             stderr=stderr,
             timed_out=False,
+            usage=getattr(process, "usage", None),
         )
 
     except subprocess.TimeoutExpired:
@@ -77,9 +165,16 @@ def run_with_timeout(
             stdout=stdout,
             stderr=stderr,
             timed_out=True,
+            usage=getattr(process, "usage", None),
         )
 
 
+def front_matter_lines(extra: dict[str, object] | None) -> str:
+    if not extra:
+        return ""
+    return "".join(f"  {key}: {value}\n" for key, value in extra.items())
+
+
 def ver_tuple(ver: Version) -> VerTuple:
     major, minor, patch = ver.split(".", maxsplit=2)
     return (
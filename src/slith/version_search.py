@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from slith.util import Version, VerTuple, run_with_timeout, ver_from_tuple, ver_tuple
+from slith.config import Config
+from slith.solc_select import SolcSelector, solc_env
+from slith.pragma_solidity import RichVersion, VersionType
+from slith.incremental import content_hash
+
+PROBE_TIMEOUT_SEC = 30.0
+PROBE_WORKERS = 4
+NO_VERSION = "-"  # cached when no candidate compiles the contract
+
+
+class VersionCache:
+    """Working solc version per content hash, kept in an append-only log."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.versions: dict[str, Version] = {}
+        if path.exists():
+            for line in path.read_text().splitlines():
+                digest, _, version = line.partition("\t")
+                if version:
+                    self.versions[digest] = version
+
+    def get(self, digest: str) -> Version | None:
+        with self.lock:
+            return self.versions.get(digest)
+
+    def put(self, digest: str, version: Version) -> None:
+        with self.lock:
+            self.versions[digest] = version
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(f"{digest}\t{version}\n")
+
+
+def compiles(sol_path: Path, version: Version, timeout_sec: float) -> bool:
+    run_result = run_with_timeout(
+        ["solc", str(sol_path)], env=solc_env(version), timeout_sec=timeout_sec
+    )
+    return not run_result.timed_out and run_result.returncode == 0
+
+
+def candidate_versions(sele: SolcSelector, rich_ver: RichVersion) -> list[VerTuple]:
+    installed = sele.versions
+    match rich_ver.ver_type:
+        case VersionType.CARET:
+            low = ver_tuple(rich_ver.found_version or rich_ver.version)
+            return [v for v in installed if v[:2] == low[:2] and v >= low]
+        case VersionType.RANGE:
+            low = ver_tuple(rich_ver.version)
+            sup = (
+                None
+                if rich_ver.sup_version is None
+                else ver_tuple(rich_ver.sup_version)
+            )
+            return [v for v in installed if v >= low and (sup is None or v < sup)]
+        case VersionType.STRICT:
+            return []
+        case _:
+            return list(installed)
+
+
+def probe_order(candidates: list[VerTuple]) -> list[VerTuple]:
+    """Newest first: the newest patch of every minor, then the older patches."""
+    newest_of_minor: dict[tuple[int, int], VerTuple] = {}
+    for version in sorted(candidates):
+        newest_of_minor[version[:2]] = version
+    newest = sorted(newest_of_minor.values(), reverse=True)
+    older = sorted(set(candidates) - set(newest), reverse=True)
+    return newest + older
+
+
+class VersionSearch:
+    def __init__(
+        self,
+        sele: SolcSelector,
+        cache: VersionCache,
+        workers: int = PROBE_WORKERS,
+        timeout_sec: float = PROBE_TIMEOUT_SEC,
+    ) -> None:
+        self.sele = sele
+        self.cache = cache
+        self.workers = workers
+        self.timeout_sec = timeout_sec
+        self.probes = 0
+        self.lock = threading.Lock()
+
+    def _compiles(self, sol_path: Path, version: VerTuple) -> bool:
+        with self.lock:
+            self.probes += 1
+        return compiles(sol_path, ver_from_tuple(version), self.timeout_sec)
+
+    def search(self, sol_path: Path, candidates: list[VerTuple]) -> Version | None:
+        """Find the newest candidate that compiles the contract.
+
+        Candidates are probed newest first, a round of `workers` concurrent
+        probes at a time, so the first round where one compiles holds the
+        newest. Older patches of a minor are probed only when the newest
+        patch of no minor compiles.
+        """
+        order = probe_order(candidates)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for start in range(0, len(order), self.workers):
+                probes = order[start : start + self.workers]
+                results = pool.map(lambda v: self._compiles(sol_path, v), probes)
+                working = [v for v, ok in zip(probes, results) if ok]
+                if working:
+                    return ver_from_tuple(max(working))
+        return None
+
+    def working_version(
+        self, sol_path: Path, rich_ver: RichVersion, version: Version
+    ) -> Version:
+        digest = content_hash(sol_path)
+        cached = self.cache.get(digest)
+        if cached is not None:
+            return version if cached == NO_VERSION else cached
+        self.sele.install(version)
+        if self._compiles(sol_path, ver_tuple(version)):
+            self.cache.put(digest, version)
+            return version
+        candidates = [
+            v
+            for v in candidate_versions(self.sele, rich_ver)
+            if v != ver_tuple(version)
+        ]
+        found = self.search(sol_path, candidates) if candidates else None
+        self.cache.put(digest, found or NO_VERSION)
+        if found is not None:
+            print(f"{sol_path.name}: compiles with solc {found}, not {version}")
+        return found or version
+
+
+def init_version_search(config: Config, sele: SolcSelector) -> None:
+    if config.search_versions and config.version_search is None:
+        config.version_search = VersionSearch(sele, VersionCache(config.version_cache))
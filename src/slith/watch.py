@@ -0,0 +1,398 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import statistics
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from types import TracebackType
+from typing import Iterator, Sequence
+
+from slith.util import FileName
+from slith.config import Config
+from slith.solc_select import SolcSelector, solc_env
+from slith.parse_good import ParseResults, merge_parse_results, parse_contracts
+from slith.pipeline import PreparedContract, prepare_contract, run_analyzers
+from slith.summary import load_summary
+from slith.trace import span
+from slith.incremental import (
+    changes_from_manifest,
+    result_key,
+    load_manifest,
+    remove_results,
+    save_manifest,
+)
+
+# from linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+WRITE_EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+DELETE_EVENTS = IN_MOVED_FROM | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+SETTLE_SEC = 2.0
+# The summary, manifest and parse lists are rewritten whole, so they are
+# saved at most this often rather than after every contract.
+FLUSH_SEC = 10.0
+TRACE_ROTATE_EVENTS = 100_000  # a daemon's trace is saved and restarted past this
+
+
+@dataclass(frozen=True)
+class InotifyEvent:
+    mask: int
+    name: FileName
+
+
+def parse_events(data: bytes) -> Iterator[InotifyEvent]:
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(data):
+        _, mask, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+        offset += EVENT_HEADER.size
+        name = data[offset : offset + name_len].split(b"\0", 1)[0]
+        offset += name_len
+        yield InotifyEvent(mask, os.fsdecode(name))
+
+
+class Inotify:
+    def __init__(self, directory: Path, mask: int = WATCH_MASK) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Cannot watch {directory}")
+
+    def read(self) -> list[InotifyEvent]:
+        try:
+            return list(parse_events(os.read(self.fd, 64 * 1024)))
+        except BlockingIOError:
+            return []
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Debouncer:
+    """Hold back a file until no event arrived for it for settle_sec.
+
+    Writers may create, extend and rename a file in several steps; the
+    arrival time kept is the one of the first event of the burst.
+    """
+
+    def __init__(self, settle_sec: float = SETTLE_SEC) -> None:
+        self.settle_sec = settle_sec
+        self.arrival: dict[FileName, float] = {}
+        self.last_event: dict[FileName, float] = {}
+
+    def touch(self, name: FileName, now: float) -> None:
+        self.arrival.setdefault(name, now)
+        self.last_event[name] = now
+
+    def discard(self, name: FileName) -> None:
+        self.arrival.pop(name, None)
+        self.last_event.pop(name, None)
+
+    def ready(self, now: float) -> list[tuple[FileName, float]]:
+        names = sorted(
+            name
+            for name, last in self.last_event.items()
+            if now - last >= self.settle_sec
+        )
+        return [(name, self.arrival[name]) for name in names]
+
+    def next_timeout(self, now: float) -> float | None:
+        if not self.last_event:
+            return None
+        return max(0.0, min(self.last_event.values()) + self.settle_sec - now)
+
+
+@dataclass
+class LatencyLog:
+    path: Path
+    latencies: list[float] = field(default_factory=list)
+
+    def record(
+        self,
+        name: FileName,
+        arrival: float,
+        done: float,
+        results: dict[str, int],
+        error: str | None = None,
+    ) -> None:
+        latency = done - arrival
+        self.latencies.append(latency)
+        line: dict[str, object] = {
+            "name": name,
+            "arrival": round(arrival, 3),
+            "latency_sec": round(latency, 3),
+            "results": results,
+        }
+        if error is not None:
+            line["error"] = error
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(line, sort_keys=True) + "\n")
+        print(f"{name}: {error or results} in {latency:.1f}s")
+
+    def report(self) -> str:
+        if not self.latencies:
+            return "watch: no contracts analyzed"
+        if len(self.latencies) == 1:
+            p50 = p95 = self.latencies[0]
+        else:
+            cuts = statistics.quantiles(self.latencies, n=20, method="inclusive")
+            p50, p95 = cuts[9], cuts[18]
+        return (
+            f"watch: {len(self.latencies)} analyzed, latency p50 {p50:.1f}s, "
+            f"p95 {p95:.1f}s, max {max(self.latencies):.1f}s"
+        )
+
+
+class Watcher:
+    """Analyze contracts as they land in patched_contracts_old.
+
+    Parse check, version resolution and bookkeeping are serialized by a lock;
+    the analyzers of up to `workers` contracts run concurrently, each with
+    its own solc version selected through the environment. A contract that
+    fails is logged and recorded without results, and the watch goes on.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        solc_sel: SolcSelector,
+        analyzers: Sequence[str],
+        workers: int = 1,
+        settle_sec: float = SETTLE_SEC,
+    ) -> None:
+        self.config = config
+        self.solc_sel = solc_sel
+        self.analyzers = analyzers
+        self.workers = workers
+        self.debouncer = Debouncer(settle_sec)
+        self.latency = LatencyLog(config.watch_latency)
+        self.lock = threading.Lock()
+        self.summary = load_summary(config.run_summary)
+        self.manifest = load_manifest(config.manifest)
+        self.running: dict[FileName, Future[None]] = {}
+        # parse outcome of each contract since the last flush, None if deleted
+        self.parsed: dict[FileName, ParseResults | None] = {}
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        self.index = 0
+        self.inotify = Inotify(config.patched_contracts_old)
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="slith-worker"
+        )
+        self.wake_r, self.wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+
+    def handle(self, event: InotifyEvent, now: float) -> None:
+        if event.mask & IN_Q_OVERFLOW:
+            self.rescan(now)
+        elif not event.name.endswith(".sol"):
+            return
+        elif event.mask & DELETE_EVENTS:
+            self.debouncer.discard(event.name)
+            if not (self.config.patched_contracts_old / event.name).exists():
+                self.pool.submit(self._forget, event.name)
+        elif event.mask & WRITE_EVENTS:
+            self.debouncer.touch(event.name, now)
+
+    def rescan(self, now: float) -> None:
+        """Queue every contract that differs from the manifest."""
+        with self.lock:
+            changes = changes_from_manifest(
+                self.manifest,
+                self.config.contracts_glob(),
+                partial(result_key, self.config),
+            )
+        for sol_path in changes.changed:
+            self.debouncer.touch(sol_path.name, now)
+        for name in changes.deleted:
+            self.pool.submit(self._forget, name)
+
+    def poll(self, timeout_sec: float = 1.0) -> None:
+        next_timeout = self.debouncer.next_timeout(time.time())
+        if next_timeout is not None and len(self.running) < self.workers:
+            timeout_sec = min(timeout_sec, next_timeout)
+        readable, _, _ = select.select(
+            [self.inotify.fd, self.wake_r], [], [], timeout_sec
+        )
+        if self.wake_r in readable:
+            os.read(self.wake_r, 4096)
+        if self.inotify.fd in readable:
+            for event in self.inotify.read():
+                self.handle(event, time.time())
+        self._reap()
+        self._count()
+        for name, arrival in self.debouncer.ready(time.time()):
+            if len(self.running) >= self.workers:
+                break
+            if name in self.running:
+                continue
+            self.debouncer.discard(name)
+            sol_path = self.config.patched_contracts_old / name
+            if sol_path.exists():
+                future = self.pool.submit(self._analyze, sol_path, arrival)
+                future.add_done_callback(self._wake)
+                self.running[name] = future
+        self._count()
+        if time.monotonic() - self.last_flush >= FLUSH_SEC:
+            self.flush()
+            trace = self.config.trace
+            if trace is not None and len(trace.events) >= TRACE_ROTATE_EVENTS:
+                trace.rotate()
+
+    def _count(self) -> None:
+        if self.config.trace is not None:
+            self.config.trace.counter(
+                "queue",
+                settling=len(self.debouncer.last_event),
+                running=len(self.running),
+            )
+
+    def _wake(self, _: Future[None]) -> None:
+        try:
+            os.write(self.wake_w, b"x")
+        except BlockingIOError:
+            pass  # the pipe is full, so the poll loop wakes anyway
+
+    def _reap(self) -> None:
+        for name, future in list(self.running.items()):
+            if future.done():
+                del self.running[name]
+                future.result()
+
+    def idle(self) -> bool:
+        return not self.running and not self.debouncer.last_event
+
+    def _forget(self, name: FileName) -> None:
+        with self.lock:
+            remove_results(self.config, name)
+            self.parsed[name] = None
+            self.summary.forget([name])
+            self.manifest.pop(name, None)
+            self.dirty = True
+
+    def flush(self) -> None:
+        """Save the summary, manifest and parse lists if anything changed."""
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.dirty:
+                return
+            fresh = ParseResults()
+            for parsed in self.parsed.values():
+                if parsed is not None:
+                    fresh.extend(parsed)
+            deleted = [name for name, parsed in self.parsed.items() if parsed is None]
+            merge_parse_results(self.config, fresh, deleted)
+            self.parsed.clear()
+            self.summary.save(self.config.run_summary)
+            save_manifest(self.config.manifest, self.manifest)
+            self.dirty = False
+
+    def _prepare(self, sol_path: Path) -> PreparedContract | None:
+        name = sol_path.name
+        with self.lock:
+            sol_text = sol_path.read_text()
+            remove_results(self.config, name)
+            parsed = parse_contracts(
+                self.config, iter([sol_path]), solc_sel=self.solc_sel
+            )
+            self.parsed[name] = parsed
+            if name not in parsed.ok_list:
+                return None
+            self.index += 1
+            trace = self.config.trace
+            with span(trace, "resolve version", "solc", contract=name):
+                contract = prepare_contract(
+                    self.solc_sel,
+                    self.index,
+                    sol_path,
+                    sol_text,
+                    self.config.version_search,
+                )
+            with span(trace, "solc install", "solc", version=contract.version):
+                self.solc_sel.install(contract.version)
+            contract.env = solc_env(contract.version)
+            return contract
+
+    def _analyze(self, sol_path: Path, arrival: float) -> None:
+        name = sol_path.name
+        digest = error = None
+        results: dict[str, int] = {}
+        try:
+            digest = result_key(self.config, sol_path)
+            contract = self._prepare(sol_path)
+            if contract is not None:
+                results = run_analyzers(self.config, contract, self.analyzers)
+        except Exception as exc:
+            error = f"failed: {exc!r}"
+        with self.lock:
+            self.summary.forget([name])
+            for tool, ret_code in results.items():
+                self.summary.record(tool, name, ret_code)
+            if digest is None:
+                self.manifest.pop(name, None)  # e.g. deleted before it was read
+            else:
+                self.manifest[name] = digest
+            self.dirty = True
+            self.latency.record(name, arrival, time.time(), results, error)
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+        self._reap()
+        self.flush()
+        self.inotify.close()
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
+    def __enter__(self) -> "Watcher":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def watch(
+    config: Config,
+    solc_sel: SolcSelector,
+    analyzers: Sequence[str],
+    workers: int = 1,
+    settle_sec: float = SETTLE_SEC,
+    catch_up: bool = False,
+) -> None:
+    with Watcher(config, solc_sel, analyzers, workers, settle_sec) as watcher:
+        print(f"watching {config.patched_contracts_old}")
+        if catch_up:
+            watcher.rescan(time.time())
+        try:
+            while True:
+                watcher.poll()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(watcher.latency.report())
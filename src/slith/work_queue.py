@@ -0,0 +1,208 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from slith.util import FileName
+from slith.config import Config
+from slith.summary import RunSummary
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+# The default rollback journal is used on purpose: WAL mode needs shared
+# memory and does not work across hosts on a network filesystem.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS contracts_state ON contracts (state);
+CREATE TABLE IF NOT EXISTS results (
+    tool TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ret_code INTEGER NOT NULL,
+    PRIMARY KEY (tool, name)
+);
+"""
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(
+        self,
+        path: Path,
+        lease_sec: float = 600.0,
+        max_attempts: int = 3,
+        owner: str | None = None,
+    ) -> None:
+        self.path = path
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.owner = owner or default_owner()
+        self.conn = self.connect()
+        self.conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def populate(self, contracts: Iterable[Path]) -> int:
+        with self._transaction():
+            cursor = self.conn.executemany(
+                "INSERT OR IGNORE INTO contracts (name) VALUES (?)",
+                ((sol_path.name,) for sol_path in contracts),
+            )
+            return cursor.rowcount
+
+    def requeue_expired(self) -> int:
+        with self._transaction():
+            return self._requeue_expired()
+
+    def _requeue_expired(self) -> int:
+        now = time.time()
+        failed = self.conn.execute(
+            "UPDATE contracts SET state = ?, owner = NULL "
+            "WHERE state = ? AND lease_until < ? AND attempts >= ?",
+            (FAILED, LEASED, now, self.max_attempts),
+        ).rowcount
+        requeued = self.conn.execute(
+            "UPDATE contracts SET state = ?, owner = NULL "
+            "WHERE state = ? AND lease_until < ?",
+            (PENDING, LEASED, now),
+        ).rowcount
+        return failed + requeued
+
+    def claim(self) -> FileName | None:
+        with self._transaction():
+            self._requeue_expired()
+            row = self.conn.execute(
+                "SELECT name FROM contracts WHERE state = ? ORDER BY rowid LIMIT 1",
+                (PENDING,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE contracts SET state = ?, owner = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE name = ?",
+                (LEASED, self.owner, time.time() + self.lease_sec, row[0]),
+            )
+            return str(row[0])
+
+    def renew(self, name: FileName, conn: sqlite3.Connection | None = None) -> bool:
+        cursor = (conn or self.conn).execute(
+            "UPDATE contracts SET lease_until = ? "
+            "WHERE name = ? AND owner = ? AND state = ?",
+            (time.time() + self.lease_sec, name, self.owner, LEASED),
+        )
+        return cursor.rowcount == 1
+
+    def release(self, name: FileName) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE contracts SET state = ?, owner = NULL, lease_until = NULL, "
+            "attempts = attempts - 1 WHERE name = ? AND owner = ? AND state = ?",
+            (PENDING, name, self.owner, LEASED),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, name: FileName, results: dict[str, int]) -> bool:
+        with self._transaction():
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (tool, name, ret_code) "
+                "VALUES (?, ?, ?)",
+                ((tool, name, ret_code) for tool, ret_code in results.items()),
+            )
+            cursor = self.conn.execute(
+                "UPDATE contracts SET state = ?, lease_until = NULL "
+                "WHERE name = ? AND owner = ?",
+                (DONE, name, self.owner),
+            )
+            return cursor.rowcount == 1
+
+    def counts(self) -> dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT state, COUNT(*) FROM contracts GROUP BY state"
+        ).fetchall()
+        return {str(state): int(count) for state, count in rows}
+
+    def summary(self) -> RunSummary:
+        summary = RunSummary()
+        for tool, name, ret_code in self.conn.execute(
+            "SELECT tool, name, ret_code FROM results"
+        ):
+            summary.record(tool, name, ret_code)
+        return summary
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self.conn)
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_: object) -> None:
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+class LeaseKeeper(threading.Thread):
+    def __init__(self, queue: WorkQueue, name: FileName) -> None:
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.contract = name
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        conn = self.queue.connect()
+        try:
+            while not self.stop_event.wait(self.queue.lease_sec / 3):
+                if not self.queue.renew(self.contract, conn):
+                    break
+        finally:
+            conn.close()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        self.join()
+
+
+def complete_contract(
+    queue: WorkQueue, config: Config, summary: RunSummary, name: FileName
+) -> None:
+    """Mark a contract done once its result files are on disk."""
+    if config.writer is not None:
+        config.writer.flush()
+    queue.complete(name, summary.results_of(name))
+
+
+def queued_contracts(
+    queue: WorkQueue, config: Config, summary: RunSummary
+) -> Iterator[Path]:
+    while (name := queue.claim()) is not None:
+        keeper = LeaseKeeper(queue, name)
+        keeper.start()
+        try:
+            yield config.patched_contracts_old / name
+        except GeneratorExit:
+            keeper.stop()
+            queue.release(name)
+            raise
+        keeper.stop()
+        complete_contract(queue, config, summary, name)
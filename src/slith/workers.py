@@ -0,0 +1,155 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Sequence
+
+from slith.util import FileName
+from slith.config import Config
+from slith.solc_select import SolcSelector, solc_env
+from slith.pipeline import prepare_contract, run_analyzers
+from slith.admission import Admission
+from slith.usage import source_size
+from slith.autoscale import Autoscaler
+from slith.trace import span
+
+POLL_SEC = 1.0
+Results = dict[FileName, dict[str, int]]
+
+
+@dataclass
+class Job:
+    slot: int
+    name: FileName
+    predicted_kb: int
+
+
+class WorkerPool:
+    """Analyze up to `workers` contracts at the same time.
+
+    Version resolution and solc installs are serialized by a lock; the
+    analyzers of each contract get their solc version through the
+    environment, as in watch mode. With an Admission, a contract also waits
+    until its predicted memory peak fits; with an Autoscaler, the number of
+    contracts in flight follows the load of the host. With an affinity,
+    each worker slot and the analyzers it starts run on their own CPUs.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        solc_sel: SolcSelector,
+        analyzers: Sequence[str],
+        workers: int,
+        admission: Admission | None = None,
+        autoscaler: Autoscaler | None = None,
+        affinity: list[set[int]] | None = None,
+    ) -> None:
+        self.config = config
+        self.solc_sel = solc_sel
+        self.analyzers = analyzers
+        self.limit = workers if autoscaler is None else autoscaler.low
+        self.admission = admission
+        self.autoscaler = autoscaler
+        self.affinity = affinity
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="slith-worker"
+        )
+        self.free_slots = list(range(workers - 1, -1, -1))
+        self.running: dict[Future[dict[str, int]], Job] = {}
+        self.held_back = 0
+
+    def _scale(self) -> None:
+        if self.autoscaler is None:
+            return
+        limit = self.autoscaler.update(self.limit)
+        if limit != self.limit and self.config.trace is not None:
+            self.config.trace.counter("workers", limit=limit)
+        self.limit = limit
+
+    def _admit(self, predicted_kb: int) -> bool:
+        self._scale()
+        if len(self.running) >= self.limit:
+            return False
+        if self.admission is None or not self.running:
+            return True  # a single contract always runs, or nothing would
+        if self.admission.under_pressure():
+            return False
+        running_kb = [job.predicted_kb for job in self.running.values()]
+        return self.admission.admit(predicted_kb, running_kb)
+
+    def add(self, index: int, sol_path: Path, sol_text: str) -> Results:
+        predicted_kb = 0
+        if self.admission is not None:
+            predicted_kb = self.admission.predict(
+                self.analyzers, sol_path.name, source_size(sol_path, sol_text)
+            )
+        results: Results = {}
+        held = False
+        while not self._admit(predicted_kb):
+            if not held and len(self.running) < self.limit:
+                held = True
+                self.held_back += 1
+            results.update(self._reap(POLL_SEC))
+        job = Job(self.free_slots.pop(), sol_path.name, predicted_kb)
+        future = self.executor.submit(self._analyze, job, index, sol_path, sol_text)
+        self.running[future] = job
+        results.update(self._reap(0))
+        return results
+
+    def _reap(self, timeout_sec: float | None) -> Results:
+        done, _ = wait(self.running, timeout=timeout_sec, return_when=FIRST_COMPLETED)
+        results: Results = {}
+        for future in done:
+            job = self.running.pop(future)
+            self.free_slots.append(job.slot)
+            results[job.name] = future.result()
+        return results
+
+    def flush(self) -> Results:
+        results: Results = {}
+        while self.running:
+            results.update(self._reap(None))
+        return results
+
+    def _analyze(
+        self, job: Job, index: int, sol_path: Path, sol_text: str
+    ) -> dict[str, int]:
+        if self.affinity is not None:
+            # threads and processes started from here inherit the mask
+            os.sched_setaffinity(0, self.affinity[job.slot])
+        trace = self.config.trace
+        with nullcontext() if trace is None else trace.on_track(f"worker {job.slot}"):
+            with self.lock:
+                with span(trace, "resolve version", "solc", contract=job.name):
+                    contract = prepare_contract(
+                        self.solc_sel,
+                        index,
+                        sol_path,
+                        sol_text,
+                        self.config.version_search,
+                    )
+                with span(trace, "solc install", "solc", version=contract.version):
+                    self.solc_sel.install(contract.version)
+            contract.env = solc_env(contract.version)
+            return run_analyzers(self.config, contract, self.analyzers)
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        if self.held_back:
+            print(f"memory: {self.held_back} contracts waited for memory to free up")
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
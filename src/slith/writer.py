@@ -0,0 +1,104 @@
+import os
+import threading
+from pathlib import Path
+from queue import Queue, Empty
+from types import TracebackType
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+class ResultWriter(threading.Thread):
+    """Write result files on a background thread, syncing them in groups.
+
+    write() blocks while max_pending writes are queued, which slows the
+    producers down to the speed of the filesystem.
+    """
+
+    def __init__(
+        self, max_pending: int = 256, group_size: int = 64, fsync: bool = True
+    ) -> None:
+        super().__init__(name="slith-writer", daemon=True)
+        self.queue: Queue[tuple[Path, str | bytes] | None] = Queue(maxsize=max_pending)
+        self.group_size = group_size
+        self.fsync = fsync
+        self.error: BaseException | None = None
+        self.written = 0
+
+    def write(self, path: Path, data: str | bytes) -> None:
+        self._raise_error()
+        self.queue.put((path, data))
+
+    def flush(self) -> None:
+        self.queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self.is_alive():
+            self.queue.put(None)
+            self.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError("Background result write failed") from error
+
+    def __enter__(self) -> "ResultWriter":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def run(self) -> None:
+        stop = False
+        while not stop:
+            group: list[tuple[Path, str | bytes]] = []
+            item = self.queue.get()
+            while item is not None:
+                group.append(item)
+                if len(group) >= self.group_size:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except Empty:
+                    break
+            stop = item is None
+            try:
+                self._write_group(group)
+            except BaseException as exc:
+                self.error = exc
+            finally:
+                for _ in range(len(group) + stop):
+                    self.queue.task_done()
+
+    def _write_group(self, group: list[tuple[Path, str | bytes]]) -> None:
+        fds: list[int] = []
+        try:
+            for path, data in group:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                fds.append(fd)
+                _write_all(fd, data.encode() if isinstance(data, str) else data)
+            if self.fsync:
+                for fd in fds:
+                    os.fsync(fd)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        if self.fsync:
+            for directory in {path.parent for path, _ in group}:
+                dir_fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+        self.written += len(group)
@@ -1,10 +1,13 @@
 import pytest
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Iterator
 
 from slith.config import Config
 from slith.solc_select import SolcSelector
-from slith.__main__ import check_contracts, run
+from slith.summary import RunSummary
+from slith.slither import write_slither_result
+from slith.__main__ import check_contracts, main, run
 
 
 @pytest.fixture
@@ -50,11 +53,12 @@ def test_check_contracts(config, sample_contracts, monkeypatch):
     def mock_contracts_iterator() -> Iterator[Path]:
         return iter(sorted(sample_contracts))
 
-    def mock_slither_one_sol(*args, **kwargs):
+    def mock_analyze_one_sol(*args, **kwargs):
         nonlocal called_count
         called_count += 1
+        return {}
 
-    monkeypatch.setattr("slith.__main__.slither_one_sol", mock_slither_one_sol)
+    monkeypatch.setattr("slith.__main__.analyze_one_sol", mock_analyze_one_sol)
 
     check_contracts(config, solc_sel, mock_contracts_iterator(), limit=-1)
     assert called_count == len(sample_contracts)
@@ -68,11 +72,12 @@ def test_check_contracts_with_limit(config, sample_contracts, monkeypatch):
     def mock_contracts_iterator() -> Iterator[Path]:
         return iter(sorted(sample_contracts))
 
-    def mock_slither_one_sol(*args, **kwargs):
+    def mock_analyze_one_sol(*args, **kwargs):
         nonlocal called_count
         called_count += 1
+        return {}
 
-    monkeypatch.setattr("slith.__main__.slither_one_sol", mock_slither_one_sol)
+    monkeypatch.setattr("slith.__main__.analyze_one_sol", mock_analyze_one_sol)
 
     check_contracts(config, solc_sel, mock_contracts_iterator(), limit=1)
     assert called_count == 1
@@ -85,14 +90,84 @@ def test_run(config, sample_contracts, monkeypatch):
     def mock_contracts_that_parse(config):
         return iter(sorted(sample_contracts))
 
-    def mock_slither_one_sol(*args, **kwargs):
+    def mock_analyze_one_sol(*args, **kwargs):
         nonlocal called_count
         called_count += 1
+        return {}
 
     monkeypatch.setattr(
         "slith.__main__.contracts_that_parse", mock_contracts_that_parse
     )
-    monkeypatch.setattr("slith.__main__.slither_one_sol", mock_slither_one_sol)
+    monkeypatch.setattr("slith.__main__.analyze_one_sol", mock_analyze_one_sol)
 
     run(config)
     assert called_count == len(sample_contracts)
+
+
+def test_summary_command(config, capsys, monkeypatch):
+    """Test that the summary query prints counts and the startup profile"""
+    monkeypatch.setattr("slith.startup.PROFILE", None)
+    summary = RunSummary()
+    summary.record("mythril", "a.sol", 1)
+    summary.save(config.run_summary)
+    main(["--data-dir", str(config.data_dir), "--profile-startup", "summary"])
+    captured = capsys.readouterr()
+    assert captured.out == "mythril: 1 {'ret_1': 1}\n"
+    assert "startup profile" in captured.err
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_run_triage(config, sample_contracts, monkeypatch, capsys, write_behind):
+    """Test that mythril runs only where slither flagged an impact"""
+    config.write_behind = write_behind
+    config.triage = True
+    config.triage_sample = 0.0
+    mythril_runs = []
+
+    def mock_analyze_one_sol(config, solc_sel, index, sol_path, sol_text, analyzers):
+        if analyzers == ("mythril",):
+            mythril_runs.append(sol_path.name)
+            return {"mythril": 0}
+        impacts = '"High"' if sol_path.name == "error.sol" else '""'
+        extra = {"impacts": impacts}
+        write_slither_result(
+            config, index, sol_path, sol_text, None, "0.8.0", 0, "", extra
+        )
+        return {"slither": 0}
+
+    monkeypatch.setattr(
+        "slith.__main__.contracts_that_parse", lambda config: iter(sample_contracts)
+    )
+    monkeypatch.setattr("slith.__main__.analyze_one_sol", mock_analyze_one_sol)
+
+    run(config)
+    assert mythril_runs == ["error.sol"]
+    assert "mythril on 1 of 3 contracts (1 flagged" in capsys.readouterr().out
+
+
+def test_run_sample(config, sample_contracts, monkeypatch, capsys):
+    """Test that a sample run extrapolates to the whole corpus"""
+    config.sample_size = 2
+    analyzed = []
+
+    def mock_version_from_pragma(solc_sel, sol_text):
+        # one stratum per contract, each pragma its own version
+        pragma = sol_text.split(";")[0]
+        return SimpleNamespace(version_to_use=lambda solc_sel: pragma)
+
+    def mock_analyze_one_sol(config, solc_sel, index, sol_path, sol_text, analyzers):
+        analyzed.append(sol_path.name)
+        return {"mythril": 1}
+
+    monkeypatch.setattr(
+        "slith.__main__.contracts_that_parse", lambda config: iter(sample_contracts)
+    )
+    monkeypatch.setattr("slith.__main__.analyze_one_sol", mock_analyze_one_sol)
+    monkeypatch.setattr("slith.sample.version_from_pragma", mock_version_from_pragma)
+
+    run(config)
+    assert len(analyzed) == 2
+    out = capsys.readouterr().out
+    assert "sample: analyzing 2 of 3 contracts in 3 strata" in out
+    assert "sample: 2 of 3 contracts in 3 strata" in out
+    assert "mythril ret_1: 2 ± 0 (without 1 contracts of unknown strata)" in out
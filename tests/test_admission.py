@@ -0,0 +1,80 @@
+import subprocess
+import sys
+import time
+
+from slith.admission import (
+    Admission,
+    RssPredictor,
+    descendants_rss_kb,
+    mem_available_kb,
+)
+
+
+def record(name, size, max_rss_kb, tool="mythril"):
+    return {"tool": tool, "name": name, "size": size, "max_rss_kb": max_rss_kb}
+
+
+def test_mem_available(tmp_path):
+    """Test reading MemAvailable from a meminfo file"""
+    meminfo = tmp_path / "meminfo"
+    meminfo.write_text("MemTotal: 16000000 kB\nMemAvailable:    9000000 kB\n")
+    assert mem_available_kb(meminfo) == 9000000
+    assert mem_available_kb(tmp_path / "missing") is None
+
+
+def test_descendants_rss():
+    """Test that the memory of a running child is seen"""
+    child = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "x = bytearray(64 * 1024 * 1024); import time; time.sleep(30)",
+        ]
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while descendants_rss_kb() < 64 * 1024 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert descendants_rss_kb() >= 64 * 1024
+        assert descendants_rss_kb(child.pid) == 0
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_predictor():
+    """Test predictions from own history, then size band, then tool"""
+    predictor = RssPredictor(
+        [
+            record("a.sol", 1000, 500_000),
+            record("b.sol", 1000, 300_000),
+            record("c.sol", 100_000, 2_000_000),
+            record("a.sol", 1000, 90_000, tool="slither"),
+        ],
+        default_kb=123,
+    )
+    assert predictor.predict("mythril", "a.sol", 1000) == 500_000
+    assert predictor.predict("mythril", "new.sol", 2000) == 480_000
+    assert predictor.predict("mythril", "new.sol", 20_000) == 1_700_000
+    assert predictor.predict("slither", "new.sol", 100_000) == 90_000
+    assert predictor.predict("unknown", "a.sol", 1000) == 123
+
+
+def test_admission():
+    """Test that running analyzers' remaining growth is reserved"""
+    state = {"available": 5_000, "in_use": 0}
+    admission = Admission(
+        RssPredictor([], default_kb=1_000),
+        headroom_kb=1_000,
+        available=lambda: state["available"],
+        in_use=lambda: state["in_use"],
+    )
+    assert admission.predict(("mythril", "slither"), "a.sol", 10) == 2_000
+    assert admission.admit(2_000, [])
+    assert admission.admit(2_000, [2_000])
+    assert not admission.admit(2_000, [2_000, 2_000])
+    state["in_use"] = 3_000
+    assert admission.admit(2_000, [2_000, 2_000])
+    assert not admission.under_pressure()
+    state["available"] = 500
+    assert admission.under_pressure()
@@ -0,0 +1,67 @@
+import os
+import threading
+import pytest
+
+from slith.affinity import (
+    core_sets,
+    format_cpulist,
+    numa_nodes,
+    parse_cpulist,
+    physical_cores,
+    pinned_cpus,
+)
+
+
+@pytest.fixture
+def sys_dir(tmp_path):
+    """Two NUMA nodes of two cores with two hyperthreads each"""
+    for node, cpulist in ((0, "0-1,4-5"), (1, "2-3,6-7")):
+        (tmp_path / "node" / f"node{node}").mkdir(parents=True)
+        (tmp_path / "node" / f"node{node}" / "cpulist").write_text(cpulist + "\n")
+    for cpu in range(8):
+        topology = tmp_path / "cpu" / f"cpu{cpu}" / "topology"
+        topology.mkdir(parents=True)
+        (topology / "thread_siblings_list").write_text(f"{cpu % 4},{cpu % 4 + 4}\n")
+    return tmp_path
+
+
+def test_cpulist():
+    """Test reading and writing kernel cpu lists"""
+    assert parse_cpulist("0-2,5,8-9\n") == {0, 1, 2, 5, 8, 9}
+    assert format_cpulist({0, 1, 2, 5, 8, 9}) == "0-2,5,8-9"
+    assert parse_cpulist("") == set()
+
+
+def test_topology(sys_dir):
+    """Test nodes and cores read from /sys, restricted to allowed CPUs"""
+    allowed = set(range(8)) - {7}
+    assert numa_nodes(allowed, sys_dir) == [{0, 1, 4, 5}, {2, 3, 6}]
+    assert physical_cores({2, 3, 6}, sys_dir) == [{2, 6}, {3}]
+    assert numa_nodes({0, 1}, sys_dir / "missing") == [{0, 1}]
+
+
+def test_core_sets(sys_dir):
+    """Test that slots get whole cores of one node"""
+    nodes = [
+        physical_cores(node, sys_dir) for node in numa_nodes(set(range(8)), sys_dir)
+    ]
+    assert core_sets(2, nodes) == [{0, 4, 1, 5}, {2, 6, 3, 7}]
+    assert core_sets(4, nodes) == [{0, 4}, {2, 6}, {1, 5}, {3, 7}]
+    assert core_sets(6, nodes) == [{0, 4}, {2, 6}, {1, 5}, {3, 7}, {0, 4}, {2, 6}]
+
+
+@pytest.mark.skipif(len(os.sched_getaffinity(0)) < 2, reason="needs two CPUs")
+def test_pinned_cpus():
+    """Test that a pinned thread reports its CPUs and the main thread none"""
+    cpu = min(os.sched_getaffinity(0))
+    seen = []
+
+    def pinned():
+        os.sched_setaffinity(0, {cpu})
+        seen.append(pinned_cpus())
+
+    thread = threading.Thread(target=pinned)
+    thread.start()
+    thread.join()
+    assert seen == [str(cpu)]
+    assert pinned_cpus() == ""
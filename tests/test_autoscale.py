@@ -0,0 +1,68 @@
+from slith.autoscale import Autoscaler, LoadProbe, LoadSample, read_pressure
+
+IDLE = LoadSample(0.2, 0.0, 0.0, 0.0)
+BUSY = LoadSample(0.85, 0.0, 0.0, 0.0)
+OVERLOADED = LoadSample(0.5, 0.0, 0.0, 25.0)
+
+
+def write_proc(proc, load, total, steal):
+    (proc / "loadavg").write_text(f"{load} 1.00 1.00 2/300 4000\n")
+    idle = total - steal - 300
+    (proc / "stat").write_text(f"cpu  100 0 200 {idle} 0 0 0 {steal} 0 0\n")
+
+
+def test_read_pressure(tmp_path):
+    """Test reading the 10 s average of stalled time"""
+    path = tmp_path / "memory"
+    path.write_text(
+        "some avg10=12.50 avg60=3.00 avg300=1.00 total=123\n"
+        "full avg10=4.00 avg60=1.00 avg300=0.50 total=45\n"
+    )
+    assert read_pressure(path) == 12.5
+    assert read_pressure(tmp_path / "missing") == 0.0
+
+
+def test_load_probe(tmp_path):
+    """Test load per CPU and the steal share since the last sample"""
+    (tmp_path / "pressure").mkdir()
+    (tmp_path / "pressure" / "cpu").write_text("some avg10=7.00 avg60=0 avg300=0\n")
+    write_proc(tmp_path, 2.0, 1000, 0)
+    probe = LoadProbe(tmp_path, cpus=4)
+    write_proc(tmp_path, 6.0, 2000, 200)
+    assert probe.sample() == LoadSample(1.5, 0.2, 7.0, 0.0)
+
+
+def test_autoscaler_hysteresis():
+    """Test steps of one within bounds, after confirmed samples only"""
+    scaler = Autoscaler(1, 3, sample=lambda: IDLE)
+    assert scaler.decide(2, IDLE) == 2
+    assert scaler.decide(2, IDLE) == 3
+    assert scaler.decide(3, IDLE) == 3
+    assert scaler.decide(3, IDLE) == 3
+    assert scaler.decide(3, BUSY) == 3
+    assert scaler.decide(3, OVERLOADED) == 3
+    assert scaler.decide(3, IDLE) == 3
+    assert scaler.decide(3, OVERLOADED) == 3
+    assert scaler.decide(3, OVERLOADED) == 2
+    assert scaler.decide(2, OVERLOADED) == 2
+    assert scaler.decide(2, OVERLOADED) == 1
+    assert scaler.decide(1, OVERLOADED) == 1
+    assert scaler.decide(1, OVERLOADED) == 1
+    assert scaler.changes == 3
+
+
+def test_autoscaler_interval():
+    """Test that the load is sampled at most once per interval"""
+    now = [0.0]
+    samples = []
+
+    def sample():
+        samples.append(now[0])
+        return IDLE
+
+    scaler = Autoscaler(1, 4, sample, interval_sec=10.0, clock=lambda: now[0])
+    current = 1
+    for now[0] in (1.0, 10.0, 15.0, 20.0, 30.0):
+        current = scaler.update(current)
+    assert samples == [10.0, 20.0, 30.0]
+    assert current == 2
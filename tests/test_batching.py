@@ -0,0 +1,188 @@
+import json
+import re
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.util import JobUsage, ProcessResult
+from slith.usage import load_usage
+from slith.pipeline import ANALYZERS, PreparedContract
+from slith.batching import (
+    Batcher,
+    attribute_blocks,
+    mythril_batch,
+    run_batch_analyzer,
+    slither_batch,
+    split_blocks,
+)
+
+MYTHRIL_STDOUT = (
+    "==== External Call To User-Supplied Address ====\n"
+    "SWC ID: 107\n"
+    "In file: /corpus/a.sol:12\n"
+    "\n"
+    "==== Integer Arithmetic Bugs ====\n"
+    "SWC ID: 101\n"
+    "In file: /corpus/b.sol:3\n"
+)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    return Config()
+
+
+def _contracts(*names):
+    return [
+        PreparedContract(index, Path("/corpus") / name, "contract A {}", None, "0.8.19")
+        for index, name in enumerate(names)
+    ]
+
+
+def test_split_blocks():
+    """Test splitting output on block start and end lines"""
+    text = "INFO:Detectors:\nA (a.sol#1)\nReference: x\nB (b.sol#2)\nReference: y\n"
+    blocks = split_blocks(text, re.compile("^INFO:"), re.compile("^Reference: "))
+    assert blocks == [
+        "INFO:Detectors:\nA (a.sol#1)\nReference: x\n",
+        "B (b.sol#2)\nReference: y\n",
+    ]
+
+
+def test_attribute_blocks():
+    """Test attributing blocks to the files they mention"""
+    blocks = ["banner\n", "issue in a.sol:3\n", "issue in /x/ba.sol#1\n"]
+    shared, per_file = attribute_blocks(blocks, ["a.sol", "ba.sol"])
+    assert shared == ["banner\n"]
+    assert per_file == {
+        "a.sol": ["issue in a.sol:3\n"],
+        "ba.sol": ["issue in /x/ba.sol#1\n"],
+    }
+
+
+def test_mythril_batch_splits_results(config, monkeypatch):
+    """Test that a mythril batch is split back into per contract results"""
+    calls = []
+
+    def mock_subrun(cmd, timeout_sec):
+        calls.append((cmd, timeout_sec))
+        return ProcessResult(1, MYTHRIL_STDOUT, "", False)
+
+    monkeypatch.setattr("slith.mythril.subrun", mock_subrun)
+    results = mythril_batch(config, _contracts("a.sol", "b.sol", "c.sol"))
+
+    assert results == {"a.sol": 1, "b.sol": 1, "c.sol": 0}
+    assert calls[0][0][2:] == ["/corpus/a.sol", "/corpus/b.sol", "/corpus/c.sol"]
+    assert calls[0][1] == config.mythril_timeout_sec * 3
+    a_text = (config.mythril_results_1 / "a.txt").read_text()
+    assert "SWC ID: 107" in a_text
+    assert "SWC ID: 101" not in a_text
+    assert "  batch: 3\n" in a_text
+    assert 'sol: "c.sol"' in (config.mythril_results_other / "c.txt").read_text()
+
+
+def test_batch_records_usage_and_outcome(config, monkeypatch):
+    """Test that every member records its share of the usage and an outcome"""
+    usage = JobUsage(9.0, 3.0, 512_000, 30, 6, wall_sec=15.0)
+
+    def mock_subrun(cmd, timeout_sec):
+        return ProcessResult(1, MYTHRIL_STDOUT, "", False, usage)
+
+    monkeypatch.setattr("slith.mythril.subrun", mock_subrun)
+    mythril_batch(config, _contracts("a.sol", "b.sol", "c.sol"))
+    records = {record["name"]: record for record in load_usage(config.usage_log)}
+    assert sorted(records) == ["a.sol", "b.sol", "c.sol"]
+    assert records["a.sol"]["user_sec"] == 3.0
+    assert records["a.sol"]["wall_sec"] == 5.0
+    assert records["a.sol"]["max_rss_kb"] == 512_000
+    assert records["c.sol"]["outcome"] == "success"
+    a_text = (config.mythril_results_1 / "a.txt").read_text()
+    assert "  outcome: success\n" in a_text
+    assert "  cpu_user_sec: 3.0\n" in a_text
+
+
+def test_slither_batch_detectors_per_file(config, monkeypatch):
+    """Test that the detectors of a batch are attributed to their files"""
+    detectors = [
+        {
+            "check": "reentrancy-eth",
+            "impact": "High",
+            "elements": [{"source_mapping": {"filename_absolute": "/t/a.sol"}}],
+        },
+        {
+            "check": "naming-convention",
+            "impact": "Informational",
+            "elements": [{"source_mapping": {"filename_absolute": "/t/b.sol"}}],
+        },
+    ]
+
+    def mock_subrun(cmd, timeout_sec):
+        json_path = Path(cmd[cmd.index("--json") + 1])
+        json_path.write_text(json.dumps({"results": {"detectors": detectors}}))
+        return ProcessResult(0, "", "INFO:Slither:x analyzed (2 contracts)\n", False)
+
+    monkeypatch.setattr("slith.slither.subrun", mock_subrun)
+    monkeypatch.setattr(Path, "symlink_to", lambda self, target: None)
+    assert slither_batch(config, _contracts("a.sol", "b.sol")) == {
+        "a.sol": 0,
+        "b.sol": 0,
+    }
+    a_text = (config.slither_results_other / "a.txt").read_text()
+    assert '  detectors: "reentrancy-eth"\n' in a_text
+    assert '  impacts: "High"\n' in a_text
+    assert "  outcome: success\n" in a_text
+    b_text = (config.slither_results_other / "b.txt").read_text()
+    assert '  impacts: "Informational"\n' in b_text
+
+
+def test_failed_batch_falls_back(config, monkeypatch):
+    """Test that a batch failing as a whole is run again file by file"""
+    analyzed = []
+
+    def mock_subrun(cmd, timeout_sec):
+        return ProcessResult(1, "", "solc error", False)
+
+    def mock_analyzer(config, contract):
+        analyzed.append(contract.sol_path.name)
+        return 255
+
+    monkeypatch.setattr("slith.mythril.subrun", mock_subrun)
+    monkeypatch.setitem(ANALYZERS, "mythril", mock_analyzer)
+    results = run_batch_analyzer(config, "mythril", _contracts("a.sol", "b.sol"))
+    assert results == {"a.sol": 255, "b.sol": 255}
+    assert analyzed == ["a.sol", "b.sol"]
+
+
+def test_batcher_groups_by_version_and_size(config, monkeypatch):
+    """Test that the batcher groups small contracts of the same version"""
+    batches = []
+
+    class MockSolcSelector:
+        versions = [(0, 7, 6), (0, 8, 19)]
+        default_solidity_version = (0, 8, 19)
+
+        def caret_version(self, ver_tup):
+            return max(v for v in self.versions if v[:2] == ver_tup[:2])
+
+        def solc_use(self, version):
+            pass
+
+    def mock_analyze_batch(config, solc_sel, batch, analyzers):
+        batches.append([contract.sol_path.name for contract in batch])
+        return {contract.sol_path.name: {"mythril": 0} for contract in batch}
+
+    monkeypatch.setattr("slith.batching.analyze_batch", mock_analyze_batch)
+    config.batch_max_files = 2
+    batcher = Batcher(config, MockSolcSelector(), ("mythril",))
+    v8 = "pragma solidity ^0.8.0;\n"
+    v7 = "pragma solidity ^0.7.0;\n"
+    big = v8 + " " * config.batch_small_bytes
+
+    assert batcher.add(0, Path("a.sol"), v8) == {}
+    assert batcher.add(1, Path("b.sol"), v7) == {}
+    assert batcher.add(2, Path("big.sol"), big) == {"big.sol": {"mythril": 0}}
+    assert set(batcher.add(3, Path("c.sol"), v8)) == {"a.sol", "c.sol"}
+    assert set(batcher.flush()) == {"b.sol"}
+    assert batches == [["big.sol"], ["a.sol", "c.sol"], ["b.sol"]]
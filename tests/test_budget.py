@@ -0,0 +1,102 @@
+import json
+
+from slith.budget import (
+    MAX_EXECUTION_SEC,
+    MIN_EXECUTION_SEC,
+    attempt_limits,
+    budget_spent,
+    fit_budget,
+    limits_for,
+    plan_budget,
+    split_budget,
+)
+from slith.config import Config
+from slith.mythril import MythrilLimits
+
+
+def test_limits_for():
+    """Test that a shorter allowance explores shallower and is clamped"""
+    assert limits_for(10.0) == MythrilLimits(MIN_EXECUTION_SEC, 4_000, 22, 1)
+    assert limits_for(300.0) == MythrilLimits(300.0, 10_000, 50, 2)
+    assert limits_for(1e9) == MythrilLimits(MAX_EXECUTION_SEC, 25_000, 128, 3)
+
+
+def test_split_budget():
+    """Test the share of its prediction every contract gets"""
+    assert split_budget(100.0, {"a.sol": 150.0, "b.sol": 50.0}) == 0.5
+    assert split_budget(100.0, {}) == 1.0
+
+
+def test_fit_budget():
+    """Test that the time of clamped contracts is taken from the others"""
+    predicted = {"tiny.sol": 1.0, "a.sol": 100.0, "b.sol": 300.0}
+    assert fit_budget(230.0, predicted) == {
+        "tiny.sol": MIN_EXECUTION_SEC,
+        "a.sol": 50.0,
+        "b.sol": 150.0,
+    }
+    huge = fit_budget(1e6, {"a.sol": 1.0, "b.sol": 1.0, "c.sol": 0.0})
+    assert huge["a.sol"] == MAX_EXECUTION_SEC
+    assert huge["c.sol"] == MIN_EXECUTION_SEC
+
+
+def test_attempt_limits(monkeypatch):
+    """Test that a retry grows its limits only as far as the budget left"""
+    monkeypatch.setattr("slith.budget.time.monotonic", lambda: 1000.0)
+    config = Config()
+    config.retry_factor = 2.0
+    limits = MythrilLimits(300.0, 10_000, 50, 2)
+    assert attempt_limits(config, limits, 1).execution_timeout_sec == 600.0
+    config.mythril_deadline = 1000.0 + 460.0
+    assert attempt_limits(config, limits, 1).execution_timeout_sec == 400.0
+    assert not budget_spent(config)
+    config.mythril_deadline = 1000.0 + 80.0
+    assert budget_spent(config)
+
+
+def test_plan_budget(tmp_path, monkeypatch, capsys):
+    """Test that contracts split the budget in proportion to their cost"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.mythril_budget_hours = 1.0
+    config.workers = 2
+    contracts = []
+    for name, cpu_sec in (("cheap.sol", 1200.0), ("costly.sol", 6000.0)):
+        (tmp_path / name).write_text("contract A {}")
+        contracts.append(tmp_path / name)
+        record = {
+            "tool": "mythril",
+            "name": name,
+            "size": 13,
+            "user_sec": cpu_sec,
+            "sys_sec": 0.0,
+        }
+        config.ensure_dir(config.usage_log.parent)
+        with open(config.usage_log, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    limits = plan_budget(config, contracts)
+    # two runs take their wall margin out of the 7200 s first
+    assert limits["cheap.sol"].execution_timeout_sec == 1180.0
+    assert limits["costly.sol"].execution_timeout_sec == 5900.0
+    assert limits["cheap.sol"].max_depth == 128
+    out = capsys.readouterr().out
+    assert "2.0 h planned" in out
+    assert "too small" not in out
+    assert config.mythril_deadline is not None
+
+
+def test_plan_budget_too_small(tmp_path, monkeypatch, capsys):
+    """Test the warning when the minimum per contract exceeds the budget"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.mythril_budget_hours = 0.01
+    config.workers = 1
+    contracts = []
+    for i in range(1000):
+        (tmp_path / f"c{i}.sol").write_text("contract A {}")
+        contracts.append(tmp_path / f"c{i}.sol")
+    limits = plan_budget(config, contracts)
+    assert limits["c0.sol"].execution_timeout_sec == MIN_EXECUTION_SEC
+    assert "budget: too small for 1000 contracts at 90 s each" in (
+        capsys.readouterr().out
+    )
@@ -0,0 +1,70 @@
+import pytest
+
+from slith.config import Config
+from slith.compress import Codec, compressed_path, recompress, train_from_results
+from slith.storage import read_result, render, write_result
+
+zstandard = pytest.importorskip("zstandard")
+
+
+def _output(i):
+    return (
+        f'mythril:\n  index: {i}\n  sol: "c{i}.sol"\n===\n\n'
+        "==== Integer Arithmetic Bugs ====\nSWC ID: 101\nSeverity: High\n"
+        f"Contract: C{i}\nFunction name: transfer(address,uint256)\n"
+        f"PC address: {i * 37}\nIn file: c{i}.sol:{i % 50}\n"
+    )
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with many plain mythril results"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.make_dirs()
+    for i in range(300):
+        (config.mythril_results_1 / f"c{i}.txt").write_text(_output(i))
+    return config
+
+
+def test_codec_roundtrip(tmp_path):
+    """Test compressing without a dictionary"""
+    codec = Codec(tmp_path / "dicts")
+    assert codec.dict_id == 0
+    assert codec.decompress(codec.compress("hello\n")) == "hello\n"
+
+
+def test_recompress_with_trained_dictionary(config):
+    """Test training a dictionary and recompressing a results tree"""
+    codec = Codec(config.zstd_dicts_dir)
+    dict_id = train_from_results(config, codec, sample_size=200, dict_size=4096)
+    before, after = recompress(config, codec)
+
+    assert dict_id and codec.dict_id == dict_id
+    assert after * 4 < before
+    assert not (config.mythril_results_1 / "c7.txt").exists()
+    config.codec = None
+    assert read_result(
+        config, compressed_path(config.mythril_results_1 / "c7.txt")
+    ) == _output(7)
+
+
+def test_old_dictionary_stays_readable(config):
+    """Test reading frames written before the dictionary was retrained"""
+    codec = Codec(config.zstd_dicts_dir)
+    train_from_results(config, codec, sample_size=200, dict_size=4096)
+    old = codec.compress(_output(1))
+    codec.train([_output(i).upper().encode() for i in range(200)], dict_size=4096)
+    assert Codec(config.zstd_dicts_dir).decompress(old) == _output(1)
+
+
+def test_write_result_compressed(config):
+    """Test that compressed writes replace the plain result and render"""
+    config.codec = Codec(config.zstd_dicts_dir)
+    path = config.mythril_results_1 / "c1.txt"
+    config.patched_contracts_old.mkdir(parents=True)
+    (config.patched_contracts_old / "c1.sol").write_text("contract C1 {}")
+    write_result(config, path, "new result\n")
+    assert not path.exists()
+    assert compressed_path(path).exists()
+    assert render(config, "mythril", "c1.sol").startswith("/*\nnew result\n*/")
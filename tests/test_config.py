@@ -56,8 +56,21 @@ def test_subrun():
     assert result.stdout.strip() == "test"
 
 
+def test_config_creates_no_directories(config):
+    """Test that Config() itself touches nothing on disk"""
+    assert not config.data_dir.exists()
+
+
+def test_ensure_dir(config):
+    """Test lazy creation of a directory on first write"""
+    assert config.ensure_dir(config.mythril_results_1) == config.mythril_results_1
+    assert config.mythril_results_1.is_dir()
+    assert not config.results_1.exists()
+
+
 def test_config_initialization(config):
     """Test Config initialization and directory creation"""
+    config.make_dirs()
     # Check that all required directories are created
     dirs_to_check = [
         config.contracts_meta,
@@ -0,0 +1,119 @@
+import pytest
+from unittest.mock import patch
+
+from slith.config import Config
+from slith.summary import RunSummary, load_summary
+from slith.incremental import (
+    changes_from_list,
+    changes_from_manifest,
+    content_hash,
+    load_manifest,
+    remove_results,
+    result_key,
+    save_manifest,
+)
+from slith.__main__ import run_incremental
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with a small corpus"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.make_dirs()
+    config.patched_contracts_old.mkdir(parents=True)
+    for name in ("a.sol", "b.sol", "c.sol"):
+        (config.patched_contracts_old / name).write_text(f"contract {name[0]} {{}}\n")
+    return config
+
+
+def test_changes_from_manifest(config):
+    """Test detection of new, modified and deleted contracts"""
+    corpus = config.patched_contracts_old
+    manifest = {
+        "a.sol": content_hash(corpus / "a.sol"),
+        "b.sol": "old digest",
+        "gone.sol": "digest",
+    }
+    changes = changes_from_manifest(manifest, sorted(config.contracts_glob()))
+    assert [p.name for p in changes.changed] == ["b.sol", "c.sol"]
+    assert changes.deleted == ["gone.sol"]
+    assert sorted(changes.manifest) == ["a.sol", "b.sol", "c.sol"]
+
+
+def test_slither_profile_in_result_key(config):
+    """Test that a new slither profile makes every contract stale"""
+    sol_path = config.patched_contracts_old / "a.sol"
+    assert result_key(config, sol_path) == content_hash(sol_path)
+    config.analyzers = ("mythril", "slither")
+    config.slither_profile = "fast"
+    assert result_key(config, sol_path) == f"{content_hash(sol_path)}:fast"
+    manifest = {"a.sol": content_hash(sol_path)}
+    changes = changes_from_manifest(
+        manifest, [sol_path], lambda sol_path: result_key(config, sol_path)
+    )
+    assert changes.changed == [sol_path]
+
+
+def test_changes_from_list(config):
+    """Test an explicit list of changed paths"""
+    manifest = {"a.sol": "x", "gone.sol": "y"}
+    changes = changes_from_list(
+        config, manifest, ["/elsewhere/b.sol\n", "gone.sol", ""]
+    )
+    assert [p.name for p in changes.changed] == ["b.sol"]
+    assert changes.deleted == ["gone.sol"]
+    assert sorted(changes.manifest) == ["a.sol", "b.sol"]
+
+
+def test_manifest_roundtrip(config):
+    """Test saving and loading the manifest"""
+    save_manifest(config.manifest, {"a.sol": "1"})
+    assert load_manifest(config.manifest) == {"a.sol": "1"}
+
+
+def test_remove_results(config):
+    """Test removal of every stored result of a contract"""
+    (config.mythril_results_1 / "a.txt").write_text("m")
+    (config.slither_results_255 / "a.txt.zst").write_bytes(b"s")
+    (config.results_255 / "a.sol").write_text("s")
+    (config.results_1 / "b.txt").write_text("other contract")
+    assert remove_results(config, "a.sol") == 3
+    assert (config.results_1 / "b.txt").exists()
+
+
+def test_run_incremental(config, monkeypatch):
+    """Test that only changed contracts are analyzed and counts updated"""
+    analyzed = []
+
+    def mock_analyze_one_sol(config, solc_sel, index, sol_path, sol_text, analyzers):
+        analyzed.append(sol_path.name)
+        return {"mythril": 1}
+
+    monkeypatch.setattr("slith.__main__.analyze_one_sol", mock_analyze_one_sol)
+    summary = RunSummary()
+    summary.record("mythril", "gone.sol", 255)
+    summary.record("mythril", "a.sol", 0)
+    summary.save(config.run_summary)
+    corpus = config.patched_contracts_old
+    save_manifest(
+        config.manifest,
+        {"a.sol": content_hash(corpus / "a.sol"), "gone.sol": "x"},
+    )
+    (config.mythril_results_255 / "gone.txt").write_text("stale")
+
+    with patch("solidity_parser.parser.parse_file"):
+        run_incremental(config, solc_sel=None)
+
+    assert sorted(analyzed) == ["b.sol", "c.sol"]
+    assert not (config.mythril_results_255 / "gone.txt").exists()
+    assert load_summary(config.run_summary).counts("mythril") == {
+        "ret_1": 2,
+        "ret_other": 1,
+    }
+    assert sorted(load_manifest(config.manifest)) == ["a.sol", "b.sol", "c.sol"]
+
+    analyzed.clear()
+    with patch("solidity_parser.parser.parse_file"):
+        run_incremental(config, solc_sel=None)
+    assert analyzed == []
@@ -0,0 +1,60 @@
+from slith.lexical import (
+    RISK_HITS,
+    prefilter,
+    risk_score,
+    scan,
+    strip_comments_and_strings,
+    unbalanced,
+)
+
+
+def test_strip_comments_and_strings():
+    """Test that comments and string contents are blanked"""
+    code = strip_comments_and_strings('contract A { // }\n string s = "}"; /* { */ }')
+    assert "//" not in code
+    assert "/*" not in code
+    assert code.count("{") == 1
+    assert code.count("}") == 1
+
+
+def test_unbalanced():
+    """Test detection of unbalanced brackets"""
+    assert unbalanced("{ ( [ ] ) }") is None
+    assert unbalanced("{ ( }") == "unexpected '}'"
+    assert unbalanced("{ {") == "unclosed '{'"
+    assert unbalanced("}") == "unexpected '}'"
+
+
+def test_prefilter_accepts_solidity():
+    """Test that plausible Solidity passes the prefilter"""
+    sol_text = "pragma solidity ^0.8.0;\nlibrary L { function f() {} }\n"
+    assert prefilter(sol_text) is None
+
+
+def test_prefilter_rejects_garbage():
+    """Test that obvious garbage is rejected with a reason"""
+    assert prefilter("") == "no contract, library or interface"
+    assert prefilter("// contract A {}\n") == "no contract, library or interface"
+    assert prefilter("contract A { function f() {") == "unclosed '{'"
+    assert prefilter("contract A {}\0") == "binary content"
+
+
+def test_risk_score():
+    """Test that risky constructs are weighted and capped per construct"""
+    code = strip_comments_and_strings(
+        "contract A {\n"
+        "  // delegatecall in a comment does not count\n"
+        "  function f(address payable to) public { to.call{value: 1}(''); }\n"
+        "  function g() external payable { assembly { } }\n"
+        "  receive() external payable {}\n"
+        "}\n"
+    )
+    assert risk_score(code) == 4 + 2 + 1 + 1
+    assert risk_score("tx.origin " * 10) == 3 * RISK_HITS
+
+
+def test_scan():
+    """Test that the prefilter verdict comes with the risk score"""
+    assert scan("contract A { function f() { selfdestruct(a); } }") == (None, 5)
+    assert scan("contract A { selfdestruct(a);") == ("unclosed '{'", 5)
+    assert scan("// nothing") == ("no contract, library or interface", 0)
@@ -0,0 +1,33 @@
+from slith.util import ProcessResult
+from slith.outcome import Outcome, classify, is_retryable
+
+
+def test_classify_timeout():
+    """Test that a killed run is a timeout whatever its output"""
+    result = ProcessResult(-1, "", "SolidityCompilationError", True)
+    assert classify(result) == Outcome.TIMEOUT
+    assert is_retryable(Outcome.TIMEOUT)
+
+
+def test_classify_compile_error():
+    """Test recognition of solc errors reported by the analyzers"""
+    for stderr in (
+        "mythril.interfaces.cli [ERROR]: SolidityCompilationError: ...",
+        "crytic_compile.platform.exceptions.InvalidCompilation: ...",
+        "a.sol:3:1\nParserError: Expected ';'",
+    ):
+        result = ProcessResult(1, "", stderr, False)
+        assert classify(result) == Outcome.COMPILE_ERROR
+    assert not is_retryable(Outcome.COMPILE_ERROR)
+
+
+def test_classify_crash_and_success():
+    """Test crashes, and findings that are a successful run"""
+    assert classify(ProcessResult(-11, "", "", False)) == Outcome.CRASH
+    traceback = "Traceback (most recent call last):\n  ...\nKeyError: 'x'\n"
+    assert classify(ProcessResult(1, "", traceback, False)) == Outcome.CRASH
+    assert classify(ProcessResult(1, "==== Issue ====\n", "", False)) == (
+        Outcome.SUCCESS
+    )
+    assert classify(ProcessResult(0, "", "", False)) == Outcome.SUCCESS
+    assert not is_retryable(Outcome.CRASH)
@@ -11,8 +11,10 @@ from slith.parse_good import (
     contracts_that_dont_parse,
     _write_results,
     _read_results,
+    solc_diagnostics,
 )
 from slith.config import Config
+from slith.risk import RiskScores
 
 
 @pytest.fixture
@@ -23,6 +25,7 @@ def mock_config(tmp_path):
     config.contracts_errors.mkdir(parents=True, exist_ok=True)
     config.contracts_ok = tmp_path / "ok.txt"
     config.contracts_fail = tmp_path / "fail.txt"
+    config.risk_scores = tmp_path / "risk_scores.tsv"
     config.contracts_glob = lambda: []
     return config
 
@@ -147,3 +150,135 @@ def test_names_of_contracts_no_fail_file(mock_config):
     assert not mock_config.contracts_fail.exists()
     result = names_of_contracts_that_dont_parse(mock_config)
     assert result == set()
+
+
+def _write_contracts(directory, contracts):
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, text in contracts.items():
+        path = directory / name
+        path.write_text(text)
+        paths.append(path)
+    return paths
+
+
+def test_check_contracts_parse_prefilter(mock_config, tmp_path):
+    """Test that the lexical prefilter rejects garbage before the parser runs"""
+    paths = _write_contracts(
+        tmp_path / "contracts",
+        {"good.sol": "contract A {}\n", "bad.sol": "contract A {\n"},
+    )
+    mock_config.contracts_parse_status = tmp_path / "status.txt"
+    with patch("solidity_parser.parser.parse_file") as parse_file:
+        check_contracts_parse(mock_config, iter(paths))
+    assert parse_file.call_count == 1
+    assert _read_results(mock_config.contracts_ok) == {"good.sol"}
+    assert _read_results(mock_config.contracts_fail) == {"bad.sol"}
+    assert _read_results(mock_config.contracts_parse_status) == {
+        "good.sol\tok\tantlr",
+        "bad.sol\tfail\tlexical",
+    }
+
+
+def test_check_contracts_parse_records_risk(mock_config, tmp_path):
+    """Test that the prefilter keeps the risk score of the sources it reads"""
+    paths = _write_contracts(
+        tmp_path / "contracts",
+        {"risky.sol": "contract A { function f() { selfdestruct(a); } }\n"},
+    )
+    mock_config.contracts_parse_status = tmp_path / "status.txt"
+    with patch("solidity_parser.parser.parse_file"):
+        check_contracts_parse(mock_config, iter(paths))
+    scores = RiskScores(mock_config.risk_scores)
+    assert scores.get("risky.sol", paths[0].stat()) == 5
+
+
+def test_solc_diagnostics():
+    """Test splitting solc diagnostics by source file"""
+    stderr = (
+        "ParserError: Expected ';' but got '}'\n"
+        " --> /corpus/bad.sol:3:1:\n"
+        "  |\n"
+        "3 | }\n"
+        "Warning: SPDX license identifier not provided\n"
+        "--> good.sol\n"
+        "Warning: Unused variable\n"
+        " --> good.sol:2:5:\n"
+    )
+    diagnostics = solc_diagnostics(stderr)
+    assert [kind for kind, _ in diagnostics["bad.sol"]] == ["ParserError"]
+    assert [kind for kind, _ in diagnostics["good.sol"]] == ["Warning"]
+
+
+@pytest.fixture
+def solc_selector():
+    class MockSolcSelector:
+        def __init__(self):
+            self.versions = [(0, 7, 6), (0, 8, 19)]
+            self.default_solidity_version = (0, 8, 19)
+            self.used = []
+
+        def caret_version(self, ver_tup):
+            return max(v for v in self.versions if v[:2] == ver_tup[:2])
+
+        def solc_use(self, version):
+            self.used.append(version)
+
+    return MockSolcSelector()
+
+
+def test_check_contracts_parse_solc(mock_config, tmp_path, solc_selector, monkeypatch):
+    """Test the native solc backend batches files by version"""
+    paths = _write_contracts(
+        tmp_path / "contracts",
+        {
+            "a.sol": "pragma solidity ^0.8.0;\ncontract A {}\n",
+            "b.sol": "pragma solidity ^0.8.0;\ncontract B { uint x }\n",
+            "c.sol": "pragma solidity ^0.7.0;\ncontract C {}\n",
+        },
+    )
+    calls = []
+
+    def mock_subrun(cmd):
+        calls.append(cmd)
+        stderr = ""
+        if any(arg.endswith("b.sol") for arg in cmd):
+            stderr = f"ParserError: Expected ';'\n --> {cmd[-1]}:2:25:\n"
+        return type(
+            "CompletedProcess",
+            (),
+            {"returncode": 1 if stderr else 0, "stdout": "", "stderr": stderr},
+        )
+
+    monkeypatch.setattr("slith.parse_good.subrun", mock_subrun)
+    mock_config.parse_backend = "solc"
+    mock_config.contracts_parse_status = tmp_path / "status.txt"
+    check_contracts_parse(mock_config, iter(paths), solc_sel=solc_selector)
+
+    assert solc_selector.used == ["0.7.6", "0.8.19"]
+    assert len(calls) == 2
+    assert _read_results(mock_config.contracts_ok) == {"a.sol", "c.sol"}
+    assert _read_results(mock_config.contracts_fail) == {"b.sol"}
+    assert "b.sol\tfail\tsolc" in mock_config.contracts_parse_status.read_text()
+    assert "Expected" in (mock_config.contracts_errors / "b.txt").read_text()
+
+
+def test_check_contracts_parse_solc_fallback(
+    mock_config, tmp_path, solc_selector, monkeypatch
+):
+    """Test falling back to ANTLR when solc fails without diagnostics"""
+    paths = _write_contracts(tmp_path / "contracts", {"a.sol": "contract A {}\n"})
+
+    def mock_subrun(cmd):
+        return type(
+            "CompletedProcess",
+            (),
+            {"returncode": 1, "stdout": "", "stderr": "unrecognised option"},
+        )
+
+    monkeypatch.setattr("slith.parse_good.subrun", mock_subrun)
+    mock_config.parse_backend = "solc"
+    mock_config.contracts_parse_status = tmp_path / "status.txt"
+    with patch("solidity_parser.parser.parse_file"):
+        check_contracts_parse(mock_config, iter(paths), solc_sel=solc_selector)
+    assert mock_config.contracts_parse_status.read_text() == "a.sol\tok\tantlr\n"
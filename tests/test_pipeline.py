@@ -0,0 +1,153 @@
+import threading
+import pytest
+from pathlib import Path
+
+from slith.util import ProcessResult
+from slith.config import Config
+from slith.mythril import WALL_MARGIN_SEC, MythrilLimits
+from slith.pipeline import (
+    ANALYZERS,
+    PreparedContract,
+    analyze_one_sol,
+    parse_analyzers,
+    prepare_contract,
+    run_analyzers,
+)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    return Config()
+
+
+@pytest.fixture
+def mock_solc_selector():
+    """Mock SolcSelector recording the versions put in use"""
+
+    class MockSolcSelector:
+        def __init__(self):
+            self.versions = [(0, 7, 6), (0, 8, 19)]
+            self.default_solidity_version = (0, 8, 19)
+            self.used = []
+
+        def caret_version(self, ver_tup):
+            return max(v for v in self.versions if v[:2] == ver_tup[:2])
+
+        def solc_use(self, version):
+            self.used.append(version)
+
+    return MockSolcSelector()
+
+
+def test_parse_analyzers():
+    """Test parsing of the analyzers option"""
+    assert parse_analyzers("mythril") == ("mythril",)
+    assert parse_analyzers("slither, mythril") == ("slither", "mythril")
+    with pytest.raises(ValueError):
+        parse_analyzers("mythril,unknown")
+    with pytest.raises(ValueError):
+        parse_analyzers("")
+
+
+def test_prepare_contract(mock_solc_selector):
+    """Test version resolution when preparing a contract"""
+    contract = prepare_contract(
+        mock_solc_selector, 3, Path("a.sol"), "pragma solidity ^0.7.0;\n"
+    )
+    assert contract == PreparedContract(
+        3, Path("a.sol"), "pragma solidity ^0.7.0;\n", "0.7.0", "0.7.6"
+    )
+
+
+def test_run_analyzers_concurrently(config, monkeypatch):
+    """Test that the chosen analyzers run at the same time on one contract"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_analyzer(ret_code):
+        def analyzer(config, contract):
+            barrier.wait()
+            return ret_code
+
+        return analyzer
+
+    monkeypatch.setitem(ANALYZERS, "mythril", fake_analyzer(1))
+    monkeypatch.setitem(ANALYZERS, "slither", fake_analyzer(255))
+    contract = PreparedContract(0, Path("a.sol"), "", None, "0.8.19")
+    ret_codes = run_analyzers(config, contract, ("mythril", "slither"))
+    assert ret_codes == {"mythril": 1, "slither": 255}
+
+
+def test_analyze_one_sol_prepares_once(config, mock_solc_selector, monkeypatch):
+    """Test that solc is selected once for all the analyzers"""
+    seen = []
+
+    def analyzer(config, contract):
+        seen.append(contract)
+        return 0
+
+    monkeypatch.setitem(ANALYZERS, "mythril", analyzer)
+    monkeypatch.setitem(ANALYZERS, "slither", analyzer)
+    ret_codes = analyze_one_sol(
+        config,
+        mock_solc_selector,
+        0,
+        Path("a.sol"),
+        "pragma solidity 0.8.19;\n",
+        ("mythril", "slither"),
+    )
+    assert ret_codes == {"mythril": 0, "slither": 0}
+    assert mock_solc_selector.used == ["0.8.19"]
+    assert seen[0] is seen[1]
+
+
+def test_analyzer_timeouts_are_independent(config, monkeypatch):
+    """Test that each analyzer gets its own timeout from the Config"""
+    timeouts = {}
+
+    def fake_subrun(tool):
+        def subrun(cmd, timeout_sec, env=None):
+            timeouts[tool] = timeout_sec
+            return ProcessResult(0, "", "", False)
+
+        return subrun
+
+    monkeypatch.setattr("slith.mythril.subrun", fake_subrun("mythril"))
+    monkeypatch.setattr("slith.slither.subrun", fake_subrun("slither"))
+    config.mythril_timeout_sec = 10.0
+    config.slither_timeout_sec = 20.0
+    contract = PreparedContract(0, Path("a.sol"), "", None, "0.8.19")
+    run_analyzers(config, contract, ("mythril", "slither"))
+    assert timeouts == {"mythril": 10.0, "slither": 20.0}
+    assert (config.mythril_results_other / "a.txt").exists()
+    assert (config.slither_results_other / "a.txt").exists()
+
+
+def test_mythril_limits(config, monkeypatch):
+    """Test that planned limits reach mythril, scaled on retries"""
+    commands = []
+
+    def subrun(cmd, timeout_sec, env=None):
+        commands.append((cmd, timeout_sec))
+        return ProcessResult(0, "", "", False)
+
+    monkeypatch.setattr("slith.mythril.subrun", subrun)
+    config.mythril_limits = {"a.sol": MythrilLimits(100.0, 10_000, 50, 2)}
+    contract = PreparedContract(0, Path("a.sol"), "", None, "0.8.19", attempt=1)
+    run_analyzers(config, contract, ("mythril",))
+    cmd, timeout_sec = commands[0]
+    assert cmd[3:] == [
+        "--execution-timeout",
+        "200",
+        "--solver-timeout",
+        "10000",
+        "--max-depth",
+        "50",
+        "-t",
+        "2",
+    ]
+    assert timeout_sec == 200.0 + WALL_MARGIN_SEC
+    result = (config.mythril_results_other / "a.txt").read_text()
+    assert "  execution_timeout_sec: 200\n  solver_timeout_ms: 10000\n" in result
+    assert "  attempt: 1\n" in result
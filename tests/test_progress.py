@@ -0,0 +1,81 @@
+import io
+import json
+import sys
+import pytest
+
+from slith.progress import ERASE_LINE_UP, Progress, ProgressMode
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_counts_rate_and_eta(clock):
+    """Test per-bucket counts, contracts per minute and the EMA based ETA"""
+    progress = Progress(total=10, mode=ProgressMode.OFF, clock=clock)
+    for name, ret in (("a.sol", 1), ("b.sol", 255), ("c.sol", 1)):
+        progress.start(name)
+        clock.now += 6.0
+        progress.finish(name, {"mythril": ret})
+    snap = progress.snapshot()
+    assert snap["done"] == 3
+    assert snap["per_minute"] == 10.0
+    assert snap["eta_sec"] == 42.0
+    assert snap["counts"] == {"mythril": {"ret_1": 2, "ret_255": 1}}
+
+    clock.now += 60.0
+    progress.finish("d.sol", {"mythril": 0})
+    assert 6.0 < progress.ema_interval < 60.0
+
+
+def test_longest_in_flight_first(clock):
+    """Test that the oldest running jobs are listed first"""
+    progress = Progress(mode=ProgressMode.OFF, clock=clock)
+    progress.start("old.sol")
+    clock.now += 100.0
+    progress.start("new.sol")
+    clock.now += 5.0
+    lines = progress.lines()
+    assert lines[0].startswith("[0/?]")
+    assert lines[1:] == ["  running 1m45s old.sol", "  running 0m05s new.sol"]
+
+
+def test_log_mode_and_snapshot(clock, tmp_path):
+    """Test the periodic log line and the snapshot for monitoring"""
+    stream = io.StringIO()
+    snapshot = tmp_path / "progress.json"
+    progress = Progress(2, snapshot, ProgressMode.LOG, stream, clock)
+    progress.finish("a.sol", {"slither": 1})
+    progress.render()
+    assert stream.getvalue().startswith("progress: [1/2] ")
+    assert "slither: ret_1=1" in stream.getvalue()
+    assert json.loads(snapshot.read_text())["counts"] == {"slither": {"ret_1": 1}}
+
+
+def test_live_view_moves_below_output(clock):
+    """Test that stdout output erases the live view, which is redrawn after"""
+    stream = io.StringIO()
+    stdout = io.StringIO()
+    saved = sys.stdout
+    sys.stdout = stdout
+    try:
+        with Progress(1, None, ProgressMode.LIVE, stream, clock) as progress:
+            progress.render()
+            print("00000 a.sol: 1")
+            progress.finish("a.sol", {"mythril": 1})
+    finally:
+        sys.stdout = saved
+    assert stdout.getvalue() == "00000 a.sol: 1\n"
+    assert stream.getvalue().count(ERASE_LINE_UP) == 1
+    assert stream.getvalue().endswith(
+        "[1/1] 0.0/min elapsed 0m00s eta 0m00s\n  mythril: ret_1=1\n"
+    )
@@ -0,0 +1,139 @@
+import json
+import os
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.mythril import write_mythril_result
+from slith.slither import write_slither_result
+from slith.report import build_index, load_index, parse_front_matter, report
+
+SLITHER_OUTPUT = (
+    "INFO:Detectors:\n"
+    "A.f() sends eth (a.sol#3)\n"
+    "Reference: https://github.com/crytic/slither/wiki/Detector-Documentation#arbitrary-send-eth\n"
+    "A.g() (a.sol#5) is reentrant\n"
+    "Reference: https://github.com/crytic/slither/wiki/Detector-Documentation#reentrancy-eth\n"
+    "A.h() (a.sol#9) is reentrant\n"
+    "Reference: https://github.com/crytic/slither/wiki/Detector-Documentation#reentrancy-eth\n"
+)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Config with a small results tree"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    results = [
+        ("a.sol", "0.8.19", 1, 2.5),
+        ("b.sol", "0.8.19", 0, 10.0),
+        ("c.sol", "0.4.26", 255, 0.5),
+    ]
+    for index, (name, version, ret_code, cpu) in enumerate(results):
+        output = "==== Integer Overflow ====\nSWC ID: 101\n" if ret_code == 1 else ""
+        write_mythril_result(
+            config,
+            index,
+            Path(name),
+            "",
+            None,
+            version,
+            ret_code,
+            output,
+            {"cpu_user_sec": cpu},
+        )
+    write_slither_result(
+        config, 0, Path("a.sol"), "", "0.8.0", "0.8.19", 1, SLITHER_OUTPUT
+    )
+    return config
+
+
+def test_parse_front_matter():
+    """Test reading the fields of a result header"""
+    text = 'mythril:\n  sol: "a.sol"\n  ret_code: 1\n===\n\nkey: not a field\n'
+    assert parse_front_matter(text) == {"sol": "a.sol", "ret_code": "1"}
+
+
+def test_group_by_and_crosstab(config):
+    """Test counts by fields and the cross-tab of two fields"""
+    text = report(
+        config,
+        group_bys=[("tool", "bucket")],
+        crosstabs=[("checked_version", "bucket")],
+    )
+    assert text.splitlines() == [
+        "4 results",
+        "",
+        "count by tool, bucket:",
+        "tool     bucket     count",
+        "mythril  ret_1      1",
+        "mythril  ret_255    1",
+        "mythril  ret_other  1",
+        "slither  ret_1      1",
+        "",
+        "checked_version by bucket:",
+        "checked_version\\bucket  ret_1  ret_255  ret_other  total",
+        "0.4.26                  0      1        0          1",
+        "0.8.19                  2      0        1          3",
+        "total                   2      1        1          4",
+    ]
+
+
+def test_histogram_and_findings(config):
+    """Test a numeric histogram and the most frequent findings"""
+    data = json.loads(
+        report(
+            config,
+            histograms=["cpu_user_sec"],
+            findings=True,
+            where=[("tool", "mythril")],
+            bins=2,
+            fmt="json",
+        )
+    )
+    histogram, findings = data["tables"]
+    assert data["results"] == 3
+    assert histogram["rows"] == [
+        {"low": 0.5, "high": 5.25, "count": 2},
+        {"low": 5.25, "high": 10.0, "count": 1},
+    ]
+    assert findings["rows"] == [
+        {
+            "tool": "mythril",
+            "finding": "Integer Overflow",
+            "contracts": 1,
+            "occurrences": 1,
+        }
+    ]
+    csv_text = report(config, findings=True, where=[("tool", "slither")], fmt="csv")
+    assert csv_text.splitlines() == [
+        "tool,finding,contracts,occurrences",
+        "slither,reentrancy-eth,1,2",
+        "slither,arbitrary-send-eth,1,1",
+    ]
+
+
+def test_index_reuse(config, monkeypatch):
+    """Test that only new or rewritten result files are read again"""
+    index = build_index(config)
+    assert index.rows == 4
+    assert load_index(config.report_index).row(0) == index.row(0)
+    read = []
+    monkeypatch.setattr(
+        "slith.report.read_result",
+        lambda config, path: read.append(path.name) or "mythril:\n  ret_code: 7\n===\n",
+    )
+    assert build_index(config).rows == 4
+    assert read == []
+    changed = config.mythril_results_other / "b.txt"
+    os.utime(changed, ns=(0, 0))
+    (config.mythril_results_1 / "d.txt").write_text("")
+    index = build_index(config)
+    assert sorted(read) == ["b.txt", "d.txt"]
+    assert {index.get("path")[row]: index.get("ret_code")[row] for row in range(5)} == {
+        "mythril_results/ret_1/a.txt": "1",
+        "mythril_results/ret_1/d.txt": "7",
+        "mythril_results/ret_255/c.txt": "255",
+        "mythril_results/ret_other/b.txt": "7",
+        "slither_results/ret_1/a.txt": "1",
+    }
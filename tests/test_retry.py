@@ -0,0 +1,135 @@
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.summary import RunSummary
+from slith.outcome import TIMEOUT_RET
+from slith.mythril import write_mythril_result
+from slith.pipeline import PreparedContract, run_mythril
+from slith.retry import retry_timeouts, timed_out
+from slith.writer import ResultWriter
+
+
+class FakeSelector:
+    def solc_use(self, ver):
+        pass
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with a small corpus"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.make_dirs()
+    config.patched_contracts_old.mkdir(parents=True)
+    for name, size in (("big.sol", 100), ("small.sol", 10), ("bad.sol", 10)):
+        (config.patched_contracts_old / name).write_text("x" * size)
+    return config
+
+
+@pytest.fixture
+def prepared(monkeypatch):
+    def mock_prepare(solc_sel, index, sol_path, sol_text, search=None):
+        return PreparedContract(index, sol_path, sol_text, None, "0.8.19")
+
+    monkeypatch.setattr("slith.retry.prepare_contract", mock_prepare)
+
+
+def killed_result(config, index, name, outcome):
+    extra = {"outcome": outcome}
+    write_mythril_result(
+        config, index, Path(name), "", None, "0.8.19", TIMEOUT_RET, "", extra
+    )
+
+
+def test_timed_out_ignores_deterministic_failures(config):
+    """Test that only timeouts are selected for a retry"""
+    killed_result(config, 4, "e.sol", "crash")
+    summary = RunSummary()
+    summary.record("mythril", "e.sol", TIMEOUT_RET)
+    summary.record("mythril", "a.sol", TIMEOUT_RET)
+    summary.record("slither", "a.sol", 0)
+    summary.record("mythril", "b.sol", 1)
+    summary.record("mythril", "c.sol", 255)
+    summary.record("slither", "d.sol", TIMEOUT_RET)
+    assert timed_out(config, summary) == {"a.sol": ["mythril"], "d.sol": ["slither"]}
+
+
+def test_retry_escalates_budget(config, prepared, monkeypatch):
+    """Test retries in size order, with a growing budget, until success"""
+    calls = []
+
+    def mock_run_analyzers(config, contract, tools):
+        calls.append((contract.sol_path.name, contract.attempt, tuple(tools)))
+        assert contract.index == (7 if contract.sol_path.name == "big.sol" else 0)
+        finished = contract.sol_path.name == "small.sol" or contract.attempt == 2
+        return {tool: 0 if finished else TIMEOUT_RET for tool in tools}
+
+    monkeypatch.setattr("slith.retry.run_analyzers", mock_run_analyzers)
+    killed_result(config, 7, "big.sol", "timeout")
+    summary = RunSummary()
+    for name in ("big.sol", "small.sol"):
+        summary.record("mythril", name, TIMEOUT_RET)
+    summary.record("mythril", "bad.sol", 1)
+    retried = []
+
+    assert (
+        retry_timeouts(config, FakeSelector(), summary, retried.append, lambda: True)
+        == 3
+    )
+    assert calls == [
+        ("small.sol", 1, ("mythril",)),
+        ("big.sol", 1, ("mythril",)),
+        ("big.sol", 2, ("mythril",)),
+    ]
+    assert retried == ["small.sol", "big.sol", "big.sol"]
+    assert summary.results["mythril"] == {"big.sol": 0, "small.sol": 0, "bad.sol": 1}
+    assert not (config.mythril_results_other / "big.txt").exists()
+
+
+def test_retry_stops_without_capacity(config, prepared, monkeypatch):
+    """Test that no retry starts while the machine is busy"""
+    monkeypatch.setattr(
+        "slith.retry.run_analyzers", lambda *args: pytest.fail("retried")
+    )
+    summary = RunSummary()
+    summary.record("mythril", "small.sol", TIMEOUT_RET)
+    assert retry_timeouts(config, FakeSelector(), summary, None, lambda: False) == 0
+    assert summary.results["mythril"]["small.sol"] == TIMEOUT_RET
+
+
+def test_attempt_scales_timeout(config, monkeypatch):
+    """Test that a retried analyzer gets the escalated timeout"""
+    seen = {}
+
+    def mock_do(config, *args, timeout_sec, env, extra, limits):
+        seen.update(timeout_sec=timeout_sec, extra=extra, limits=limits)
+        return 0
+
+    monkeypatch.setattr("slith.pipeline.do_mythril_one_sol", mock_do)
+    config.retry_factor = 3.0
+    run_mythril(config, PreparedContract(0, Path("a.sol"), "", None, "0.8.19", None, 2))
+    assert seen == {
+        "timeout_sec": config.mythril_timeout_sec * 9,
+        "extra": {"attempt": 2},
+        "limits": None,
+    }
+
+
+def test_retry_flushes_queued_results(config, prepared, monkeypatch):
+    """Test that a timeout still queued in the writer is read and removed"""
+    seen = []
+
+    def mock_run_analyzers(config, contract, tools):
+        seen.append(contract.index)
+        assert not (config.mythril_results_other / "big.txt").exists()
+        return {tool: 0 for tool in tools}
+
+    monkeypatch.setattr("slith.retry.run_analyzers", mock_run_analyzers)
+    summary = RunSummary()
+    summary.record("mythril", "big.sol", TIMEOUT_RET)
+    with ResultWriter(fsync=False) as writer:
+        config.writer = writer
+        killed_result(config, 7, "big.sol", "timeout")
+        assert retry_timeouts(config, FakeSelector(), summary, None, lambda: True) == 1
+    assert seen == [7]
@@ -0,0 +1,82 @@
+import json
+
+from slith.config import Config
+from slith.risk import SCORE_CAP, CostPredictor, RiskScores, prioritize, priority
+
+
+def usage(tool, name, size, cpu_sec):
+    return {"tool": tool, "name": name, "size": size, "user_sec": cpu_sec, "sys_sec": 0}
+
+
+def test_risk_scores_follow_changes(tmp_path):
+    """Test that a saved score is reused until the source changes"""
+    config = Config(tmp_path / "data")
+    path = tmp_path / "meta" / "risk.tsv"
+    sol_path = tmp_path / "A.sol"
+    sol_path.write_text("contract A {}\n")
+    scores = RiskScores(path)
+    scores.put("A.sol", sol_path.stat(), 7)
+    scores.save(config)
+    assert RiskScores(path).get("A.sol", sol_path.stat()) == 7
+    sol_path.write_text("contract A { uint x; }\n")
+    assert RiskScores(path).get("A.sol", sol_path.stat()) is None
+    scores = RiskScores(path)
+    scores.put("A.sol", sol_path.stat(), 3)
+    scores.save(config)
+    assert len(path.read_text().splitlines()) == 1
+    assert RiskScores(path).get("A.sol", sol_path.stat()) == 3
+
+
+def test_cost_predictor():
+    """Test predictions from the contract, then its size band, then its size"""
+    costs = CostPredictor(
+        [
+            usage("mythril", "A.sol", 1000, 30.0),
+            usage("mythril", "B.sol", 2000, 10.0),
+            usage("slither", "B.sol", 2000, 2.0),
+        ]
+    )
+    assert costs.predict_one("mythril", "A.sol", 1000) == 30.0
+    assert costs.predict_one("mythril", "C.sol", 3000) == 20.0
+    assert costs.predict_one("mythril", "D.sol", 100 * 1024) == 100.0
+    assert costs.predict(["mythril", "slither"], "B.sol", 2000) == 12.0
+
+
+def test_priority_caps_score():
+    """Test that above the cap the cheaper contract wins"""
+    assert priority(0, 1.0) == 0
+    assert priority(SCORE_CAP * 3, 100.0) < priority(SCORE_CAP, 10.0)
+    assert priority(5, 10.0) < priority(10, 10.0)
+
+
+def test_prioritize(tmp_path, monkeypatch):
+    """Test that risk per predicted CPU second orders, safe ones by size"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    contracts = tmp_path / "contracts"
+    contracts.mkdir()
+    sources = {
+        "safe_big.sol": "contract A { uint x; }" + " " * 4000,
+        "safe_small.sol": "contract A {}",
+        "risky_slow.sol": "contract A { function f() { selfdestruct(a); } }",
+        "risky_fast.sol": "contract A { function f() { selfdestruct(a); } }",
+        "riskier.sol": "contract A { function f() { a.delegatecall(d); "
+        "selfdestruct(a); } }",
+    }
+    for name, text in sources.items():
+        (contracts / name).write_text(text)
+    config.usage_log.parent.mkdir(parents=True)
+    records = [
+        usage("mythril", "risky_slow.sol", 50, 500.0),
+        usage("mythril", "risky_fast.sol", 50, 5.0),
+    ]
+    config.usage_log.write_text("".join(json.dumps(r) + "\n" for r in records))
+    ordered = prioritize(config, sorted(contracts.iterdir()))
+    assert [p.name for p in ordered] == [
+        "risky_fast.sol",
+        "riskier.sol",  # predicted by the median of its size band
+        "risky_slow.sol",
+        "safe_small.sol",
+        "safe_big.sol",
+    ]
+    assert RiskScores(config.risk_scores).get("riskier.sol", ordered[1].stat()) == 10
@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from slith.sample import (
+    Estimate,
+    Stratum,
+    allocate,
+    bucket_estimates,
+    draw_sample,
+    estimate_total,
+    runtime_estimate,
+)
+from slith.config import Config
+from slith.summary import RunSummary
+from slith.usage import usage_offset
+
+
+def test_allocate():
+    """Test proportional allocation of exactly the target, with floors if they fit"""
+    sizes = {("0.8.19", "<4K"): 900, ("0.4.26", "<4K"): 90, ("0.5.0", ">=256K"): 1}
+    assert allocate(sizes, 100) == {
+        ("0.8.19", "<4K"): 89,
+        ("0.4.26", "<4K"): 10,
+        ("0.5.0", ">=256K"): 1,
+    }
+    many = {("0.8.19", f"band{i}"): 10 for i in range(10)}
+    counts = allocate(many, 5)
+    assert sum(counts.values()) == 5
+    assert sorted(counts.values()) == [0] * 5 + [1] * 5
+    assert allocate({("0.8.19", "<4K"): 3}, 10) == {("0.8.19", "<4K"): 3}
+
+
+def test_draw_sample_is_seeded():
+    """Test that the same seed draws the same contracts in any input order"""
+    groups = {
+        ("0.8.19", "<4K"): [Path(f"a{i}.sol") for i in range(50)],
+        ("0.4.26", "4-16K"): [Path(f"b{i}.sol") for i in range(50)],
+    }
+    strata = draw_sample(groups, 10, seed=3)
+    assert [len(stratum.sample) for stratum in strata] == [5, 5]
+    shuffled = {key: list(reversed(paths)) for key, paths in groups.items()}
+    assert draw_sample(shuffled, 10, seed=3) == strata
+    assert draw_sample(groups, 10, seed=4) != strata
+
+
+def test_estimate_total():
+    """Test the stratified total and its confidence interval"""
+    census = estimate_total([(3, [1.0, 0.0, 1.0])])
+    assert census == Estimate(2.0, 0.0)
+    estimate = estimate_total([(100, [1.0, 0.0]), (10, [4.0])])
+    assert estimate.value == 90.0
+    # 100**2 * (1 - 2/100) * 0.5 / 2, the single value stratum adds nothing
+    assert estimate.half_width == pytest.approx(1.96 * 2450**0.5)
+    partial = estimate_total([(3, [1.0, 0.0, 1.0]), (40, [])])
+    assert partial == Estimate(2.0, 0.0, unknown=40)
+    assert partial.describe() == "2 ± 0 (without 40 contracts of unknown strata)"
+
+
+def test_bucket_estimates():
+    """Test that the bucket shares of the sample scale to the strata"""
+    strata = [
+        Stratum(("0.8.19", "<4K"), [Path(f"a{i}.sol") for i in range(10)], []),
+        Stratum(("0.4.26", "<4K"), [Path(f"b{i}.sol") for i in range(30)], []),
+    ]
+    strata[0].sample = strata[0].population[:2]
+    strata[1].sample = strata[1].population[:3]
+    summary = RunSummary()
+    for name, ret_code in [("a0", 255), ("a1", 0), ("b0", 1), ("b1", 1), ("b2", 1)]:
+        summary.record("mythril", f"{name}.sol", ret_code)
+    estimates = bucket_estimates(strata, summary)["mythril"]
+    assert estimates["ret_255"].value == 5.0
+    assert estimates["ret_1"] == Estimate(30.0, 0.0)
+    assert estimates["ret_other"].value == 5.0
+
+
+def test_runtime_estimate_uses_this_run(tmp_path, monkeypatch):
+    """Test that usage records from earlier runs do not count"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.ensure_dir(config.usage_log.parent)
+
+    def record(name, wall_sec):
+        line = {"tool": "mythril", "name": name, "wall_sec": wall_sec}
+        with open(config.usage_log, "a") as f:
+            f.write(json.dumps(line) + "\n")
+
+    record("a0.sol", 5000.0)
+    start = usage_offset(config.usage_log)
+    record("a0.sol", 10.0)
+    record("a1.sol", 30.0)
+    population = [Path(f"a{i}.sol") for i in range(4)]
+    strata = [Stratum(("0.8.19", "<4K"), population, population[:2])]
+    assert runtime_estimate(config, strata, start).value == 80.0
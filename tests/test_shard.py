@@ -0,0 +1,72 @@
+import pytest
+from pathlib import Path
+
+from slith.shard import Shard, ShardKey, parse_shard, shard_of, in_shard
+from slith.summary import RunSummary, load_summary
+from slith.merge import merge_results
+
+
+def test_parse_shard():
+    """Test parsing of i/N shard specifications"""
+    assert parse_shard("1/4") == Shard(1, 4)
+    assert str(parse_shard("3/3")) == "3/3"
+    for spec in ["0/4", "5/4", "1/0", "x/4", "1"]:
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_shard_of_is_stable():
+    """Test that the shard of a name does not depend on the other files"""
+    path = Path("SomeToken.sol")
+    assert shard_of(path, 8) == shard_of(Path("/elsewhere") / path.name, 8)
+    assert 1 <= shard_of(path, 8) <= 8
+
+
+def test_in_shard_partitions_corpus():
+    """Test that the shards of a corpus are disjoint and complete"""
+    contracts = [Path(f"c{i}.sol") for i in range(200)]
+    shards = [list(in_shard(contracts, Shard(i, 4))) for i in range(1, 5)]
+    assert sorted(p for shard in shards for p in shard) == sorted(contracts)
+    assert all(20 < len(shard) < 80 for shard in shards)
+
+
+def test_in_shard_by_content(tmp_path):
+    """Test that sharding by content ignores the file name"""
+    one = tmp_path / "one.sol"
+    two = tmp_path / "two.sol"
+    one.write_text("contract A {}")
+    two.write_text("contract A {}")
+    assert shard_of(one, 16, ShardKey.CONTENT) == shard_of(two, 16, ShardKey.CONTENT)
+
+
+def _make_shard(base: Path, results: dict[str, int]) -> Path:
+    summary = RunSummary()
+    for name, ret_code in results.items():
+        summary.record("mythril", name, ret_code)
+        out = base / "mythril_results" / "ret_other" / Path(name).with_suffix(".txt")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(name)
+    summary.save(base / "summary.json")
+    return base
+
+
+def test_merge_results(tmp_path):
+    """Test merging shard results into one tree with a report"""
+    shard1 = _make_shard(tmp_path / "s1", {"a.sol": 0, "b.sol": 1})
+    shard2 = _make_shard(tmp_path / "s2", {"b.sol": 1, "c.sol": 255})
+    dest = tmp_path / "merged"
+    expected = {"a.sol", "b.sol", "c.sol", "d.sol"}
+
+    merged, report = merge_results(
+        dest, [shard1, shard2], expected, ("mythril", "slither")
+    )
+
+    assert merged.results["mythril"] == {"a.sol": 0, "b.sol": 1, "c.sol": 255}
+    assert report.missing == {
+        "mythril": ["d.sol"],
+        "slither": ["a.sol", "b.sol", "c.sol", "d.sol"],
+    }
+    assert report.duplicates == {"mythril": ["b.sol"]}
+    assert not report.ok()
+    assert (dest / "mythril_results" / "ret_other" / "c.txt").exists()
+    assert load_summary(dest / "summary.json").results == merged.results
@@ -1,6 +1,7 @@
 import pytest
 from pathlib import Path
 
+from slith.util import ProcessResult
 from slith.config import Config
 from slith.solc_select import SolcSelector
 from slith.slither import (
@@ -8,7 +9,9 @@ from slith.slither import (
     dirs_from_ret_code,
     out_text,
     write_out_file,
+    FAST_DETECTORS,
     do_slither_one_sol,
+    json_extra,
     slither_one_sol,
 )
 
@@ -28,22 +31,44 @@ def mock_slither(monkeypatch):
                         "returncode": 255,
                         "stderr": "Error analyzing contract\n",
                         "stdout": "",
+                        "timed_out": False,
+                        "usage": None,
                     },
                 )
             elif "warning.sol" in args[0][1]:
                 return type(
                     "CompletedProcess",
                     (),
-                    {"returncode": 1, "stderr": "Warning in contract\n", "stdout": ""},
+                    {
+                        "returncode": 1,
+                        "stderr": "Warning in contract\n",
+                        "stdout": "",
+                        "timed_out": False,
+                        "usage": None,
+                    },
                 )
             else:
                 return type(
                     "CompletedProcess",
                     (),
-                    {"returncode": 0, "stderr": "Analysis completed\n", "stdout": ""},
+                    {
+                        "returncode": 0,
+                        "stderr": "Analysis completed\n",
+                        "stdout": "",
+                        "timed_out": False,
+                        "usage": None,
+                    },
                 )
         return type(
-            "CompletedProcess", (), {"returncode": 0, "stdout": "", "stderr": ""}
+            "CompletedProcess",
+            (),
+            {
+                "returncode": 0,
+                "stdout": "",
+                "stderr": "",
+                "timed_out": False,
+                "usage": None,
+            },
         )
 
     monkeypatch.setattr("slith.slither.subrun", mock_run)
@@ -163,3 +188,43 @@ def test_slither_one_sol(config, mock_slither, monkeypatch):
     # Check output files
     assert (config.results_1 / "warning.sol").exists()
     assert (config.slither_results_1 / "warning.txt").exists()
+
+
+def test_json_extra(tmp_path):
+    """Test detectors and impacts read from the structured output"""
+    json_path = tmp_path / "slither.json"
+    assert json_extra(json_path) == {}
+    json_path.write_text(
+        '{"success": true, "results": {"detectors": ['
+        '{"check": "tx-origin", "impact": "Medium"},'
+        '{"check": "reentrancy-eth", "impact": "High"},'
+        '{"check": "tx-origin", "impact": "Medium"}]}}'
+    )
+    assert json_extra(json_path) == {
+        "detectors": '"reentrancy-eth,tx-origin"',
+        "impacts": '"High,Medium"',
+    }
+    json_path.write_text('{"success": false, "error": "boom", "results": {}}')
+    assert json_extra(json_path) == {"detectors": '""', "impacts": '""'}
+
+
+def test_slither_profile(config, monkeypatch):
+    """Test that the profile restricts detectors and is in the front matter"""
+    commands = []
+
+    def subrun(cmd, timeout_sec, env=None):
+        commands.append(cmd)
+        return ProcessResult(0, "", "", False)
+
+    monkeypatch.setattr("slith.slither.subrun", subrun)
+    config.slither_profile = "fast"
+    sol_path = config.patched_contracts_old / "a.sol"
+    do_slither_one_sol(config, 0, sol_path, "contract A {}", None, "0.8.19")
+    assert commands[0][1:5] == [
+        str(sol_path),
+        "--detect",
+        ",".join(FAST_DETECTORS),
+        "--exclude-dependencies",
+    ]
+    result = (config.slither_results_other / "a.txt").read_text()
+    assert "  profile: fast\n" in result
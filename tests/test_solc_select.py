@@ -211,3 +211,24 @@ def test_solc_use_same_version(mock_solc_versions):
     selector = SolcSelector()
     selector.current = (0, 8, 19)
     selector.solc_use("0.8.19")  # Should not trigger any subrun calls
+
+
+def test_solc_selector_is_lazy(monkeypatch):
+    """Test that creating a SolcSelector runs no solc-select command"""
+    calls = []
+    monkeypatch.setattr("slith.solc_select.subrun", calls.append)
+    SolcSelector()
+    assert calls == []
+
+
+def test_solc_selector_skips_install_list(mock_solc_versions, monkeypatch):
+    """Test that installed versions are read without the install list"""
+    calls = []
+    monkeypatch.setattr(
+        "slith.solc_select.installable_solidity_versions",
+        lambda: calls.append("install") or [],
+    )
+    selector = SolcSelector()
+    assert selector.default_solidity_version == (0, 8, 19)
+    selector.install("0.8.19")
+    assert calls == []
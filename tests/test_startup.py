@@ -0,0 +1,40 @@
+import pytest
+
+from slith import startup
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    monkeypatch.setattr(startup, "PROFILE", None)
+    yield startup.enable()
+    startup.PROFILE = None
+
+
+def test_phase_is_a_noop_when_disabled(monkeypatch):
+    """Test that phases cost nothing without --profile-startup"""
+    monkeypatch.setattr(startup, "PROFILE", None)
+    with startup.phase("config"):
+        pass
+    startup.mark("first contract")
+    assert startup.PROFILE is None
+
+
+def test_phases_accumulate(profile):
+    """Test that a phase entered twice adds up, and marks are kept once"""
+    with startup.phase("solc-select"):
+        pass
+    with startup.phase("solc-select"):
+        pass
+    startup.mark("first contract")
+    startup.mark("first contract")
+    assert set(profile.phases) == {"interpreter and imports", "solc-select"}
+    assert [name for name, _ in profile.marks] == ["first contract"]
+    report = profile.report()
+    assert "solc-select" in report
+    assert "@ first contract" in report
+
+
+def test_process_age():
+    """Test the process age read from /proc"""
+    age = startup.process_age()
+    assert age is None or 0.0 <= age < 24 * 3600
@@ -0,0 +1,55 @@
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.storage import REF_SUFFIX, out_text, render, store_source, write_result
+
+BLOCK = 'slither:\n  sol: "a.sol"\n===\n\nfindings\n'
+SOURCE = "contract A {}\n"
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with a stored slither result"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.patched_contracts_old.mkdir(parents=True)
+    (config.patched_contracts_old / "a.sol").write_text(SOURCE)
+    write_result(config, config.slither_results_1 / "a.txt", BLOCK)
+    return config
+
+
+def _store(config, mode):
+    config.storage_mode = mode
+    sol_path = config.patched_contracts_old / "a.sol"
+    store_source(config, config.results_1, sol_path, BLOCK, SOURCE)
+
+
+def test_store_copy(config):
+    """Test the legacy mode writes header and source together"""
+    _store(config, "copy")
+    assert (config.results_1 / "a.sol").read_text() == out_text(BLOCK, SOURCE)
+    assert render(config, "slither", "a.sol") == out_text(BLOCK, SOURCE)
+
+
+def test_store_link(config):
+    """Test the link mode shares the source file instead of copying it"""
+    _store(config, "link")
+    stored = config.results_1 / "a.sol"
+    assert stored.samefile(config.patched_contracts_old / "a.sol")
+    assert render(config, "slither", "a.sol") == out_text(BLOCK, SOURCE)
+
+
+def test_store_ref(config):
+    """Test the ref mode only records where the source is"""
+    _store(config, "ref")
+    assert not (config.results_1 / "a.sol").exists()
+    ref = config.results_1 / ("a.sol" + REF_SUFFIX)
+    assert Path(ref.read_text().strip()) == (config.patched_contracts_old / "a.sol")
+    assert render(config, "slither", "a.sol") == out_text(BLOCK, SOURCE)
+
+
+def test_render_missing_result(config):
+    """Test rendering a contract that was never analyzed"""
+    with pytest.raises(FileNotFoundError):
+        render(config, "mythril", "a.sol")
@@ -0,0 +1,34 @@
+from slith.summary import RunSummary, bucket_of, load_summary
+
+
+def test_bucket_of():
+    """Test mapping of return codes to result buckets"""
+    assert bucket_of(255) == "ret_255"
+    assert bucket_of(1) == "ret_1"
+    assert bucket_of(0) == "ret_other"
+    assert bucket_of(-1) == "ret_other"
+
+
+def test_summary_counts():
+    """Test per bucket counts of a run summary"""
+    summary = RunSummary()
+    summary.record("mythril", "a.sol", 1)
+    summary.record("mythril", "b.sol", 1)
+    summary.record("mythril", "c.sol", 0)
+    assert summary.counts("mythril") == {"ret_1": 2, "ret_other": 1}
+    assert summary.counts("slither") == {}
+
+
+def test_summary_roundtrip(tmp_path):
+    """Test saving and loading a run summary"""
+    path = tmp_path / "summary.json"
+    summary = RunSummary(shard="2/4")
+    summary.record("slither", "a.sol", 255)
+    summary.save(path)
+    loaded = load_summary(path)
+    assert loaded == summary
+
+
+def test_load_missing_summary(tmp_path):
+    """Test loading a summary that was never written"""
+    assert load_summary(tmp_path / "none.json") == RunSummary()
@@ -0,0 +1,138 @@
+import json
+import threading
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.pipeline import ANALYZERS, analyze_one_sol
+from slith.storage import write_result
+from slith.trace import TraceRecorder, span
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    return Config()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        self.now += 0.5
+        return self.now
+
+
+def events_of(path, phase):
+    return [e for e in json.loads(path.read_text())["traceEvents"] if e["ph"] == phase]
+
+
+def test_span_and_tracks(tmp_path):
+    """Test that spans land on one track per thread, sub-tracks on request"""
+    path = tmp_path / "trace.json"
+    with TraceRecorder(path, clock=FakeClock()) as trace:
+        with trace.span("outer", "run", contract="a.sol"):
+            with trace.on_track("MainThread/mythril"):
+                with span(trace, "mythril", "analyzer"):
+                    pass
+
+        def write():
+            with trace.span("write", "io"):
+                pass
+
+        worker = threading.Thread(target=write, name="w-1")
+        with trace.span("joined", "run"):
+            worker.start()
+            worker.join()
+    with span(None, "untraced", "run"):
+        pass
+    tracks = {e["args"]["name"]: e["tid"] for e in events_of(path, "M")}
+    assert set(tracks) == {"slith", "MainThread", "MainThread/mythril", "w-1"}
+    spans = {e["name"]: e for e in events_of(path, "X")}
+    assert set(spans) == {"outer", "mythril", "joined", "write"}
+    assert spans["write"]["tid"] == tracks["w-1"]
+    assert spans["outer"]["tid"] == tracks["MainThread"]
+    assert spans["mythril"]["tid"] == tracks["MainThread/mythril"]
+    assert spans["outer"]["args"] == {"contract": "a.sol"}
+    assert spans["outer"]["ts"] == 0.5e6
+    assert spans["mythril"]["ts"] == 1e6 and spans["mythril"]["dur"] == 0.5e6
+
+
+def test_counters(tmp_path):
+    """Test that a counter records all its series on every change"""
+    path = tmp_path / "trace.json"
+    with TraceRecorder(path) as trace:
+        trace.adjust("queue", "pending", 3)
+        trace.adjust("queue", "pending", -1)
+        trace.adjust("queue", "running", 1)
+        trace.adjust("queue", "running", 0)
+        trace.counter("writer queue", pending=7)
+        trace.counter("writer queue", pending=7)
+    assert [e["args"] for e in events_of(path, "C")] == [
+        {"pending": 3},
+        {"pending": 2},
+        {"pending": 2, "running": 1},
+        {"pending": 7},
+    ]
+
+
+def test_rotate(tmp_path):
+    """Test that rotating saves the events and keeps only the track names"""
+    path = tmp_path / "trace.json"
+    trace = TraceRecorder(path)
+    with trace.span("first", "run"):
+        pass
+    trace.rotate()
+    with trace.span("second", "run"):
+        pass
+    trace.rotate()
+    assert [e["name"] for e in events_of(path, "X")] == ["second"]
+    previous = path.with_name("trace.json.1")
+    assert [e["name"] for e in events_of(previous, "X")] == ["first"]
+    assert {e["args"]["name"] for e in events_of(path, "M")} == {
+        "slith",
+        "MainThread",
+    }
+
+
+def test_traced_contract(config, monkeypatch):
+    """Test the spans of analyzing one contract"""
+
+    class MockSolcSelector:
+        versions = [(0, 8, 19)]
+        default_solidity_version = (0, 8, 19)
+
+        def caret_version(self, ver_tup):
+            return (0, 8, 19)
+
+        def solc_use(self, version):
+            pass
+
+    def fake_analyzer(config, contract):
+        write_result(config, config.mythril_results_1 / "a.txt", "block\n")
+        return 1
+
+    monkeypatch.setitem(ANALYZERS, "mythril", fake_analyzer)
+    monkeypatch.setitem(ANALYZERS, "slither", lambda config, contract: 0)
+    config.trace = TraceRecorder(config.results_base_dir / "trace.json")
+    analyze_one_sol(
+        config,
+        MockSolcSelector(),
+        0,
+        Path("a.sol"),
+        "pragma solidity ^0.8.0;\n",
+        ("mythril", "slither"),
+    )
+    config.trace.save()
+    path = config.results_base_dir / "trace.json"
+    tracks = {e["tid"]: e["args"]["name"] for e in events_of(path, "M")}
+    spans = [(tracks[e["tid"]], e["name"]) for e in events_of(path, "X")]
+    assert sorted(spans) == [
+        ("MainThread", "resolve version"),
+        ("MainThread", "solc use"),
+        ("MainThread/mythril", "mythril"),
+        ("MainThread/mythril", "write"),
+        ("MainThread/slither", "slither"),
+    ]
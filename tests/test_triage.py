@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+
+from slith.config import Config
+from slith.mythril import write_mythril_result
+from slith.slither import write_slither_result
+from slith.triage import Triage, in_sample, slither_flags, triage, triage_report
+
+
+def make_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.make_dirs()
+    return config
+
+
+def slither_result(config, name, output="", **extra):
+    extra = {key: f'"{value}"' for key, value in extra.items()}
+    write_slither_result(config, 0, Path(name), "", None, "0.8.0", 0, output, extra)
+
+
+def test_in_sample():
+    """Test that the sample is stable and about the requested size"""
+    names = [f"c{i}.sol" for i in range(2000)]
+    sample = [name for name in names if in_sample(name, 0.1, seed=1)]
+    assert 150 < len(sample) < 250
+    assert sample == [name for name in names if in_sample(name, 0.1, seed=1)]
+    assert sample != [name for name in names if in_sample(name, 0.1, seed=2)]
+    assert not any(in_sample(name, 0.0, seed=1) for name in names)
+
+
+def test_slither_flags(tmp_path, monkeypatch):
+    """Test flags by impact, by detector and by Reference anchor"""
+    config = make_config(tmp_path, monkeypatch)
+    config.triage_detectors = frozenset({"tx-origin", "suicidal"})
+    slither_result(config, "high.sol", detectors="reentrancy-eth", impacts="High")
+    slither_result(config, "low.sol", detectors="naming", impacts="Informational")
+    slither_result(config, "origin.sol", detectors="tx-origin", impacts="Medium")
+    slither_result(
+        config,
+        "batched.sol",
+        "Reference: https://github.com/crytic/slither/wiki/Detector-Documentation"
+        "#suicidal\n",
+    )
+    write_mythril_result(config, 0, Path("myth.sol"), "", None, "0.8.0", 0, "", None)
+    assert slither_flags(config) == {"high.sol", "origin.sol", "batched.sol"}
+
+
+def test_triage(tmp_path, monkeypatch):
+    """Test that flagged contracts are kept and the others sampled"""
+    config = make_config(tmp_path, monkeypatch)
+    config.triage_sample = 0.5
+    slither_result(config, "c0.sol", impacts="High")
+    contracts = [Path(f"c{i}.sol") for i in range(100)]
+    result = triage(config, contracts)
+    assert result.flagged == [Path("c0.sol")]
+    assert 30 < len(result.sampled) < 70
+    assert len(result.selected()) + len(result.skipped) == 100
+
+
+def test_triage_report(tmp_path, monkeypatch):
+    """Test that the saved mythril time is predicted from usage"""
+    config = make_config(tmp_path, monkeypatch)
+    skipped = tmp_path / "skipped.sol"
+    skipped.write_text("contract A {}")
+    record = {
+        "tool": "mythril",
+        "name": "skipped.sol",
+        "size": 13,
+        "user_sec": 7000.0,
+        "sys_sec": 200.0,
+    }
+    config.usage_log.write_text(json.dumps(record) + "\n")
+    result = Triage(flagged=[Path("a.sol")], skipped=[skipped])
+    assert triage_report(config, result) == (
+        "triage: mythril on 1 of 2 contracts (1 flagged by slither, 0 sampled), "
+        "about 2.0 CPU hours of mythril saved"
+    )
+
+
+def test_triage_report_without_history(tmp_path, monkeypatch):
+    """Test that no saved time is made up for contracts mythril never ran on"""
+    config = make_config(tmp_path, monkeypatch)
+    skipped = tmp_path / "skipped.sol"
+    skipped.write_text("contract A {}")
+    result = Triage(flagged=[Path("a.sol")], skipped=[skipped])
+    assert triage_report(config, result) == (
+        "triage: mythril on 1 of 2 contracts (1 flagged by slither, 0 sampled), "
+        "mythril CPU saved unknown without usage history"
+    )
@@ -0,0 +1,104 @@
+import subprocess
+import pytest
+from pathlib import Path
+
+from slith.util import JobUsage, ProcessResult, run_with_timeout
+from slith.config import Config
+from slith.mythril import do_mythril_one_sol
+from slith.usage import (
+    load_usage,
+    record_usage,
+    size_band,
+    source_size,
+    usage_report,
+)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    return Config()
+
+
+def test_run_with_timeout_captures_rusage():
+    """Test that the reaped child reports its CPU time and peak memory"""
+    result = run_with_timeout(
+        ["python", "-c", "x = bytearray(64 * 1024 * 1024); sum(range(10**6))"]
+    )
+    assert result.usage is not None
+    assert result.usage.max_rss_kb > 64 * 1024
+    assert result.usage.user_sec + result.usage.sys_sec > 0
+    assert result.usage.wall_sec > 0
+
+
+def test_run_with_timeout_without_wait4(monkeypatch):
+    """Test that runs go on without usage where the wait4 hook cannot work"""
+    monkeypatch.setattr("slith.util._POPEN", subprocess.Popen)
+    result = run_with_timeout(["python", "-c", "print('ok')"])
+    assert result.returncode == 0 and result.stdout == "ok\n"
+    assert result.usage is None
+
+
+def test_source_size(tmp_path):
+    """Test that sizes are bytes on disk, whatever the newlines or encoding"""
+    sol_path = tmp_path / "a.sol"
+    sol_path.write_bytes(b"a\r\nb\r\n")
+    assert source_size(sol_path, sol_path.read_text()) == 6
+    assert source_size(tmp_path / "gone.sol", "é") == 2
+
+
+def test_size_band():
+    """Test the contract size bands"""
+    assert size_band(100) == "<4K"
+    assert size_band(4 * 1024) == "4-16K"
+    assert size_band(300 * 1024) == ">=256K"
+
+
+def test_usage_in_front_matter_and_store(config, monkeypatch):
+    """Test that an analyzer run records its usage in both places"""
+    usage = JobUsage(3.5, 0.25, 204800, 10, 4)
+
+    def mock_subrun(cmd, timeout_sec, env=None):
+        return ProcessResult(1, "", "", False, usage)
+
+    monkeypatch.setattr("slith.mythril.subrun", mock_subrun)
+    do_mythril_one_sol(config, 0, Path("a.sol"), "x" * 5000, "0.8.0", "0.8.19")
+    block = (config.mythril_results_1 / "a.txt").read_text()
+    assert "  cpu_user_sec: 3.5\n" in block
+    assert "  max_rss_kb: 204800\n" in block
+    assert "  ctx_switches: 10/4\n" in block
+    [record] = load_usage(config.usage_log)
+    assert record["version"] == "0.8.19"
+    assert record["size"] == 5000
+    assert record["outcome"] == "success"
+
+
+def test_usage_report(config):
+    """Test the distributions by tool, version and size"""
+    for name, cpu, version in (("a.sol", 1.0, "0.8.19"), ("b.sol", 3.0, "0.4.26")):
+        usage = JobUsage(cpu, 0.0, 1024 * 100, 1, 1)
+        record_usage(config, "mythril", name, version, 100, "success", usage)
+    record_usage(
+        config,
+        "mythril",
+        "a.sol",
+        "0.8.19",
+        100,
+        "success",
+        JobUsage(2.0, 0, 1024, 0, 0),
+    )
+    records = load_usage(config.usage_log)
+    assert len(records) == 2
+    [_, by_tool] = usage_report(records, "tool")
+    assert by_tool.split()[:5] == ["mythril", "2", "2.5", "2.9", "3.0"]
+    assert [line.split()[1] for line in usage_report(records, "version")[1:]] == [
+        "0.4.26",
+        "0.8.19",
+    ]
+    assert usage_report(records, "size")[1].split()[:3] == ["mythril", "<4K", "2"]
+    assert usage_report(records, "affinity")[1].split()[:3] == [
+        "mythril",
+        "unpinned",
+        "2",
+    ]
@@ -0,0 +1,106 @@
+import pytest
+
+from slith.pragma_solidity import RichVersion, VersionType
+from slith.version_search import (
+    NO_VERSION,
+    VersionCache,
+    VersionSearch,
+    candidate_versions,
+    probe_order,
+)
+
+
+class FakeSelector:
+    versions = [(0, 4, 24), (0, 4, 26), (0, 5, 17), (0, 6, 12), (0, 7, 6), (0, 8, 19)]
+
+    def install(self, ver):
+        pass
+
+
+@pytest.fixture
+def sol_path(tmp_path):
+    path = tmp_path / "a.sol"
+    path.write_text("contract A { function f() public { throw; } }\n")
+    return path
+
+
+def _search(tmp_path, compiling, workers=2):
+    """A VersionSearch whose probe succeeds for the versions in compiling"""
+    probed = []
+
+    class Probe(VersionSearch):
+        def _compiles(self, sol_path, version):
+            probed.append(version)
+            return version in compiling
+
+    search = Probe(FakeSelector(), VersionCache(tmp_path / "v.tsv"), workers)
+    return search, probed
+
+
+def test_probe_order_by_minor():
+    """Test that the newest patch of every minor comes before older patches"""
+    order = probe_order(FakeSelector.versions)
+    assert order == [
+        (0, 8, 19),
+        (0, 7, 6),
+        (0, 6, 12),
+        (0, 5, 17),
+        (0, 4, 26),
+        (0, 4, 24),
+    ]
+    patches = probe_order([(0, 4, 24), (0, 4, 25), (0, 4, 26)])
+    assert patches == [(0, 4, 26), (0, 4, 25), (0, 4, 24)]
+
+
+def test_search_finds_newest(tmp_path, sol_path):
+    """Test that the newest compiling candidate wins over earlier rounds"""
+    search, probed = _search(tmp_path, {(0, 5, 17), (0, 7, 6), (0, 4, 24)})
+    assert search.search(sol_path, FakeSelector.versions) == "0.7.6"
+    assert probed == [(0, 8, 19), (0, 7, 6)]
+    search, probed = _search(tmp_path, {(0, 4, 24)})
+    assert search.search(sol_path, FakeSelector.versions) == "0.4.24"
+
+
+def test_candidate_versions():
+    """Test the versions allowed by each kind of pragma"""
+    sele = FakeSelector()
+    caret = RichVersion(VersionType.CARET, "0.4.24", "0.4.26", None)
+    assert candidate_versions(sele, caret) == [(0, 4, 24), (0, 4, 26)]
+    range_ = RichVersion(VersionType.RANGE, "0.5.0", "0.5.0", "0.7.0")
+    assert candidate_versions(sele, range_) == [(0, 5, 17), (0, 6, 12)]
+    strict = RichVersion(VersionType.STRICT, "0.8.19", "0.8.19", None)
+    assert candidate_versions(sele, strict) == []
+    undefined = RichVersion(VersionType.UNDEFINED, "0.8.19", "0.8.19", None)
+    assert candidate_versions(sele, undefined) == FakeSelector.versions
+
+
+def test_working_version_searches_and_caches(tmp_path, sol_path):
+    """Test the fallback for a pragma-less contract and the cache hit"""
+    undefined = RichVersion(VersionType.UNDEFINED, "0.8.19", "0.8.19", None)
+    search, probed = _search(tmp_path, {(0, 4, 26)})
+    assert search.working_version(sol_path, undefined, "0.8.19") == "0.4.26"
+    assert probed[0] == (0, 8, 19)
+    assert (0, 4, 26) in probed
+
+    search, probed = _search(tmp_path, set())
+    assert search.working_version(sol_path, undefined, "0.8.19") == "0.4.26"
+    assert probed == []
+
+
+def test_working_version_without_fallback(tmp_path, sol_path):
+    """Test that the chosen version is kept when nothing compiles"""
+    undefined = RichVersion(VersionType.UNDEFINED, "0.8.19", "0.8.19", None)
+    search, probed = _search(tmp_path, set())
+    assert search.working_version(sol_path, undefined, "0.8.19") == "0.8.19"
+    assert len(probed) == 6
+    assert VersionCache(tmp_path / "v.tsv").versions == {
+        next(iter(search.cache.versions)): NO_VERSION
+    }
+
+
+def test_working_version_probes_once_when_it_compiles(tmp_path, sol_path):
+    """Test that a working pragma version costs a single probe"""
+    strict = RichVersion(VersionType.STRICT, "0.7.6", "0.7.6", None)
+    search, probed = _search(tmp_path, {(0, 7, 6)})
+    assert search.working_version(sol_path, strict, "0.7.6") == "0.7.6"
+    assert probed == [(0, 7, 6)]
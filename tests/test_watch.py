@@ -0,0 +1,140 @@
+import json
+import struct
+import time
+import pytest
+from unittest.mock import patch
+
+from slith.config import Config
+from slith.pipeline import PreparedContract
+from slith.summary import load_summary
+from slith.incremental import load_manifest
+from slith.watch import (
+    IN_CLOSE_WRITE,
+    IN_DELETE,
+    Debouncer,
+    LatencyLog,
+    Watcher,
+    parse_events,
+)
+
+
+class FakeSelector:
+    def __init__(self):
+        self.installed = []
+
+    def install(self, ver):
+        self.installed.append(ver)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    config.patched_contracts_old.mkdir(parents=True)
+    return config
+
+
+def _event(mask, name):
+    raw = name.encode().ljust(16, b"\0")
+    return struct.pack("iIII", 1, mask, 0, len(raw)) + raw
+
+
+def test_parse_events():
+    """Test decoding of a buffer holding several inotify events"""
+    events = list(
+        parse_events(_event(IN_CLOSE_WRITE, "a.sol") + _event(IN_DELETE, "b.sol"))
+    )
+    assert [(e.mask, e.name) for e in events] == [
+        (IN_CLOSE_WRITE, "a.sol"),
+        (IN_DELETE, "b.sol"),
+    ]
+
+
+def test_debouncer_waits_for_quiet_file():
+    """Test that a file is ready only once writes stop, keeping the arrival"""
+    debouncer = Debouncer(settle_sec=1.0)
+    debouncer.touch("a.sol", 10.0)
+    debouncer.touch("a.sol", 10.8)
+    assert debouncer.ready(11.5) == []
+    assert debouncer.next_timeout(11.5) == pytest.approx(0.3)
+    assert debouncer.ready(11.8) == [("a.sol", 10.0)]
+    debouncer.discard("a.sol")
+    assert debouncer.next_timeout(12.0) is None
+
+
+def test_latency_log(tmp_path):
+    """Test the latency metric file and report"""
+    log = LatencyLog(tmp_path / "latency.jsonl")
+    log.record("a.sol", 100.0, 103.0, {"mythril": 0})
+    log.record("b.sol", 100.0, 101.0, {})
+    lines = [json.loads(line) for line in log.path.read_text().splitlines()]
+    assert lines[0] == {
+        "name": "a.sol",
+        "arrival": 100.0,
+        "latency_sec": 3.0,
+        "results": {"mythril": 0},
+    }
+    assert "2 analyzed" in log.report()
+
+
+def test_watcher_analyzes_new_contract(config, monkeypatch):
+    """Test that a written contract goes through parse, version and analyzers"""
+
+    def mock_prepare(solc_sel, index, sol_path, sol_text, search=None):
+        return PreparedContract(index, sol_path, sol_text, None, "0.8.19")
+
+    def mock_run_analyzers(config, contract, analyzers):
+        assert contract.env["SOLC_VERSION"] == "0.8.19"
+        return {"mythril": 1}
+
+    monkeypatch.setattr("slith.watch.prepare_contract", mock_prepare)
+    monkeypatch.setattr("slith.watch.run_analyzers", mock_run_analyzers)
+    solc_sel = FakeSelector()
+    with patch("solidity_parser.parser.parse_file"):
+        with Watcher(config, solc_sel, ("mythril",), settle_sec=0.05) as watcher:
+            sol_path = config.patched_contracts_old / "a.sol"
+            with open(sol_path, "w") as f:
+                f.write("contract A {")
+                f.flush()
+                f.write("}\n")
+            deadline = time.time() + 5.0
+            while not watcher.latency.latencies and time.time() < deadline:
+                watcher.poll(0.1)
+
+    assert solc_sel.installed == ["0.8.19"]
+    assert len(watcher.latency.latencies) == 1
+    assert load_summary(config.run_summary).results == {"mythril": {"a.sol": 1}}
+    assert "a.sol" in load_manifest(config.manifest)
+
+
+def test_watcher_survives_failing_contract(config, monkeypatch):
+    """Test that a contract that fails is recorded and the watch goes on"""
+
+    def mock_prepare(solc_sel, index, sol_path, sol_text, search=None):
+        if sol_path.name == "bad.sol":
+            raise ValueError("no solc for this one")
+        return PreparedContract(index, sol_path, sol_text, None, "0.8.19")
+
+    monkeypatch.setattr("slith.watch.prepare_contract", mock_prepare)
+    monkeypatch.setattr(
+        "slith.watch.run_analyzers", lambda config, contract, analyzers: {"mythril": 0}
+    )
+    with patch("solidity_parser.parser.parse_file"):
+        with Watcher(config, FakeSelector(), ("mythril",), settle_sec=0.05) as watcher:
+            for name in ("bad.sol", "good.sol"):
+                (config.patched_contracts_old / name).write_text("contract A {}\n")
+            deadline = time.time() + 5.0
+            while len(watcher.latency.latencies) < 2 and time.time() < deadline:
+                watcher.poll(0.1)
+            assert not config.run_summary.exists()  # saved on the next flush
+
+    lines = [json.loads(line) for line in config.watch_latency.read_text().splitlines()]
+    errors = {line["name"]: line.get("error") for line in lines}
+    assert errors == {
+        "bad.sol": "failed: ValueError('no solc for this one')",
+        "good.sol": None,
+    }
+    assert load_summary(config.run_summary).results == {"mythril": {"good.sol": 0}}
+    assert sorted(load_manifest(config.manifest)) == ["bad.sol", "good.sol"]
+    assert config.contracts_ok.read_text().split() == ["bad.sol", "good.sol"]
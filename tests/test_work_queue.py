@@ -0,0 +1,104 @@
+import time
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.summary import RunSummary
+from slith.work_queue import WorkQueue, queued_contracts
+from slith.writer import ResultWriter
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    return Config()
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return tmp_path / "queue.sqlite"
+
+
+def _paths(*names):
+    return [Path(name) for name in names]
+
+
+def test_populate_is_idempotent(queue_path):
+    """Test that populating twice does not duplicate contracts"""
+    queue = WorkQueue(queue_path)
+    assert queue.populate(_paths("a.sol", "b.sol")) == 2
+    assert queue.populate(_paths("a.sol", "b.sol", "c.sol")) == 1
+    assert queue.counts() == {"pending": 3}
+
+
+def test_claims_are_exclusive(queue_path):
+    """Test that two workers never claim the same contract"""
+    first = WorkQueue(queue_path, owner="host1:1")
+    second = WorkQueue(queue_path, owner="host2:1")
+    first.populate(_paths("a.sol", "b.sol"))
+    claimed = {first.claim(), second.claim()}
+    assert claimed == {"a.sol", "b.sol"}
+    assert first.claim() is None
+    assert first.counts() == {"leased": 2}
+
+
+def test_expired_lease_is_requeued(queue_path):
+    """Test that an expired lease returns the contract to the queue"""
+    dead = WorkQueue(queue_path, lease_sec=0.01, owner="dead:1")
+    alive = WorkQueue(queue_path, owner="alive:1")
+    dead.populate(_paths("a.sol"))
+    assert dead.claim() == "a.sol"
+    time.sleep(0.05)
+    assert alive.claim() == "a.sol"
+    assert not dead.renew("a.sol")
+    assert not dead.complete("a.sol", {})
+    assert alive.complete("a.sol", {"mythril": 1})
+    assert alive.counts() == {"done": 1}
+
+
+def test_max_attempts(queue_path):
+    """Test that a contract that keeps losing its lease is given up"""
+    queue = WorkQueue(queue_path, lease_sec=0.01, max_attempts=2)
+    queue.populate(_paths("a.sol"))
+    assert queue.claim() == "a.sol"
+    time.sleep(0.05)
+    assert queue.claim() == "a.sol"
+    time.sleep(0.05)
+    assert queue.claim() is None
+    assert queue.counts() == {"failed": 1}
+
+
+def test_queued_contracts(queue_path, config):
+    """Test the queue iterator records results and releases on early stop"""
+    queue = WorkQueue(queue_path)
+    queue.populate(_paths("a.sol", "b.sol", "c.sol"))
+    summary = RunSummary()
+    contracts = queued_contracts(queue, config, summary)
+
+    first = next(contracts)
+    assert first == config.patched_contracts_old / "a.sol"
+    summary.record("mythril", first.name, 255)
+    second = next(contracts)
+    assert second.name == "b.sol"
+    contracts.close()
+
+    assert queue.counts() == {"done": 1, "pending": 2}
+    assert queue.summary().results == {"mythril": {"a.sol": 255}}
+
+
+def test_queued_contracts_waits_for_writes(queue_path, config, tmp_path):
+    """Test that a contract is done only after its queued writes landed"""
+    queue = WorkQueue(queue_path)
+    queue.populate(_paths("a.sol", "b.sol"))
+    summary = RunSummary()
+    result = tmp_path / "a.txt"
+    with ResultWriter(fsync=False) as writer:
+        config.writer = writer
+        contracts = queued_contracts(queue, config, summary)
+        next(contracts)
+        writer.write(result, "found")
+        next(contracts)
+        assert result.read_text() == "found"
+        assert queue.counts() == {"done": 1, "leased": 1}
+        contracts.close()
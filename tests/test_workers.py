@@ -0,0 +1,97 @@
+import threading
+import pytest
+from pathlib import Path
+
+from slith.config import Config
+from slith.pipeline import ANALYZERS, PreparedContract
+from slith.admission import Admission, RssPredictor
+from slith.autoscale import Autoscaler, LoadSample
+from slith.workers import WorkerPool
+
+
+class FakeSelector:
+    def __init__(self):
+        self.installed = []
+
+    def install(self, version):
+        self.installed.append(version)
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Create a Config instance with temporary directories"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    return Config()
+
+
+@pytest.fixture
+def running(monkeypatch):
+    """Fake analyzer recording how many contracts run at the same time"""
+    state = {"now": 0, "most": 0, "envs": []}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def mock_prepare(solc_sel, index, sol_path, sol_text, search=None):
+        return PreparedContract(index, sol_path, sol_text, None, f"0.8.{index}")
+
+    def analyzer(config, contract):
+        with lock:
+            state["now"] += 1
+            state["most"] = max(state["most"], state["now"])
+            state["envs"].append(contract.env["SOLC_VERSION"])
+        release.wait(5)
+        with lock:
+            state["now"] -= 1
+        return contract.index
+
+    monkeypatch.setattr("slith.workers.prepare_contract", mock_prepare)
+    monkeypatch.setitem(ANALYZERS, "mythril", analyzer)
+    state["release"] = release
+    return state
+
+
+def run_pool(pool, count, release):
+    results = {}
+    timer = threading.Timer(0.3, release.set)
+    timer.start()
+    with pool:
+        for index in range(count):
+            results.update(pool.add(index, Path(f"{index}.sol"), "x" * 10))
+        results.update(pool.flush())
+    timer.cancel()
+    return results
+
+
+def test_pool_runs_contracts_concurrently(config, running):
+    """Test that contracts run side by side, each with its own solc"""
+    selector = FakeSelector()
+    pool = WorkerPool(config, selector, ("mythril",), workers=3)
+    results = run_pool(pool, 5, running["release"])
+    assert results == {f"{i}.sol": {"mythril": i} for i in range(5)}
+    assert running["most"] == 3
+    assert sorted(running["envs"]) == [f"0.8.{i}" for i in range(5)]
+    assert sorted(selector.installed) == [f"0.8.{i}" for i in range(5)]
+
+
+def test_admission_limits_concurrency(config, running):
+    """Test that contracts wait while their predicted memory does not fit"""
+    admission = Admission(
+        RssPredictor([], default_kb=1_000),
+        headroom_kb=500,
+        available=lambda: 2_500,
+        in_use=lambda: 0,
+    )
+    pool = WorkerPool(config, FakeSelector(), ("mythril",), 4, admission)
+    results = run_pool(pool, 4, running["release"])
+    assert len(results) == 4
+    assert running["most"] == 2
+    assert pool.held_back >= 1
+
+
+def test_autoscaler_sets_limit(config, running):
+    """Test that the pool starts at the autoscaler's minimum"""
+    busy = LoadSample(2.0, 0.0, 0.0, 0.0)
+    autoscaler = Autoscaler(1, 4, lambda: busy)
+    pool = WorkerPool(config, FakeSelector(), ("mythril",), 4, autoscaler=autoscaler)
+    assert len(run_pool(pool, 3, running["release"])) == 3
+    assert running["most"] == 1
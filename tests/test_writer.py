@@ -0,0 +1,57 @@
+import threading
+import pytest
+
+from slith.config import Config
+from slith.storage import write_result
+from slith.writer import ResultWriter
+
+
+def test_writer_flushes_at_close(tmp_path):
+    """Test that every queued write is on disk once the writer is closed"""
+    with ResultWriter(group_size=4) as writer:
+        for i in range(10):
+            writer.write(tmp_path / f"r{i}.txt", f"result {i}\n")
+    assert writer.written == 10
+    assert (tmp_path / "r9.txt").read_text() == "result 9\n"
+
+
+def test_writer_flush(tmp_path):
+    """Test waiting for the pending writes without stopping the writer"""
+    with ResultWriter(fsync=False) as writer:
+        writer.write(tmp_path / "a.txt", "a")
+        writer.flush()
+        assert (tmp_path / "a.txt").read_text() == "a"
+
+
+def test_writer_back_pressure(tmp_path):
+    """Test that write blocks while the queue is full"""
+    writer = ResultWriter(max_pending=1)
+    writer.write(tmp_path / "a.txt", "a")
+    blocked = threading.Thread(target=writer.write, args=(tmp_path / "b.txt", "b"))
+    blocked.start()
+    blocked.join(timeout=0.1)
+    assert blocked.is_alive()
+    writer.start()
+    blocked.join(timeout=5)
+    assert not blocked.is_alive()
+    writer.close()
+    assert (tmp_path / "b.txt").read_text() == "b"
+
+
+def test_writer_reports_errors(tmp_path):
+    """Test that a failed background write is raised to the producer"""
+    writer = ResultWriter()
+    writer.start()
+    writer.write(tmp_path / "missing" / "a.txt", "a")
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+
+def test_write_result_uses_writer(tmp_path, monkeypatch):
+    """Test that result writes go through the configured writer"""
+    monkeypatch.setattr(Config, "data_dir", tmp_path / "data")
+    config = Config()
+    with ResultWriter() as writer:
+        config.writer = writer
+        write_result(config, config.results_1 / "a.txt", "a")
+    assert (config.results_1 / "a.txt").read_text() == "a"